@@ -16,20 +16,29 @@
 from __future__ import (print_function, division, absolute_import,
                         unicode_literals)
 
+import copy
 from io import open
-import os
 import logging
+import multiprocessing
+import os
+
+import defcon
 
 from fontTools.misc.py23 import tostr
 
 from glyphsLib.classes import __all__ as __all_classes__
 from glyphsLib.classes import *
 from glyphsLib.builder import to_ufos, to_designspace, to_glyphs
-from glyphsLib.builder.instances import InstanceData
-from glyphsLib.interpolation import interpolate
-from glyphsLib.parser import load, loads
+from glyphsLib.builder.instances import InstanceData, select_instances
+from glyphsLib.builder.timing import phase
+from glyphsLib.fontdiff import diff
+from glyphsLib.interpolation import (interpolate, interpolate_designspace,
+                                     apply_instance_data_to_ufo)
+from glyphsLib.parser import load, loads, peek
+from glyphsLib.package import is_package_path
 from glyphsLib.writer import dump, dumps
-from glyphsLib.util import clean_ufo
+from glyphsLib.util import (can_fork, clean_ufo, move_if_changed,
+                            save_ufo_incrementally, write_ufo)
 
 __version__ = "2.3.1.dev0"
 
@@ -39,7 +48,7 @@ __version__ = "2.3.1.dev0"
 # https://bugs.python.org/issue21720
 __all__ = [tostr(s) for s in [
     "build_masters", "build_instances", "load_to_ufos",
-    "load", "loads", "dump", "dumps",
+    "load", "loads", "peek", "dump", "dumps", "diff",
  ] + __all_classes__]
 
 logger = logging.getLogger(__name__)
@@ -51,6 +60,8 @@ def load_to_ufos(file_or_path, include_instances=False, family_name=None,
 
     if hasattr(file_or_path, 'read'):
         font = load(file_or_path)
+    elif is_package_path(file_or_path):
+        font = GSFont(file_or_path)
     else:
         with open(file_or_path, 'r', encoding='utf-8') as ifile:
             font = load(ifile)
@@ -61,7 +72,8 @@ def load_to_ufos(file_or_path, include_instances=False, family_name=None,
 
 
 def build_masters(filename, master_dir, designspace_instance_dir=None,
-                  family_name=None, propagate_anchors=True):
+                  family_name=None, propagate_anchors=True, masters=None,
+                  incremental=False, stats=None):
     """Write and return UFOs from the masters defined in a .glyphs file.
 
     Args:
@@ -70,6 +82,15 @@ def build_masters(filename, master_dir, designspace_instance_dir=None,
             written alongside the master UFOs though no instances will be built.
         family_name: If provided, the master UFOs will be given this name and
             only instances with this name will be included in the designspace.
+        masters: If provided, a list of master IDs or names: only these
+            masters are built and written. The designspace still references
+            all the masters.
+        incremental: If True, existing master UFOs and designspace are not
+            deleted and rewritten: only the files whose content changed are
+            written, and the files that are not part of the new UFOs are
+            deleted. The other files keep their modification times.
+        stats: If provided, a BuilderStats to which the time spent parsing,
+            converting and writing is added.
 
     Returns:
         A list of master UFOs, and if designspace_instance_dir is provided, a
@@ -77,23 +98,35 @@ def build_masters(filename, master_dir, designspace_instance_dir=None,
         paths from the designspace and respective data from the Glyphs source.
     """
 
-    font = GSFont(filename)
+    with phase(stats, 'parse'):
+        font = GSFont(filename)
     instance_dir = None
     if designspace_instance_dir is not None:
         instance_dir = os.path.relpath(designspace_instance_dir, master_dir)
     designspace = to_designspace(
         font, family_name=family_name, propagate_anchors=propagate_anchors,
-        instance_dir=instance_dir)
+        instance_dir=instance_dir, masters=masters, stats=stats)
     ufos = []
-    for source in designspace.sources:
-        ufos.append(source.font)
-        ufo_path = os.path.join(master_dir, source.filename)
-        clean_ufo(ufo_path)
-        source.font.save(ufo_path)
+    with phase(stats, 'write masters'):
+        for source in designspace.sources:
+            if source.font is None:
+                continue
+            ufos.append(source.font)
+            ufo_path = os.path.join(master_dir, source.filename)
+            if incremental:
+                save_ufo_incrementally(source.font, ufo_path)
+            else:
+                clean_ufo(ufo_path)
+                source.font.save(ufo_path)
 
     if designspace_instance_dir is not None:
         designspace_path = os.path.join(master_dir, designspace.filename)
-        designspace.write(designspace_path)
+        if incremental:
+            designspace.write(designspace_path + '.tmp')
+            move_if_changed(designspace_path + '.tmp', designspace_path)
+            designspace.path = designspace_path
+        else:
+            designspace.write(designspace_path)
         # All the instance data should be in the designspace. That's why for
         # now we return the full designspace in place of `instance_data`.
         # However, other functions still expect the instance data to have
@@ -104,20 +137,131 @@ def build_masters(filename, master_dir, designspace_instance_dir=None,
 
 
 def build_instances(filename, master_dir, instance_dir, family_name=None,
-                    propagate_anchors=True, round_geometry=True):
+                    propagate_anchors=True, round_geometry=True,
+                    interpolation_engine='mutatormath', workers=None,
+                    instances=None, stats=None):
     """Write and return UFOs from the instances defined in a .glyphs file.
 
+    The instances are interpolated from the master UFOs in memory and the
+    instance data is applied to them in memory too, so each instance UFO is
+    written once, and not at all if instance_dir is None.
+
     Args:
-        master_dir: Directory where masters are written.
-        instance_dir: Directory where instances are written.
+        master_dir: Directory where masters and the designspace are written,
+            or None to not write them.
+        instance_dir: Directory where instances are written, or None to only
+            return the instance UFOs.
         family_name: If provided, the master UFOs will be given this name and
             only instances with this name will be built.
+        interpolation_engine: "mutatormath" or "numpy", see
+            `interpolate_designspace`.
+        workers: If more than 1, the instances are shared between this number
+            of worker processes (at most one per processor), which inherit
+            the masters built by the parent process. Each worker writes its
+            instances and the returned UFOs are read back from instance_dir,
+            in the order of the instances of the font. Needs an instance_dir
+            and a platform that can fork, the instances are built in this
+            process otherwise.
+        instances: If provided, only build the instances that match one of
+            these style names, file names (the `fileName` custom parameter of
+            the instance, with or without ".ufo") or shell-style globs, e.g.
+            ["Bold Italic", "*Condensed*"]. The designspace written to
+            master_dir still lists all the instances.
+        stats: If provided, a BuilderStats to which the time spent parsing,
+            converting, interpolating and writing is added.
     """
 
-    master_ufos, instance_data = load_to_ufos(
-        filename, include_instances=True, family_name=family_name,
-        propagate_anchors=propagate_anchors)
-    instance_ufos = interpolate(
-        master_ufos, master_dir, instance_dir, instance_data,
-        round_geometry=round_geometry)
+    with phase(stats, 'parse'):
+        font = GSFont(filename)
+    _, instance_data = to_ufos(
+        font, include_instances=True, family_name=family_name,
+        propagate_anchors=propagate_anchors, stats=stats)
+    designspace = instance_data['designspace']
+
+    if master_dir is not None:
+        with phase(stats, 'write masters'):
+            for source in designspace.sources:
+                write_ufo(source.font, master_dir)
+                source.path = source.font.path
+            if instance_dir is not None:
+                for instance in designspace.instances:
+                    instance.path = os.path.join(
+                        instance_dir, os.path.basename(instance.filename))
+            designspace.write(os.path.join(master_dir, designspace.filename))
+
+    if instances is not None:
+        designspace.instances = select_instances(designspace, instances)
+
+    options = dict(round_geometry=round_geometry,
+                   engine=interpolation_engine)
+    # More workers than processors only repeat the work that the instances
+    # of a worker share.
+    workers = min(workers or 1, len(designspace.instances),
+                  multiprocessing.cpu_count())
+    if workers > 1:
+        if instance_dir is None:
+            logger.info('Building the instances in one process because '
+                        'they are not written')
+        elif not can_fork():
+            logger.info('Building the instances in one process because '
+                        'worker processes cannot be forked here')
+        else:
+            with phase(stats, 'instances'):
+                return _build_instances_in_workers(
+                    designspace, instance_dir, options, workers)
+    with phase(stats, 'instances'):
+        return _build_instance_ufos(designspace, instance_dir, options)
+
+
+def _build_instance_ufos(designspace, instance_dir, options):
+    instance_ufos = interpolate_designspace(designspace, **options)
+    for instance, ufo in zip(designspace.instances, instance_ufos):
+        apply_instance_data_to_ufo(ufo, instance, designspace)
+        if instance_dir is not None:
+            path = os.path.normpath(os.path.join(
+                instance_dir, os.path.basename(instance.filename)))
+            logger.info('Writing %s', path)
+            clean_ufo(path)
+            ufo.save(path)
     return instance_ufos
+
+
+# The designspace, with the masters in memory, and the options of the
+# instances built by the worker processes. They are inherited by the forked
+# workers instead of being pickled.
+_worker_build = None
+
+
+def _build_worker_instances(indices):
+    designspace, instance_dir, options = _worker_build
+    designspace = copy.copy(designspace)
+    designspace.instances = [designspace.instances[i] for i in indices]
+    return [ufo.path for ufo in
+            _build_instance_ufos(designspace, instance_dir, options)]
+
+
+def _build_instances_in_workers(designspace, instance_dir, options, workers):
+    global _worker_build
+
+    logger.info('Building %d instances with %d worker processes',
+                len(designspace.instances), workers)
+    # Each worker interpolates a few instances at once, sharing the work
+    # that does not depend on the instance.
+    chunks = [list(range(len(designspace.instances)))[start::workers]
+              for start in range(workers)]
+    _worker_build = designspace, instance_dir, options
+    try:
+        pool = multiprocessing.Pool(workers)
+        try:
+            paths = pool.map(_build_worker_instances, chunks)
+        finally:
+            pool.close()
+            pool.join()
+    finally:
+        _worker_build = None
+
+    instance_paths = [None] * len(designspace.instances)
+    for chunk, chunk_paths in zip(chunks, paths):
+        for index, path in zip(chunk, chunk_paths):
+            instance_paths[index] = path
+    return [defcon.Font(path) for path in instance_paths]
@@ -16,13 +16,32 @@ from __future__ import print_function, division, absolute_import, unicode_litera
 
 import sys
 import argparse
+import time
 
 import glyphsLib
+from glyphsLib.builder import BuilderStats
+from glyphsLib.batch import find_sources, convert_sources
+from glyphsLib.stats import memory_report
+from glyphsLib.watch import watch_masters
 
 
 description = """\n
 Converts a Glyphs.app source file into UFO masters
 or UFO instances and MutatorMath designspace.
+
+Run with "batch" as the first argument to convert many source files at once,
+or with "stats" to report the memory used by a loaded source file.
+"""
+
+batch_description = """\n
+Converts all the Glyphs.app source files found in the given files and
+directories into UFO masters and designspace, each in a folder of the
+output directory.
+"""
+
+stats_description = """\n
+Loads a Glyphs.app source file and reports the number of objects of each
+class and their estimated size in memory.
 """
 
 
@@ -41,21 +60,127 @@ def parse_options(args):
                         help="Output and generate interpolated instances UFO "
                              "to folder INSTANCES. "
                              "(default: %(const)s)")
+    parser.add_argument("-i", "--include-instances", metavar="PATTERN",
+                        action="append", default=None,
+                        help="Only generate the instances whose style name "
+                             "or file name matches PATTERN, which can be a "
+                             "glob. Can be repeated.")
     parser.add_argument("-r", "--round-instances", action="store_true",
                         help="Apply integer rounding to all geometry when "
                              "interpolating")
+    parser.add_argument("--incremental", action="store_true",
+                        help="When only writing masters, keep the existing "
+                             "master UFOs and only rewrite the files that "
+                             "changed")
+    parser.add_argument("--watch", action="store_true",
+                        help="After writing the masters, keep watching the "
+                             "Glyphs file and update the masters each time "
+                             "it is saved, until interrupted")
+    parser.add_argument("-j", "--jobs", metavar="JOBS", type=int, default=1,
+                        help="Build the instances in JOBS worker processes. "
+                             "(default: %(default)s)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Print the time spent in each phase and "
+                             "conversion method of the build")
     options = parser.parse_args(args)
+    if options.watch and options.instances is not None:
+        parser.error("--watch only updates the masters, it cannot be used "
+                     "with -n/--instances")
+    if options.watch and options.profile:
+        parser.error("--profile cannot be used with --watch")
     return options
 
 
+def parse_batch_options(args):
+    parser = argparse.ArgumentParser(prog="glyphsLib batch",
+                                     description=batch_description)
+    parser.add_argument("paths", metavar="PATH", nargs="+",
+                        help="Glyphs file or directory to search for "
+                             ".glyphs files and .glyphspackage folders.")
+    parser.add_argument("-o", "--output-dir", metavar="DIR", default="ufos",
+                        help="Output the masters and designspace of each "
+                             "source to a folder of DIR, with the path of "
+                             "the source in its directory. "
+                             "(default: %(default)s)")
+    parser.add_argument("-j", "--jobs", metavar="JOBS", type=int,
+                        default=None,
+                        help="Convert the sources in JOBS worker processes. "
+                             "(default: the number of processors)")
+    return parser.parse_args(args)
+
+
+def batch_main(args):
+    opt = parse_batch_options(args)
+    sources = find_sources(opt.paths)
+    if not sources:
+        print("No Glyphs sources found", file=sys.stderr)
+        return 1
+
+    def report(result):
+        if result.error is None:
+            print("%7.2fs  %s" % (result.seconds, result.path))
+        else:
+            print("%7.2fs  %s FAILED\n%s" % (result.seconds, result.path,
+                                            result.error.rstrip()))
+        sys.stdout.flush()
+
+    start = time.time()
+    results = convert_sources(sources, opt.output_dir, jobs=opt.jobs,
+                              callback=report)
+    failures = [result for result in results if result.error is not None]
+    print("Converted %d of %d sources in %.2fs" % (
+        len(results) - len(failures), len(results),
+        time.time() - start))
+    for result in failures:
+        print("Failed: %s" % result.path)
+    return 1 if failures else 0
+
+
+def parse_stats_options(args):
+    parser = argparse.ArgumentParser(prog="glyphsLib stats",
+                                     description=stats_description)
+    parser.add_argument("path", metavar="FILE",
+                        help="Glyphs file or .glyphspackage to load.")
+    return parser.parse_args(args)
+
+
+def stats_main(args):
+    opt = parse_stats_options(args)
+    font = glyphsLib.GSFont(opt.path)
+    # Load all the glyphs of a package
+    len(font.glyphs)
+    print(memory_report(font).format_table())
+    return 0
+
+
+COMMANDS = {
+    'batch': batch_main,
+    'stats': stats_main,
+}
+
+
 def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+    if args and args[0] in COMMANDS:
+        return COMMANDS[args[0]](args[1:])
     opt = parse_options(args)
+    stats = BuilderStats() if opt.profile else None
     if opt.glyphs is not None:
-        if opt.instances is None:
-            glyphsLib.build_masters(opt.glyphs, opt.masters)
+        if opt.watch:
+            watch_masters(opt.glyphs, opt.masters)
+        elif opt.instances is None:
+            glyphsLib.build_masters(opt.glyphs, opt.masters,
+                                    incremental=opt.incremental, stats=stats)
         else:
             glyphsLib.build_instances(opt.glyphs, opt.masters, opt.instances,
-                                      round_geometry=opt.round_instances)
+                                      round_geometry=opt.round_instances,
+                                      workers=opt.jobs,
+                                      instances=opt.include_instances,
+                                      stats=stats)
+    if stats is not None:
+        print(stats.format_table())
+
 
 if __name__ == '__main__':
-    main(sys.argv[1:])
+    sys.exit(main(sys.argv[1:]))
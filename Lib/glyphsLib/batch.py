@@ -0,0 +1,181 @@
+# Copyright 2018 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Convert many Glyphs sources to UFO masters and designspaces at once.
+
+`find_sources` lists the .glyphs files and .glyphspackage folders found in
+the given files and directories, and `convert_sources` converts them in a
+pool of worker processes. Each source is written to its own folder of the
+output directory, and a source that cannot be converted is reported without
+stopping the others.
+
+The modules used by the conversion, and the glyph data, are loaded once
+before the workers start, so that forked workers inherit them, and each
+worker converts many sources.
+"""
+
+from __future__ import (print_function, division, absolute_import,
+                        unicode_literals)
+
+from collections import namedtuple
+import logging
+import multiprocessing
+import os
+import time
+import traceback
+
+import glyphsLib
+from glyphsLib.package import PACKAGE_EXTENSION
+
+logger = logging.getLogger(__name__)
+
+GLYPHS_EXTENSION = '.glyphs'
+
+BatchResult = namedtuple('BatchResult', 'path output_dir seconds error')
+BatchResult.__doc__ = """The outcome of the conversion of one source.
+
+`error` is None if the source was converted, or else the formatted
+traceback of the exception that stopped the conversion.
+"""
+
+
+def find_sources(paths):
+    """Return the (source path, relative output path) pairs of the Glyphs
+    sources in the given files and directories.
+
+    Directories are searched recursively, except .glyphspackage folders,
+    which are sources. The relative output path is the path of the source
+    in its directory, without extension, or its name for the sources that
+    are given directly. If several sources get the same output path, a
+    number is appended to the output paths of all of them but the first
+    so that they do not overwrite each other.
+    """
+    sources = []
+    for path in paths:
+        if _is_source(path) or not os.path.isdir(path):
+            name = os.path.basename(path.rstrip('/\\'))
+            sources.append((path, os.path.splitext(name)[0]))
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files) + list(dirs):
+                if not _is_source(name):
+                    continue
+                source = os.path.join(root, name)
+                sources.append((source, os.path.splitext(
+                    os.path.relpath(source, path))[0]))
+            # Do not look for sources inside the packages
+            dirs[:] = [name for name in dirs if not _is_source(name)]
+    return _unique_output_paths(sources)
+
+
+def _unique_output_paths(sources):
+    used = set(os.path.normcase(output) for _, output in sources)
+    seen = set()
+    unique = []
+    for path, output in sources:
+        key = os.path.normcase(output)
+        if key in seen:
+            number = 2
+            while os.path.normcase('%s-%d' % (output, number)) in used:
+                number += 1
+            renamed = '%s-%d' % (output, number)
+            logger.warning('%s has the same output path as another source, '
+                           'writing it to %s', path, renamed)
+            output = renamed
+            key = os.path.normcase(output)
+            used.add(key)
+        seen.add(key)
+        unique.append((path, output))
+    return unique
+
+
+def _is_source(path):
+    path = path.rstrip('/\\')
+    return path.endswith(GLYPHS_EXTENSION) or path.endswith(PACKAGE_EXTENSION)
+
+
+def convert_source(path, output_dir, propagate_anchors=True):
+    """Write the master UFOs and the designspace of a Glyphs source to
+    output_dir. The instances of the designspace point to the instance_ufo
+    folder of output_dir.
+    """
+    glyphsLib.build_masters(
+        path, output_dir,
+        designspace_instance_dir=os.path.join(output_dir, 'instance_ufo'),
+        propagate_anchors=propagate_anchors)
+
+
+def _convert(args):
+    path, output_dir, options = args
+    start = time.time()
+    try:
+        convert_source(path, output_dir, **options)
+        error = None
+    except Exception:
+        error = traceback.format_exc()
+    return BatchResult(path, output_dir, time.time() - start, error)
+
+
+def warm_up():
+    """Load the modules and data that all the conversions use."""
+    import defcon
+    import fontTools.designspaceLib
+    from glyphsLib import glyphdata
+    glyphdata.get_glyph('A')
+
+
+def convert_sources(sources, output_dir, jobs=None, propagate_anchors=True,
+                    callback=None):
+    """Convert the (source path, relative output path) pairs returned by
+    find_sources, writing each source to its relative path in output_dir.
+
+    Args:
+        jobs: The number of worker processes. Defaults to the number of
+            processors. With 1 job, the sources are converted in this
+            process.
+        callback: If provided, it is called with the BatchResult of each
+            source as soon as it is converted.
+
+    Returns:
+        The list of the BatchResults of the sources, in the order of the
+        conversions.
+    """
+    options = dict(propagate_anchors=propagate_anchors)
+    tasks = [(path, os.path.join(output_dir, relative_path), options)
+             for path, relative_path in sources]
+    jobs = min(jobs or multiprocessing.cpu_count(), len(tasks))
+    warm_up()
+    results = []
+    if jobs > 1:
+        logger.info('Converting %d sources with %d worker processes',
+                    len(tasks), jobs)
+        # With the spawn start method, the workers have to load the modules
+        # themselves.
+        pool = multiprocessing.Pool(jobs, initializer=warm_up)
+        try:
+            for result in pool.imap_unordered(_convert, tasks):
+                results.append(result)
+                if callback is not None:
+                    callback(result)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        for task in tasks:
+            result = _convert(task)
+            results.append(result)
+            if callback is not None:
+                callback(result)
+    return results
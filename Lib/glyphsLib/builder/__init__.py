@@ -20,6 +20,7 @@ import defcon
 from fontTools.designspaceLib import DesignSpaceDocument
 
 from .builders import UFOBuilder, GlyphsBuilder
+from .timing import BuilderStats
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +30,11 @@ def to_ufos(font,
             family_name=None,
             propagate_anchors=True,
             ufo_module=defcon,
-            minimize_glyphs_diffs=False):
+            minimize_glyphs_diffs=False,
+            subset=None,
+            flatten_components=False,
+            masters=None,
+            stats=None):
     """Take a GSFont object and convert it into one UFO per master.
 
     Takes in data as Glyphs.app-compatible classes, as documented at
@@ -39,13 +44,31 @@ def to_ufos(font,
 
     If family_name is provided, the master UFOs will be given this name and
     only instances with this name will be returned.
+
+    If subset is provided, only the glyphs with these names and the glyphs
+    that they use as components are converted.
+
+    If flatten_components is True, the components that use glyphs made only
+    of components are replaced by the components of these glyphs, with the
+    transformations combined. If it is "all", all the components are
+    decomposed into outlines.
+
+    If masters is provided, a list of master IDs or names, only these masters
+    are converted.
+
+    If stats is provided, a BuilderStats, the time spent in each conversion
+    method and phase is added to it.
     """
     builder = UFOBuilder(
         font,
         ufo_module=ufo_module,
         family_name=family_name,
         propagate_anchors=propagate_anchors,
-        minimize_glyphs_diffs=minimize_glyphs_diffs)
+        minimize_glyphs_diffs=minimize_glyphs_diffs,
+        subset=subset,
+        flatten_components=flatten_components,
+        masters=masters,
+        stats=stats)
 
     result = list(builder.masters)
 
@@ -59,7 +82,11 @@ def to_designspace(font,
                    instance_dir=None,
                    propagate_anchors=True,
                    ufo_module=defcon,
-                   minimize_glyphs_diffs=False):
+                   minimize_glyphs_diffs=False,
+                   subset=None,
+                   flatten_components=False,
+                   masters=None,
+                   stats=None):
     """Take a GSFont object and convert it into a Designspace Document + UFOS.
     The UFOs are available as the attribute `font` of each SourceDescriptor of
     the DesignspaceDocument:
@@ -78,6 +105,20 @@ def to_designspace(font,
 
     If family_name is provided, the master UFOs will be given this name and
     only instances with this name will be returned.
+
+    If subset is provided, only the glyphs with these names and the glyphs
+    that they use as components are converted.
+
+    If flatten_components is True, the components that use glyphs made only
+    of components are replaced by the components of these glyphs, with the
+    transformations combined. If it is "all", all the components are
+    decomposed into outlines.
+
+    If masters is provided, a list of master IDs or names, only these masters
+    are converted.
+
+    If stats is provided, a BuilderStats, the time spent in each conversion
+    method and phase is added to it.
     """
     builder = UFOBuilder(
         font,
@@ -86,13 +127,18 @@ def to_designspace(font,
         instance_dir=instance_dir,
         propagate_anchors=propagate_anchors,
         use_designspace=True,
-        minimize_glyphs_diffs=minimize_glyphs_diffs)
+        minimize_glyphs_diffs=minimize_glyphs_diffs,
+        subset=subset,
+        flatten_components=flatten_components,
+        masters=masters,
+        stats=stats)
     return builder.designspace
 
 
 def to_glyphs(ufos_or_designspace,
               glyphs_module=classes,
-              minimize_ufo_diffs=False):
+              minimize_ufo_diffs=False,
+              stats=None):
     """
     Take a list of UFOs or a single DesignspaceDocument with attached UFOs
     and converts it into a GSFont object.
@@ -103,13 +149,18 @@ def to_glyphs(ufos_or_designspace,
     This should be the inverse function of `to_ufos` and `to_designspace`,
     so we should have to_glyphs(to_ufos(font)) == font
     and also to_glyphs(to_designspace(font)) == font
+
+    If stats is provided, a BuilderStats, the time spent in each conversion
+    method and phase is added to it.
     """
     if hasattr(ufos_or_designspace, 'sources'):
         builder = GlyphsBuilder(designspace=ufos_or_designspace,
                                 glyphs_module=glyphs_module,
-                                minimize_ufo_diffs=minimize_ufo_diffs)
+                                minimize_ufo_diffs=minimize_ufo_diffs,
+                                stats=stats)
     else:
         builder = GlyphsBuilder(ufos=ufos_or_designspace,
                                 glyphs_module=glyphs_module,
-                                minimize_ufo_diffs=minimize_ufo_diffs)
+                                minimize_ufo_diffs=minimize_ufo_diffs,
+                                stats=stats)
     return builder.font
@@ -16,6 +16,8 @@
 from __future__ import (print_function, division, absolute_import,
                         unicode_literals)
 
+from collections import OrderedDict
+
 from fontTools.misc.transform import Transform
 
 from glyphsLib.types import Point
@@ -24,85 +26,125 @@ __all__ = ['to_ufo_propagate_font_anchors']
 
 
 def to_ufo_propagate_font_anchors(self, ufo):
-    """Copy anchors from parent glyphs' components to the parent."""
-
-    processed = set()
-    for glyph in ufo:
-        _propagate_glyph_anchors(self, ufo, glyph, processed)
-
-
-def _propagate_glyph_anchors(self, ufo, parent, processed):
-    """Propagate anchors for a single parent glyph."""
-
-    if parent.name in processed:
-        return
-    processed.add(parent.name)
+    """Copy anchors from parent glyphs' components to the parent.
+
+    The glyphs are processed in the topological order of the component graph
+    of the font, which is computed once and shared by all the masters, so
+    that the components of a glyph always have their final anchors when the
+    glyph is processed. Each master only reads and writes its own UFO.
+
+    The masters are not processed in parallel: defcon fonts cannot be
+    pickled to worker processes, threads would only contend for the GIL,
+    and the propagation is already a small part of the build.
+    """
+    # glyph name -> OrderedDict(anchor name -> (x, y)), filled on demand
+    anchors = {}
+    for name in _propagation_order(self, ufo):
+        glyph = ufo[name]
+        if glyph.components:
+            _propagate_glyph_anchors(self, ufo, glyph, anchors)
+
+
+def _propagation_order(self, ufo):
+    """Return the names of the composite glyphs of the UFO, components
+    first.
+    """
+    graph = getattr(self.font, 'componentGraph', None)
+    if graph is None:
+        return list(ufo.keys())
+    order = [name for name in graph.topological_order()
+             if graph.components(name) and name in ufo]
+    # Glyphs that are not in the font, e.g. if the UFO was modified
+    order.extend(name for name in ufo.keys() if name not in graph)
+    return order
+
+
+def _anchor_dict(ufo, name, anchors):
+    """Return the anchors of a glyph as an OrderedDict of name -> (x, y),
+    or None if the glyph does not exist.
+    """
+    result = anchors.get(name)
+    if result is None and name in ufo:
+        result = OrderedDict()
+        for anchor in ufo[name].anchors:
+            if anchor.name not in result:
+                result[anchor.name] = (anchor.x, anchor.y)
+        anchors[name] = result
+    return result
+
+
+def _prefixes(names):
+    """Return the set of all the prefixes of the given names."""
+    return {name[:i] for name in names for i in range(1, len(name) + 1)}
+
+
+def _propagate_glyph_anchors(self, ufo, parent, anchors):
+    """Propagate anchors for a single parent glyph, whose components have
+    already been processed.
+    """
+    parent_anchors = _anchor_dict(ufo, parent.name, anchors)
 
     base_components = []
     mark_components = []
     anchor_names = set()
-    to_add = {}
     for component in parent.components:
-        try:
-            glyph = ufo[component.baseGlyph]
-        except KeyError:
+        glyph_anchors = _anchor_dict(ufo, component.baseGlyph, anchors)
+        if glyph_anchors is None:
             self.logger.warning(
-                'Anchors not propagated for inexistent component {} in glyph {}'.
-                format(component.baseGlyph, parent.name))
+                'Anchors not propagated for inexistent component {} in '
+                'glyph {}'.format(component.baseGlyph, parent.name))
+            continue
+        if any(name.startswith('_') for name in glyph_anchors):
+            mark_components.append((component, glyph_anchors))
         else:
-            _propagate_glyph_anchors(self, ufo, glyph, processed)
-            if any(a.name.startswith('_') for a in glyph.anchors):
-                mark_components.append(component)
-            else:
-                base_components.append(component)
-                anchor_names |= {a.name for a in glyph.anchors}
-
-    for anchor_name in anchor_names:
-        # don't add if parent already contains this anchor OR any associated
-        # ligature anchors (e.g. "top_1, top_2" for "top")
-        if not any(a.name.startswith(anchor_name) for a in parent.anchors):
-            _get_anchor_data(to_add, ufo, base_components, anchor_name)
-
-    for component in mark_components:
-        _adjust_anchors(to_add, ufo, component)
+            base_components.append((component, glyph_anchors))
+            anchor_names.update(glyph_anchors)
+
+    to_add = {}
+    # don't add if parent already contains this anchor OR any associated
+    # ligature anchors (e.g. "top_1, top_2" for "top")
+    existing = _prefixes(parent_anchors)
+    for anchor_name in sorted(anchor_names):
+        if anchor_name not in existing:
+            _get_anchor_data(to_add, base_components, anchor_name)
+
+    for component, glyph_anchors in mark_components:
+        _adjust_anchors(to_add, component, glyph_anchors)
 
     # we sort propagated anchors to append in a deterministic order
     for name, (x, y) in sorted(to_add.items()):
         anchor_dict = {'name': name, 'x': x, 'y': y}
-        parent.appendAnchor(glyph.anchorClass(anchorDict=anchor_dict))
+        parent.appendAnchor(parent.anchorClass(anchorDict=anchor_dict))
+        if name not in parent_anchors:
+            parent_anchors[name] = (x, y)
 
 
-def _get_anchor_data(anchor_data, ufo, components, anchor_name):
-    """Get data for an anchor from a list of components."""
+def _get_anchor_data(anchor_data, components, anchor_name):
+    """Get data for an anchor from a list of (component, anchor dict)."""
 
-    anchors = []
-    for component in components:
-        for anchor in ufo[component.baseGlyph].anchors:
-            if anchor.name == anchor_name:
-                anchors.append((anchor, component))
-                break
+    anchors = [(glyph_anchors[anchor_name], component)
+               for component, glyph_anchors in components
+               if anchor_name in glyph_anchors]
     if len(anchors) > 1:
-        for i, (anchor, component) in enumerate(anchors):
+        for i, (position, component) in enumerate(anchors):
             t = Transform(*component.transformation)
-            name = '%s_%d' % (anchor.name, i + 1)
-            anchor_data[name] = t.transformPoint((anchor.x, anchor.y))
+            name = '%s_%d' % (anchor_name, i + 1)
+            anchor_data[name] = t.transformPoint(position)
     elif anchors:
-        anchor, component = anchors[0]
+        position, component = anchors[0]
         t = Transform(*component.transformation)
-        anchor_data[anchor.name] = t.transformPoint((anchor.x, anchor.y))
+        anchor_data[anchor_name] = t.transformPoint(position)
 
 
-def _adjust_anchors(anchor_data, ufo, component):
+def _adjust_anchors(anchor_data, component, glyph_anchors):
     """Adjust anchors to which a mark component may have been attached."""
 
-    glyph = ufo[component.baseGlyph]
     t = Transform(*component.transformation)
-    for anchor in glyph.anchors:
+    for name, position in glyph_anchors.items():
         # only adjust if this anchor has data and the component also contains
         # the associated mark anchor (e.g. "_top" for "top")
-        if (anchor.name in anchor_data and
-                any(a.name == '_' + anchor.name for a in glyph.anchors)):
-            anchor_data[anchor.name] = t.transformPoint((anchor.x, anchor.y))
+        if name in anchor_data and '_' + name in glyph_anchors:
+            anchor_data[name] = t.transformPoint(position)
 
 
 def to_ufo_glyph_anchors(self, glyph, anchors):
@@ -27,6 +27,8 @@ from fontTools import designspaceLib
 
 from glyphsLib import classes, glyphdata_generated
 from .constants import PUBLIC_PREFIX, GLYPHS_PREFIX, FONT_CUSTOM_PARAM_PREFIX
+from .components import FLATTEN_COMPONENTS_VALUES
+from .timing import phase
 from .axes import (WEIGHT_AXIS_DEF, WIDTH_AXIS_DEF, find_base_style,
                    class_to_value)
 
@@ -56,7 +58,11 @@ class UFOBuilder(_LoggerMixin):
                  instance_dir=None,
                  propagate_anchors=True,
                  use_designspace=False,
-                 minimize_glyphs_diffs=False):
+                 minimize_glyphs_diffs=False,
+                 subset=None,
+                 flatten_components=False,
+                 masters=None,
+                 stats=None):
         """Create a builder that goes from Glyphs to UFO + designspace.
 
         Keyword arguments:
@@ -76,6 +82,22 @@ class UFOBuilder(_LoggerMixin):
         minimize_glyphs_diffs -- set to True to store extra info in UFOs
                                  in order to get smaller diffs between .glyphs
                                  .glyphs files when going glyphs->ufo->glyphs.
+        subset -- if provided, a list of glyph names: only these glyphs and
+                  the glyphs they use as components are built, and the
+                  groups, kerning and glyph order are pruned accordingly.
+                  The feature code is kept as is.
+        flatten_components -- set to True to replace the components that use
+                              purely composite glyphs by the components of
+                              these glyphs, so that no component uses a
+                              glyph that has components itself. Set to "all"
+                              to decompose all the components into outlines
+                              (after the anchors are propagated).
+        masters -- if provided, a list of master IDs or names: only these
+                   masters are built into UFOs. The glyph order, axes and
+                   designspace sources are still those of the whole family,
+                   the sources of the other masters have no `font`.
+        stats -- if provided, a BuilderStats that records the time spent in
+                 each conversion method and phase of the build.
         """
         self.font = font
         self.ufo_module = ufo_module
@@ -84,10 +106,55 @@ class UFOBuilder(_LoggerMixin):
         self.propagate_anchors = propagate_anchors
         self.use_designspace = use_designspace
         self.minimize_glyphs_diffs = minimize_glyphs_diffs
+        if flatten_components not in FLATTEN_COMPONENTS_VALUES:
+            raise ValueError(
+                'Invalid value for flatten_components: %r'
+                % (flatten_components,))
+        self.flatten_components = flatten_components
+
+        # The names of the glyphs to build, or None to build all of them.
+        self._subset = None
+        if subset is not None:
+            graph = font.componentGraph
+            self._subset = graph.closure(subset)
+            missing = sorted(name for name in self._subset
+                             if name not in graph)
+            if missing:
+                self.logger.warning(
+                    'Glyphs not found in the font: %s', ', '.join(missing))
+        self._glyphs = None
+        self._glyphs_by_name = None
+
+        # The IDs of the masters to build, or None to build all of them.
+        self._master_ids = None
+        if masters is not None:
+            self._master_ids = set()
+            for key in masters:
+                matching = [master.id for master in font.masters
+                            if key in (master.id, master.name)]
+                if not matching:
+                    raise ValueError(
+                        'No master with ID or name %r, the masters are: %s'
+                        % (key, ', '.join(master.name
+                                          for master in font.masters)))
+                self._master_ids.update(matching)
+
+        # The flattened components of the base glyphs, memoized by (master
+        # or layer key, glyph name), and the UFO glyphs to decompose once the
+        # anchors are propagated.
+        self._flattened_bases = {}
+        self._glyphs_to_decompose = []
+
+        self.stats = stats
+        if stats is not None:
+            stats.instrument(self)
 
         # The set of (SourceDescriptor + UFO)s that will be built,
         # indexed by master ID, the same order as masters in the source GSFont.
         self._sources = OrderedDict()
+        # The SourceDescriptors of the masters that are not built, with only
+        # the font info in their UFO until the designspace is complete.
+        self._skipped_sources = OrderedDict()
 
         # The designSpaceDocument object that will be built.
         # The sources will be built in any case, at the same time that we build
@@ -114,6 +181,27 @@ class UFOBuilder(_LoggerMixin):
             # instances with matching 'familyName' custom parameter
             self._do_filter_instances_by_family = True
 
+    @property
+    def glyphs(self):
+        """Get the list of the glyphs to build, in font order."""
+        if self._glyphs is None:
+            if self._subset is None:
+                self._glyphs = list(self.font.glyphs)
+            else:
+                self._glyphs = [glyph for glyph in self.font.glyphs
+                                if glyph.name in self._subset]
+        return self._glyphs
+
+    def is_glyph_built(self, glyph_name):
+        """Return whether the glyph with the given name is part of the build.
+        """
+        return self._subset is None or glyph_name in self._subset
+
+    def is_master_built(self, master_id):
+        """Return whether the master with the given ID is part of the build.
+        """
+        return self._master_ids is None or master_id in self._master_ids
+
     @property
     def masters(self):
         """Get an iterator over master UFOs that match the given family_name.
@@ -136,19 +224,35 @@ class UFOBuilder(_LoggerMixin):
         # TODO(jamesgk) maybe create one font at a time to reduce memory usage
         # TODO: (jany) in the future, return a lazy iterator that builds UFOs
         #     on demand.
-        self.to_ufo_font_attributes(self.family_name)
-
-        for glyph in self.font.glyphs:
-            for layer in glyph.layers.values():
-                if layer.associatedMasterId != layer.layerId:
-                    # The layer is not the main layer of a master
-                    # Store all layers, even the invalid ones, and just skip
-                    # them and print a warning below.
-                    supplementary_layer_data.append((glyph, layer))
-                    continue
-
-                ufo_layer = self.to_ufo_layer(glyph, layer)
-                ufo_glyph = ufo_layer.newGlyph(glyph.name)
+        with phase(self.stats, 'font attributes'):
+            self.to_ufo_font_attributes(self.family_name)
+        for master_id in list(self._sources):
+            if not self.is_master_built(master_id):
+                self._skipped_sources[master_id] = self._sources.pop(master_id)
+
+        # Create all the glyphs of the masters before drawing them: each
+        # component observes its layer, so adding a glyph after composites
+        # costs a notification per component already drawn.
+        master_glyph_data = []
+        with phase(self.stats, 'create glyphs'):
+            for glyph in self.glyphs:
+                for layer in glyph.layers.values():
+                    if not self.is_master_built(
+                            layer.associatedMasterId or layer.layerId):
+                        continue
+                    if layer.associatedMasterId != layer.layerId:
+                        # The layer is not the main layer of a master
+                        # Store all layers, even the invalid ones, and just
+                        # skip them and print a warning below.
+                        supplementary_layer_data.append((glyph, layer))
+                        continue
+
+                    ufo_layer = self.to_ufo_layer(glyph, layer)
+                    ufo_glyph = ufo_layer.newGlyph(glyph.name)
+                    master_glyph_data.append((ufo_glyph, layer, glyph))
+
+        with phase(self.stats, 'draw glyphs'):
+            for ufo_glyph, layer, glyph in master_glyph_data:
                 self.to_ufo_glyph(ufo_glyph, layer, glyph)
 
         for glyph, layer in supplementary_layer_data:
@@ -162,6 +266,9 @@ class UFOBuilder(_LoggerMixin):
                         'associated with an actual master.'.format(
                             self.font.familyName, glyph.name, layer.layerId))
                 continue
+            if not self.is_master_built(
+                    layer.associatedMasterId or layer.layerId):
+                continue
 
             if not layer.name:
                 # Empty layer names are invalid according to the UFO spec.
@@ -179,13 +286,20 @@ class UFOBuilder(_LoggerMixin):
         for source in self._sources.values():
             ufo = source.font
             if self.propagate_anchors:
-                self.to_ufo_propagate_font_anchors(ufo)
+                with phase(self.stats, 'propagate anchors'):
+                    self.to_ufo_propagate_font_anchors(ufo)
             for layer in ufo.layers:
                 self.to_ufo_layer_lib(layer)
+        if self._glyphs_to_decompose:
+            with phase(self.stats, 'decompose components'):
+                self.to_ufo_decompose_components()
 
-        self.to_ufo_features()  # This depends on the glyphOrder key
-        self.to_ufo_groups()
-        self.to_ufo_kerning()
+        with phase(self.stats, 'features'):
+            self.to_ufo_features()  # This depends on the glyphOrder key
+        with phase(self.stats, 'groups'):
+            self.to_ufo_groups()
+        with phase(self.stats, 'kerning'):
+            self.to_ufo_kerning()
 
         for source in self._sources.values():
             yield source.font
@@ -199,10 +313,13 @@ class UFOBuilder(_LoggerMixin):
             return self._designspace
         self._designspace_is_complete = True
         ufos = list(self.masters)  # Make sure that the UFOs are built
-        self.to_designspace_axes()
-        self.to_designspace_sources()
-        self.to_designspace_instances()
-        self.to_designspace_family_user_data()
+        with phase(self.stats, 'designspace'):
+            self.to_designspace_axes()
+            self.to_designspace_sources()
+            for source in self._skipped_sources.values():
+                source.font = None
+            self.to_designspace_instances()
+            self.to_designspace_family_user_data()
 
         # append base style shared by all masters to designspace file name
         base_family = self.font.familyName or 'Unnamed'
@@ -241,7 +358,8 @@ class UFOBuilder(_LoggerMixin):
     from .background_image import to_ufo_background_image
     from .blue_values import to_ufo_blue_values
     from .common import to_ufo_time
-    from .components import to_ufo_components, to_ufo_smart_component_axes
+    from .components import (to_ufo_components, to_ufo_decompose_components,
+                             to_ufo_smart_component_axes)
     from .custom_params import to_ufo_custom_params
     from .features import to_ufo_features
     from .font import to_ufo_font_attributes
@@ -276,7 +394,8 @@ class GlyphsBuilder(_LoggerMixin):
                  ufos=[],
                  designspace=None,
                  glyphs_module=classes,
-                 minimize_ufo_diffs=False):
+                 minimize_ufo_diffs=False,
+                 stats=None):
         """Create a builder that goes from UFOs + designspace to Glyphs.
 
         If you provide:
@@ -301,9 +420,14 @@ class GlyphsBuilder(_LoggerMixin):
         minimize_ufo_diffs -- set to True to store extra info in .glyphs files
                               in order to get smaller diffs between UFOs
                               when going UFOs->glyphs->UFOs
+        stats -- if provided, a BuilderStats that records the time spent in
+                 each conversion method and phase of the build.
         """
         self.glyphs_module = glyphs_module
         self.minimize_ufo_diffs = minimize_ufo_diffs
+        self.stats = stats
+        if stats is not None:
+            stats.instrument(self)
 
         if designspace is not None:
             if ufos:
@@ -337,14 +461,18 @@ class GlyphsBuilder(_LoggerMixin):
             self._font.masters.insert(len(self._font.masters), master)
             self._sources[master.id] = source
 
-            for layer in _sorted_backgrounds_last(source.font.layers):
-                self.to_glyphs_layer_lib(layer)
-                for glyph in layer:
-                    self.to_glyphs_glyph(glyph, layer, master)
+            with phase(self.stats, 'glyphs'):
+                for layer in _sorted_backgrounds_last(source.font.layers):
+                    self.to_glyphs_layer_lib(layer)
+                    for glyph in layer:
+                        self.to_glyphs_glyph(glyph, layer, master)
 
-        self.to_glyphs_features()
-        self.to_glyphs_groups()
-        self.to_glyphs_kerning()
+        with phase(self.stats, 'features'):
+            self.to_glyphs_features()
+        with phase(self.stats, 'groups'):
+            self.to_glyphs_groups()
+        with phase(self.stats, 'kerning'):
+            self.to_glyphs_kerning()
 
         # Now that all GSGlyph are built, restore the glyph order
         if self.designspace.sources:
@@ -362,10 +490,11 @@ class GlyphsBuilder(_LoggerMixin):
             for glyph in self._font.glyphs:
                 self.to_glyphs_layer_order(glyph)
 
-        self.to_glyphs_family_user_data_from_designspace()
-        self.to_glyphs_axes()
-        self.to_glyphs_sources()
-        self.to_glyphs_instances()
+        with phase(self.stats, 'designspace'):
+            self.to_glyphs_family_user_data_from_designspace()
+            self.to_glyphs_axes()
+            self.to_glyphs_sources()
+            self.to_glyphs_instances()
 
         return self._font
 
@@ -15,18 +15,37 @@
 from __future__ import (print_function, division, absolute_import,
                         unicode_literals)
 
+from fontTools.misc.transform import Transform as Affine
+
+from glyphsLib import classes
 from glyphsLib.types import Transform
 
 from .constants import GLYPHS_PREFIX
 
+FLATTEN_COMPONENTS_VALUES = (False, True, 'all')
+
 
 def to_ufo_components(self, ufo_glyph, layer):
     """Draw .glyphs components onto a pen, adding them to the parent glyph."""
     pen = ufo_glyph.getPointPen()
 
-    for component in layer.components:
-        pen.addComponent(component.name,
-                         component.transform)
+    flatten = (self.flatten_components and
+               not isinstance(layer, classes.GSBackgroundLayer))
+    if flatten:
+        components = _flattened_components(self, layer)
+    else:
+        components = [(component.name, component.transform)
+                      for component in layer.components]
+    for name, transform in components:
+        pen.addComponent(name, transform)
+
+    if flatten and self.flatten_components == 'all' and components:
+        # Decomposed after anchor propagation, which needs the components
+        self._glyphs_to_decompose.append(ufo_glyph)
+
+    if len(components) != len(layer.components):
+        # The lists below would not match the components anymore
+        return
 
     # data related to components stored in lists of booleans
     # each list's elements correspond to the components in order
@@ -36,6 +55,149 @@ def to_ufo_components(self, ufo_glyph, layer):
             ufo_glyph.lib[_lib_key(key)] = values
 
 
+def _flattened_components(self, layer):
+    """Return the components of a layer as a list of (glyph name, transform),
+    where the components that use purely composite glyphs are replaced by the
+    components of these glyphs, recursively.
+
+    The flattened components of each base glyph are memoized per master (or
+    per brace/bracket layer), so that a base glyph used by many composites is
+    only resolved once.
+    """
+    result = []
+    for component in layer.components:
+        result.extend(_flatten_component(self, layer, component, ()))
+    return result
+
+
+def _flatten_component(self, layer, component, stack):
+    transform = tuple(component.transform)
+    if not component.smartComponentValues:
+        base = _flattened_base(self, layer, component.name, stack)
+        if base is not None:
+            affine = Affine(*transform)
+            return [(name, tuple(affine.transform(base_transform)))
+                    for name, base_transform in base]
+    return [(component.name, transform)]
+
+
+def _flattened_base(self, layer, glyph_name, stack):
+    """Return the flattened components of the glyph with the given name in
+    the layer that matches `layer`, or None if that glyph is not purely
+    composite.
+    """
+    key = (_layer_key(layer), glyph_name)
+    if key in self._flattened_bases:
+        return self._flattened_bases[key]
+    if glyph_name in stack:
+        self.logger.warning(
+            'Cyclic components in glyph %s: not flattened', glyph_name)
+        return None
+
+    result = None
+    if self._glyphs_by_name is None:
+        self._glyphs_by_name = {glyph.name: glyph for glyph in self.glyphs}
+    glyph = self._glyphs_by_name.get(glyph_name)
+    base_layer = _matching_layer(glyph, layer) if glyph else None
+    if (base_layer is not None and base_layer.components and
+            not base_layer.paths and not glyph.smartComponentAxes):
+        stack += (glyph_name,)
+        result = []
+        for component in base_layer.components:
+            result.extend(_flatten_component(self, layer, component, stack))
+        result = tuple(result)
+    self._flattened_bases[key] = result
+    return result
+
+
+def _layer_key(layer):
+    if layer.layerId == layer.associatedMasterId:
+        return layer.associatedMasterId
+    return layer.associatedMasterId, layer.name
+
+
+def _matching_layer(glyph, layer):
+    """Return the layer of glyph that corresponds to the given layer of
+    another glyph: the same master layer, or the brace or bracket layer with
+    the same name, falling back to the master layer.
+    """
+    if layer.layerId != layer.associatedMasterId:
+        for candidate in glyph._layers.values():
+            if (candidate.associatedMasterId == layer.associatedMasterId and
+                    candidate.name == layer.name):
+                return candidate
+    return glyph._layers.get(layer.associatedMasterId)
+
+
+def to_ufo_decompose_components(self):
+    """Replace the components of the glyphs built with
+    flatten_components="all" by their outlines.
+
+    The outline of each base glyph is computed once per UFO layer and then
+    only transformed for each component that uses it.
+    """
+    outlines = {}
+    for ufo_glyph in self._glyphs_to_decompose:
+        ufo_layer = ufo_glyph.layer
+        default_layer = ufo_glyph.font.layers.defaultLayer
+        contours = []
+        for component in ufo_glyph.components:
+            outline = _outline(self, ufo_layer, default_layer,
+                               component.baseGlyph, outlines, ())
+            affine = Affine(*component.transformation)
+            contours.extend(
+                [(affine.transformPoint((x, y)), segment_type, smooth)
+                 for x, y, segment_type, smooth in contour]
+                for contour in outline)
+        ufo_glyph.clearComponents()
+        pen = ufo_glyph.getPointPen()
+        for contour in contours:
+            pen.beginPath()
+            for point, segment_type, smooth in contour:
+                pen.addPoint(point, segmentType=segment_type, smooth=smooth)
+            pen.endPath()
+    del self._glyphs_to_decompose[:]
+
+
+def _outline(self, ufo_layer, default_layer, glyph_name, outlines, stack):
+    """Return the decomposed outline of a glyph as a tuple of contours, each
+    contour a tuple of (x, y, segment type, smooth) points.
+
+    Glyphs that are missing from a brace or bracket layer are taken from the
+    default layer.
+    """
+    if glyph_name not in ufo_layer:
+        if glyph_name not in default_layer:
+            self.logger.warning(
+                'Component %s not found: not decomposed', glyph_name)
+            return ()
+        ufo_layer = default_layer
+    key = (id(ufo_layer), glyph_name)
+    if key in outlines:
+        return outlines[key]
+    if glyph_name in stack:
+        self.logger.warning(
+            'Cyclic components in glyph %s: not decomposed', glyph_name)
+        return ()
+
+    glyph = ufo_layer[glyph_name]
+    result = [tuple((point.x, point.y, point.segmentType, point.smooth)
+                    for point in contour)
+              for contour in glyph]
+    stack += (glyph_name,)
+    for component in glyph.components:
+        outline = _outline(self, ufo_layer, default_layer,
+                           component.baseGlyph, outlines, stack)
+        affine = Affine(*component.transformation)
+        result.extend(
+            tuple(affine.transformPoint((x, y)) + (segment_type, smooth)
+                  for x, y, segment_type, smooth in contour)
+            for contour in outline)
+    result = tuple(result)
+    outlines[key] = result
+    return result
+
+
 def to_glyphs_components(self, ufo_glyph, layer):
     for comp in ufo_glyph.components:
         component = self.glyphs_module.GSComponent(comp.baseGlyph)
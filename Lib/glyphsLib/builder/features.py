@@ -27,6 +27,7 @@ import re
 
 import glyphsLib
 from .constants import GLYPHLIB_PREFIX, PUBLIC_PREFIX
+from .timing import phase
 
 
 ANONYMOUS_FEATURE_PREFIX_NAME = '<anonymous>'
@@ -92,7 +93,8 @@ def _to_ufo_features(self, master, ufo):
     # Don't add a GDEF when planning to round-trip
     gdef_str = None
     if not self.minimize_glyphs_diffs:
-        gdef_str = _build_gdef(ufo)
+        with phase(self.stats, 'GDEF'):
+            gdef_str = _build_gdef(ufo)
 
     # make sure feature text is a unicode string, for defcon
     full_text = '\n\n'.join(
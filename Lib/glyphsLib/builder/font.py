@@ -50,7 +50,7 @@ def to_ufo_font_attributes(self, family_name):
     manufacturer = font.manufacturer
     manufacturer_url = font.manufacturerURL
     note = font.note
-    glyph_order = list(glyph.name for glyph in font.glyphs)
+    glyph_order = list(glyph.name for glyph in self.glyphs)
 
     for index, master in enumerate(font.masters):
         source = self._designspace.newSourceDescriptor()
@@ -39,7 +39,9 @@ def to_ufo_groups(self):
         for gsclass in self.font.classes.values():
             if gsclass.name in group_names:
                 if gsclass.code:
-                    groups[gsclass.name] = gsclass.code.split(' ')
+                    groups[gsclass.name] = [
+                        glyph_name for glyph_name in gsclass.code.split(' ')
+                        if self.is_glyph_built(glyph_name)]
                 else:
                     # Empty group: using split like above would produce ['']
                     groups[gsclass.name] = []
@@ -57,6 +59,8 @@ def to_ufo_groups(self):
                 # Restore empty group
                 groups[group] = []
             for glyph_name in glyphs:
+                if not self.is_glyph_built(glyph_name):
+                    continue
                 # Check that the original value is still valid
                 match = UFO_KERN_GROUP_PATTERN.match(group)
                 side = match.group(1)
@@ -70,8 +74,14 @@ def to_ufo_groups(self):
                     # Thus the original position in the list is preserved
                     recovered.add((glyph_name, int(side)))
 
+    if self._subset is not None:
+        # Drop the kerning groups that lost all their glyphs in the subset
+        for name in [name for name, glyphs in groups.items()
+                     if not glyphs and _is_kerning_group(name)]:
+            del groups[name]
+
     # Read modified grouping values
-    for glyph in self.font.glyphs.values():
+    for glyph in self.glyphs:
         for side in 1, 2:
             if (glyph.name, side) not in recovered:
                 attr = _glyph_kerning_attr(glyph, side)
@@ -16,6 +16,8 @@ from __future__ import (print_function, division, absolute_import,
                         unicode_literals)
 
 from collections import OrderedDict
+import copy
+from fnmatch import fnmatchcase
 import os
 import logging
 
@@ -30,6 +32,10 @@ from .axes import (get_axis_definitions, is_instance_active, interp,
 from .custom_params import to_ufo_custom_params
 
 import defcon
+try:
+    from fontTools import ufoLib
+except ImportError:
+    import ufoLib
 
 EXPORT_KEY = GLYPHS_PREFIX + 'export'
 WIDTH_KEY = GLYPHS_PREFIX + 'width'
@@ -320,17 +326,60 @@ def set_width_class(ufo, designspace, instance):
     _set_class_from_instance(ufo, designspace, instance, "wdth")
 
 
+def instance_matches(instance, pattern):
+    """Return whether a designspace instance descriptor matches a pattern: a
+    style name, a full name (family and style), or a file name with or
+    without its directory and its ".ufo" extension (the `fileName` custom
+    parameter of a Glyphs instance), or a shell-style glob of one of these.
+    """
+    candidates = [instance.styleName, instance.name]
+    if instance.filename is not None:
+        filename = instance.filename.replace(os.sep, '/')
+        basename = os.path.basename(filename)
+        candidates.extend((filename, basename, os.path.splitext(basename)[0]))
+    return any(fnmatchcase(candidate, pattern)
+               for candidate in candidates if candidate is not None)
+
+
+def select_instances(designspace, patterns):
+    """Return the instance descriptors of a designspace that match any of the
+    given patterns (see `instance_matches`), in designspace order. Warns
+    about the patterns that match no instance.
+    """
+    patterns = list(patterns)
+    selected = []
+    matched = set()
+    for instance in designspace.instances:
+        matching = [pattern for pattern in patterns
+                    if instance_matches(instance, pattern)]
+        if matching:
+            selected.append(instance)
+            matched.update(matching)
+    for pattern in patterns:
+        if pattern not in matched:
+            logger.warning('No instance matches %r', pattern)
+    return selected
+
+
 def apply_instance_data(designspace_path, include_filenames=None,
-                        Font=defcon.Font):
+                        Font=defcon.Font, include_instances=None):
     """Open UFO instances referenced by designspace, apply Glyphs instance
     data if present, re-save UFOs and return updated UFO Font objects.
 
+    The instance data only changes the font info, the lib and the features,
+    so only fontinfo.plist, lib.plist and features.fea are read, and only
+    those that changed are written back: the glyphs are left untouched.
+
     Args:
         designspace_path: path to a designspace file.
         include_filenames: optional set of instance filenames (relative to
             the designspace path) to be included. By default all instaces are
             processed.
         Font: the class used to load the UFO (default: defcon.Font).
+        include_instances: optional list of style names, file names or globs
+            of the instances to be included (see `instance_matches`). Only
+            the instances that are also in include_filenames, if given, are
+            processed.
     Returns:
         List of opened and updated instance UFOs.
     """
@@ -353,7 +402,10 @@ def apply_instance_data(designspace_path, include_filenames=None,
     if include_filenames is not None:
         include_filenames = {normcase(normpath(p))
                              for p in include_filenames}
-    for designspace_instance in designspace.instances:
+    instances = designspace.instances
+    if include_instances is not None:
+        instances = select_instances(designspace, include_instances)
+    for designspace_instance in instances:
         fname = designspace_instance.filename
         assert fname is not None, ("instance %r missing required filename" %
                 getattr(designspace_instance, "name", designspace_instance))
@@ -365,18 +417,82 @@ def apply_instance_data(designspace_path, include_filenames=None,
         # fontmake <= 1.4.0 compares the ufo paths returned from this function
         # to the keys of a dict of designspace locations that have been passed
         # through normpath (but not normcase). We do the same.
-        ufo = Font(normpath(os.path.join(basedir, fname)))
-
-        set_weight_class(ufo, designspace, designspace_instance)
-        set_width_class(ufo, designspace, designspace_instance)
-
-        glyphs_instance = InstanceDescriptorAsGSInstance(designspace_instance)
-        to_ufo_custom_params(None, ufo, glyphs_instance)
+        path = normpath(os.path.join(basedir, fname))
+        ufo = _UFOInfoLibAndFeatures(path)
+        apply_instance_data_to_ufo(ufo, designspace_instance, designspace)
         ufo.save()
-        instance_ufos.append(ufo)
+        instance_ufos.append(Font(path))
     return instance_ufos
 
 
+class _FontInfo(object):
+    """A bare font info object that ufoLib reads and writes."""
+
+    def __init__(self):
+        for name in ufoLib.fontInfoAttributesVersion3:
+            setattr(self, name, None)
+
+    def as_dict(self):
+        return {name: getattr(self, name)
+                for name in ufoLib.fontInfoAttributesVersion3}
+
+
+class _Features(object):
+
+    def __init__(self, text):
+        self.text = text
+
+
+class _UFOInfoLibAndFeatures(object):
+    """The parts of a UFO on disk that the instance data can change, read
+    and written without loading the rest of the UFO.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        reader = ufoLib.UFOReader(path)
+        self._format_version = reader.formatVersion
+        self.info = _FontInfo()
+        reader.readInfo(self.info)
+        self.lib = reader.readLib()
+        self.features = _Features(reader.readFeatures())
+        self._original = (self.info.as_dict(), copy.deepcopy(self.lib),
+                          self.features.text)
+
+    def save(self):
+        info, lib, features = self._original
+        changed_info = self.info.as_dict() != info
+        changed_lib = self.lib != lib
+        changed_features = self.features.text != features
+        if not (changed_info or changed_lib or changed_features):
+            return
+        writer = ufoLib.UFOWriter(self.path,
+                                  formatVersion=self._format_version)
+        if changed_info:
+            writer.writeInfo(self.info)
+        if changed_lib:
+            writer.writeLib(self.lib)
+        if changed_features:
+            writer.writeFeatures(self.features.text)
+        writer.setModificationTime()
+
+
+def apply_instance_data_to_ufo(ufo, instance, designspace):
+    """Apply the Glyphs instance data stored in a designspace instance
+    descriptor to an instance UFO, in memory.
+
+    Args:
+        ufo: the instance UFO (a defcon.Font or similar).
+        instance: its designspace InstanceDescriptor.
+        designspace: the DesignSpaceDocument that holds the descriptor.
+    """
+    set_weight_class(ufo, designspace, instance)
+    set_width_class(ufo, designspace, instance)
+
+    glyphs_instance = InstanceDescriptorAsGSInstance(instance)
+    to_ufo_custom_params(None, ufo, glyphs_instance)
+
+
 # DEPRECATED: supports deprecated APIs
 class InstanceData(list):
     """A list wrapper that also holds a reference to a designspace.
@@ -15,6 +15,7 @@
 from __future__ import (print_function, division, absolute_import,
                         unicode_literals)
 
+from collections import OrderedDict
 import re
 
 UFO_KERN_GROUP_PATTERN = re.compile('^public\\.kern([12])\\.(.*)$')
@@ -22,7 +23,33 @@ UFO_KERN_GROUP_PATTERN = re.compile('^public\\.kern([12])\\.(.*)$')
 
 def to_ufo_kerning(self):
     for master_id, kerning in self.font.kerning.items():
-        _to_ufo_kerning(self, self._sources[master_id].font, kerning)
+        if not self.is_master_built(master_id):
+            continue
+        ufo = self._sources[master_id].font
+        if self._subset is not None:
+            kerning = _subset_kerning(self, ufo, kerning)
+        _to_ufo_kerning(self, ufo, kerning)
+
+
+def _subset_kerning(self, ufo, kerning_data):
+    """Return the kerning pairs between glyphs of the subset and groups that
+    still exist in the UFO.
+    """
+    def keep(key, side):
+        match = re.match(r'@MMK_%s_(.+)' % side, key)
+        if match:
+            return 'public.kern%s.%s' % ('1' if side == 'L' else '2',
+                                         match.group(1)) in ufo.groups
+        return self.is_glyph_built(key)
+
+    subset = OrderedDict()
+    for left, pairs in kerning_data.items():
+        if keep(left, 'L'):
+            pairs = OrderedDict((right, value) for right, value in pairs.items()
+                                if keep(right, 'R'))
+            if pairs:
+                subset[left] = pairs
+    return subset
 
 
 def _to_ufo_kerning(self, ufo, kerning_data):
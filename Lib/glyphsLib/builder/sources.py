@@ -35,7 +35,12 @@ def to_designspace_sources(self):
 
 
 def _to_designspace_source(self, master, is_regular):
-    source = self._sources[master.id]
+    sources = list(self._sources.values()) + list(
+        self._skipped_sources.values())
+    if master.id in self._sources:
+        source = self._sources[master.id]
+    else:
+        source = self._skipped_sources[master.id]
     ufo = source.font
 
     if is_regular:
@@ -61,7 +66,7 @@ def _to_designspace_source(self, master, is_regular):
         # happen to have the same weight name.
         n = "_"
         while any(s is not source and s.filename == source.filename
-                  for s in self._sources.values()):
+                  for s in sources):
             source.filename = os.path.basename(
                 build_ufo_path('', source.familyName, source.styleName + n))
             n += "_"
@@ -0,0 +1,162 @@
+# Copyright 2018 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Opt-in timing of the stages of a build.
+
+A BuilderStats given to a UFOBuilder or a GlyphsBuilder records the wall
+time and the number of calls of each of the builder's to_ufo_*,
+to_designspace_* and to_glyphs_* methods, and of the top-level phases of
+the build (building the glyphs, propagating the anchors, the features...).
+The times of the methods are cumulative: they include the methods that they
+call.
+
+The methods are only wrapped on the builders that have stats, the other
+builders run the plain methods.
+"""
+
+from __future__ import (print_function, division, absolute_import,
+                        unicode_literals)
+
+from collections import OrderedDict
+import functools
+from timeit import default_timer
+
+METHOD_PREFIXES = ('to_ufo_', 'to_designspace_', 'to_glyphs_')
+
+
+class Timing(object):
+    """The number of calls and the total wall time of a method or phase."""
+
+    __slots__ = ('calls', 'seconds', '_depth')
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self._depth = 0
+
+    def __repr__(self):
+        return '<%s calls=%d seconds=%.6f>' % (
+            self.__class__.__name__, self.calls, self.seconds)
+
+
+class _PhaseTimer(object):
+    def __init__(self, timing):
+        self.timing = timing
+
+    def __enter__(self):
+        self.timing.calls += 1
+        self.timing._depth += 1
+        self._start = default_timer()
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.timing._depth -= 1
+        # Only the outermost of nested phases with the same name counts
+        if not self.timing._depth:
+            self.timing.seconds += default_timer() - self._start
+
+
+class _NoPhaseTimer(object):
+    def __enter__(self):
+        pass
+
+    def __exit__(self, exc_type, exc_value, tb):
+        pass
+
+
+_NO_PHASE_TIMER = _NoPhaseTimer()
+
+
+def phase(stats, name):
+    """Return a context manager that times a phase in stats, or does nothing
+    if stats is None.
+    """
+    if stats is None:
+        return _NO_PHASE_TIMER
+    return stats.phase(name)
+
+
+class BuilderStats(object):
+    """The timings of the methods and phases of one or more builds.
+
+    `methods` maps the method names to their Timing, and `phases` the phase
+    names, in the order in which the phases first ran.
+    """
+
+    def __init__(self):
+        self.methods = {}
+        self.phases = OrderedDict()
+
+    def phase(self, name):
+        """Return a context manager that adds the time spent in its block to
+        the phase with the given name.
+        """
+        timing = self.phases.get(name)
+        if timing is None:
+            timing = self.phases[name] = Timing()
+        return _PhaseTimer(timing)
+
+    def instrument(self, builder):
+        """Replace the conversion methods of the builder by wrappers that
+        record their timings.
+        """
+        for name in dir(type(builder)):
+            if not name.startswith(METHOD_PREFIXES):
+                continue
+            method = getattr(builder, name)
+            if callable(method):
+                setattr(builder, name, self._timed(name, method))
+
+    def _timed(self, name, method):
+        timing = self.methods.get(name)
+        if timing is None:
+            timing = self.methods[name] = Timing()
+
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            timing.calls += 1
+            if timing._depth:
+                # A recursive call, already timed by the outermost one
+                return method(*args, **kwargs)
+            timing._depth += 1
+            start = default_timer()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                timing.seconds += default_timer() - start
+                timing._depth -= 1
+        return timed
+
+    def format_table(self):
+        """Return the timings as a table, the phases in the order in which
+        they ran, then the methods that were called, slowest first.
+        """
+        lines = []
+        rows = [('Phase', self.phases.items()),
+                ('Method', sorted(
+                    ((name, timing) for name, timing in self.methods.items()
+                     if timing.calls),
+                    key=lambda item: (-item[1].seconds, item[0])))]
+        width = max([len(name) for name in self.phases] +
+                    [len(name) for name in self.methods] + [6])
+        for title, items in rows:
+            if lines:
+                lines.append('')
+            lines.append('%-*s %10s %10s %12s' % (
+                width, title, 'calls', 'seconds', 'ms per call'))
+            for name, timing in items:
+                lines.append('%-*s %10d %10.3f %12.3f' % (
+                    width, name, timing.calls, timing.seconds,
+                    1000 * timing.seconds / timing.calls
+                    if timing.calls else 0))
+        return '\n'.join(lines)
@@ -30,6 +30,10 @@ from glyphsLib.types import (
     floatToString, readIntlist, writeIntlist, UnicodesList)
 from glyphsLib.parser import Parser
 from glyphsLib.writer import Writer, escape_string
+from glyphsLib.package import (
+    GlyphsPackageReader, is_package_path, write_package)
+from glyphsLib.fingerprint import glyph_fingerprint, font_fingerprints
+from glyphsLib.componentgraph import ComponentGraph
 from collections import OrderedDict
 from fontTools.misc.py23 import unicode, basestring, UnicodeIO, unichr, open
 from glyphsLib.affine import Affine
@@ -269,6 +273,12 @@ class GSBase(object):
                 key = self._wrapperKeysTranslate.get(key, key)
                 setattr(self, key, value)
 
+    def __getstate__(self):
+        # The cached proxies point to this object: copies and unpickled
+        # objects make their own.
+        return {key: value for key, value in self.__dict__.items()
+                if not isinstance(value, Proxy)}
+
     def __repr__(self):
         content = ""
         if hasattr(self, "_dict"):
@@ -321,7 +331,83 @@ class GSBase(object):
         return True
 
 
+class GlyphContent(object):
+    """Mixin for the objects that make up a glyph.
+
+    The setters of their content, see `content_property`, and the proxies
+    that add or remove objects invalidate the cached fingerprint of the
+    glyph, and the component graph of the font if the change affects it.
+
+    Changes made in place to value objects (e.g. `node.position.x = 10`)
+    are not detected; assign a new value instead.
+    """
+    # The attribute that holds the object that contains this one.
+    _ownerAttribute = "_parent"
+
+
+_missing = object()
+
+
+def content_property(name, component_graph=False):
+    """Return a property for the attribute `name` of a GlyphContent, whose
+    setter invalidates the fingerprint of the glyph, and the component graph
+    of the font if component_graph is True. The value stays in the instance
+    dictionary under the same name.
+    """
+
+    def getter(self):
+        value = self.__dict__.get(name, _missing)
+        if value is _missing:
+            raise AttributeError(name)
+        return value
+
+    def setter(self, value):
+        self.__dict__[name] = value
+        invalidate_fingerprint(self)
+        if component_graph:
+            invalidate_component_graph(self)
+
+    return property(getter, setter)
+
+
+def _owner_glyph(obj):
+    """Return the GSGlyph that contains obj, or None."""
+    while isinstance(obj, GlyphContent):
+        if isinstance(obj, GSGlyph):
+            return obj
+        obj = obj.__dict__.get(obj._ownerAttribute)
+    return None
+
+
+def invalidate_fingerprint(obj):
+    """Forget the cached fingerprint of the glyph that contains obj."""
+    glyph = _owner_glyph(obj)
+    if glyph is not None and glyph.__dict__.get("_fingerprint") is not None:
+        glyph.__dict__["_fingerprint"] = None
+
+
+def invalidate_component_graph(obj):
+    """Forget the component graph of the font that contains obj."""
+    glyph = _owner_glyph(obj)
+    font = glyph.__dict__.get("parent") if glyph is not None else None
+    if font is not None:
+        font._componentGraph = None
+
+
+def invalidate_layer_order(glyph):
+    """Forget the cached order of the layers of a glyph, see
+    GSGlyph._orderedLayers.
+    """
+    if glyph is not None:
+        glyph.__dict__.pop("_layerOrder", None)
+
+
 class Proxy(object):
+    # The proxies only hold their owner, which keeps small the ones that
+    # proxy_property caches on every node and path. The subclasses must
+    # declare empty __slots__ too.
+    __slots__ = ("_owner",)
+
     def __init__(self, owner):
         self._owner = owner
 
@@ -375,11 +461,39 @@ class Proxy(object):
             raise TypeError
 
 
+def proxy_property(proxy_class):
+    """Return a property whose getter returns a proxy_class of the object,
+    created on first access and then reused, and whose setter replaces the
+    proxied values.
+    """
+    key = "_" + proxy_class.__name__
+
+    def getter(self):
+        proxy = self.__dict__.get(key)
+        if proxy is None:
+            proxy = self.__dict__[key] = proxy_class(self)
+        return proxy
+
+    def setter(self, values):
+        # GSBase.__init__ and the parser set all the lists: only the objects
+        # that are read keep a proxy.
+        proxy = self.__dict__.get(key)
+        if proxy is None:
+            proxy = proxy_class(self)
+        proxy.setter(values)
+
+    return property(getter, setter)
+
+
 class LayersIterator:
+    """Iterate over the layers of a glyph in the order of
+    GSGlyph._orderedLayers, as they were when the iteration started.
+    """
+
     def __init__(self, owner):
         self.curInd = 0
         self._owner = owner
-        self._orderedLayers = None
+        self._orderedLayers = owner._orderedLayers()
 
     def __iter__(self):
         return self
@@ -388,38 +502,14 @@ class LayersIterator:
         return self.__next__()
 
     def __next__(self):
-        if self._owner.parent:
-            if self.curInd >= len(self._owner.layers):
-                raise StopIteration
-            item = self.orderedLayers[self.curInd]
-        else:
-            if self.curInd >= len(self._owner._layers):
-                raise StopIteration
-            item = self._owner._layers[self.curInd]
+        if self.curInd >= len(self._orderedLayers):
+            raise StopIteration
+        item = self._orderedLayers[self.curInd]
         self.curInd += 1
         return item
 
     @property
     def orderedLayers(self):
-        if not self._orderedLayers:
-            glyphLayerIds = [
-                l.associatedMasterId
-                for l in self._owner._layers.values()
-                if l.associatedMasterId == l.layerId
-            ]
-            masterIds = [m.id for m in self._owner.parent.masters]
-            intersectedLayerIds = set(glyphLayerIds) & set(masterIds)
-            orderedLayers = [
-                self._owner._layers[m.id]
-                for m in self._owner.parent.masters
-                if m.id in intersectedLayerIds
-            ]
-            orderedLayers += [
-                self._owner._layers[l.layerId]
-                for l in self._owner._layers.values()
-                if l.layerId not in intersectedLayerIds
-            ]
-            self._orderedLayers = orderedLayers
         return self._orderedLayers
 
 
@@ -431,6 +521,9 @@ class FontFontMasterProxy(Proxy):
         for master in Font.masters:
         ...
     """
+
+    __slots__ = ()
+
     def __getitem__(self, Key):
         if type(Key) == slice:
             return self.values().__getitem__(Key)
@@ -460,6 +553,7 @@ class FontFontMasterProxy(Proxy):
             self._owner._masters[Index] = FontMaster
         else:
             raise(KeyError)
+        self._owner._mastersChanged()
 
     def __delitem__(self, Key):
         if type(Key) is int:
@@ -478,6 +572,7 @@ class FontFontMasterProxy(Proxy):
         if not FontMaster.id:
             FontMaster.id = str(uuid.uuid4()).upper()
         self._owner._masters.append(FontMaster)
+        self._owner._mastersChanged()
 
         # Cycle through all glyphs and append layer
         for glyph in self._owner.glyphs:
@@ -495,10 +590,12 @@ class FontFontMasterProxy(Proxy):
                     glyph.layers.remove(layer)
 
         self._owner._masters.remove(FontMaster)
+        self._owner._mastersChanged()
 
     def insert(self, Index, FontMaster):
         FontMaster.font = self._owner
         self._owner._masters.insert(Index, FontMaster)
+        self._owner._mastersChanged()
 
     def extend(self, FontMasters):
         for FontMaster in FontMasters:
@@ -510,6 +607,7 @@ class FontFontMasterProxy(Proxy):
         self._owner._masters = values
         for m in self._owner._masters:
             m.font = self._owner
+        self._owner._mastersChanged()
 
 
 class FontGlyphsProxy(Proxy):
@@ -520,6 +618,9 @@ class FontGlyphsProxy(Proxy):
         for glyph in Font.glyphs:
         ...
     """
+
+    __slots__ = ()
+
     def __getitem__(self, key):
         if type(key) == slice:
             return self.values().__getitem__(key)
@@ -537,12 +638,14 @@ class FontGlyphsProxy(Proxy):
         if type(key) is int:
             self._owner._setupGlyph(glyph)
             self._owner._glyphs[key] = glyph
+            self._owner._componentGraph = None
         else:
             raise KeyError  # TODO: add other access methods
 
     def __delitem__(self, key):
         if type(key) is int:
-            del(self._owner._glyph[key])
+            del(self._owner._glyphs[key])
+            self._owner._componentGraph = None
         else:
             raise KeyError  # TODO: add other access methods
 
@@ -553,6 +656,16 @@ class FontGlyphsProxy(Proxy):
 
     def _get_glyph_by_string(self, key):
         # FIXME: (jany) looks inefficient
+        reader = self._owner._glyphs_reader
+        if reader is not None and isinstance(key, basestring):
+            # Don't load all the glyphs of a package to get one by name
+            glyph = reader.glyph(key)
+            if glyph is not None:
+                if glyph.parent is not self._owner:
+                    # The reader keeps the glyph until all the glyphs are
+                    # loaded into the font, see `GlyphsPackageReader.glyphs`
+                    self._owner._setupGlyph(glyph)
+                return glyph
         if isinstance(key, basestring):
             # by glyph name
             for glyph in self._owner._glyphs:
@@ -583,11 +696,13 @@ class FontGlyphsProxy(Proxy):
     def append(self, glyph):
         self._owner._setupGlyph(glyph)
         self._owner._glyphs.append(glyph)
+        self._owner._componentGraph = None
 
     def extend(self, objects):
         for glyph in objects:
             self._owner._setupGlyph(glyph)
         self._owner._glyphs.extend(list(objects))
+        self._owner._componentGraph = None
 
     def __len__(self):
         return len(self._owner._glyphs)
@@ -606,6 +721,7 @@ class FontGlyphsProxy(Proxy):
 
 
 class FontClassesProxy(Proxy):
+    __slots__ = ()
 
     def __getitem__(self, key):
         if isinstance(key, (slice, int)):
@@ -666,6 +782,8 @@ class FontClassesProxy(Proxy):
 
 
 class GlyphLayerProxy(Proxy):
+    __slots__ = ()
+
     def __getitem__(self, key):
         self._ensureMasterLayers()
         if isinstance(key, slice):
@@ -693,6 +811,7 @@ class GlyphLayerProxy(Proxy):
             self._owner._layers[key] = layer
         else:
             raise KeyError
+        self._changed()
 
     def __delitem__(self, key):
         if isinstance(key, int) and self._owner.parent:
@@ -701,8 +820,10 @@ class GlyphLayerProxy(Proxy):
             Layer = self.__getitem__(key)
             key = Layer.layerId
         del(self._owner._layers[key])
+        self._changed()
 
     def __iter__(self):
+        self._ensureMasterLayers()
         return LayersIterator(self._owner)
 
     def __len__(self):
@@ -726,6 +847,7 @@ class GlyphLayerProxy(Proxy):
             layer.layerId = str(uuid.uuid4()).upper()
         self._owner._setupLayer(layer, layer.layerId)
         self._owner._layers[layer.layerId] = layer
+        self._changed()
 
     def extend(self, layers):
         for layer in layers:
@@ -753,6 +875,12 @@ class GlyphLayerProxy(Proxy):
         for (key, layer) in newLayers.items():
             self._owner._setupLayer(layer, key)
         self._owner._layers = newLayers
+        self._changed()
+
+    def _changed(self):
+        invalidate_fingerprint(self._owner)
+        invalidate_component_graph(self._owner)
+        invalidate_layer_order(self._owner)
 
     def _ensureMasterLayers(self):
         # Ensure existence of master-linked layers (even for iteration, len() etc.) if accidentally deleted
@@ -773,6 +901,7 @@ class GlyphLayerProxy(Proxy):
 
 
 class LayerAnchorsProxy(Proxy):
+    __slots__ = ()
 
     def __getitem__(self, key):
         if isinstance(key, (slice, int)):
@@ -787,12 +916,14 @@ class LayerAnchorsProxy(Proxy):
     def __setitem__(self, key, anchor):
         if isinstance(key, (str, unicode)):
             anchor.name = key
+            anchor._parent = self._owner
             for i, a in enumerate(self._owner._anchors):
                 if a.name == key:
                     self._owner._anchors[i] = anchor
-                    return
-            anchor._parent = self._owner
-            self._owner._anchors.append(anchor)
+                    break
+            else:
+                self._owner._anchors.append(anchor)
+            invalidate_fingerprint(self._owner)
         else:
             raise TypeError
 
@@ -804,7 +935,8 @@ class LayerAnchorsProxy(Proxy):
                 if a.name == key:
                     self._owner._anchors[i]._parent = None
                     del self._owner._anchors[i]
-                    return
+                    break
+        invalidate_fingerprint(self._owner)
 
     def values(self):
         return self._owner._anchors
@@ -814,25 +946,30 @@ class LayerAnchorsProxy(Proxy):
             if a.name == anchor.name:
                 anchor._parent = self._owner
                 self._owner._anchors[i] = anchor
-                return
-        if anchor.name:
-            self._owner._anchors.append(anchor)
+                break
         else:
-            raise ValueError("Anchor must have name")
+            if not anchor.name:
+                raise ValueError("Anchor must have name")
+            anchor._parent = self._owner
+            self._owner._anchors.append(anchor)
+        invalidate_fingerprint(self._owner)
 
     def extend(self, anchors):
         for anchor in anchors:
             anchor._parent = self._owner
         self._owner._anchors.extend(anchors)
+        invalidate_fingerprint(self._owner)
 
     def remove(self, anchor):
         if isinstance(anchor, (str, unicode)):
             anchor = self.values()[anchor]
-        return self._owner._anchors.remove(anchor)
+        self._owner._anchors.remove(anchor)
+        invalidate_fingerprint(self._owner)
 
     def insert(self, index, anchor):
         anchor._parent = self._owner
         self._owner._anchors.insert(index, anchor)
+        invalidate_fingerprint(self._owner)
 
     def __len__(self):
         return len(self._owner._anchors)
@@ -843,9 +980,12 @@ class LayerAnchorsProxy(Proxy):
         self._owner._anchors = anchors
         for anchor in anchors:
             anchor._parent = self._owner
+        invalidate_fingerprint(self._owner)
 
 
 class IndexedObjectsProxy(Proxy):
+    __slots__ = ()
+
     def __getitem__(self, key):
         if isinstance(key, (slice, int)):
             return self.values().__getitem__(key)
@@ -856,12 +996,14 @@ class IndexedObjectsProxy(Proxy):
         if isinstance(key, int):
             self.values()[key] = value
             value._parent = self._owner
+            self._changed()
         else:
             raise KeyError
 
     def __delitem__(self, key):
         if isinstance(key, int):
             del self.values()[key]
+            self._changed()
         else:
             raise KeyError
 
@@ -871,18 +1013,22 @@ class IndexedObjectsProxy(Proxy):
     def append(self, value):
         self.values().append(value)
         value._parent = self._owner
+        self._changed()
 
     def extend(self, values):
         self.values().extend(values)
         for value in values:
             value._parent = self._owner
+        self._changed()
 
     def remove(self, value):
         self.values().remove(value)
+        self._changed()
 
     def insert(self, index, value):
         self.values().insert(index, value)
         value._parent = self._owner
+        self._changed()
 
     def __len__(self):
         return len(self.values())
@@ -891,10 +1037,15 @@ class IndexedObjectsProxy(Proxy):
         setattr(self._owner, self._objects_name, list(values))
         for value in self.values():
             value._parent = self._owner
+        self._changed()
+
+    def _changed(self):
+        invalidate_fingerprint(self._owner)
 
 
 class LayerPathsProxy(IndexedObjectsProxy):
     _objects_name = "_paths"
+    __slots__ = ()
 
     def __init__(self, owner):
         super(LayerPathsProxy, self).__init__(owner)
@@ -902,6 +1053,7 @@ class LayerPathsProxy(IndexedObjectsProxy):
 
 class LayerHintsProxy(IndexedObjectsProxy):
     _objects_name = "_hints"
+    __slots__ = ()
 
     def __init__(self, owner):
         super(LayerHintsProxy, self).__init__(owner)
@@ -909,13 +1061,19 @@ class LayerHintsProxy(IndexedObjectsProxy):
 
 class LayerComponentsProxy(IndexedObjectsProxy):
     _objects_name = "_components"
+    __slots__ = ()
 
     def __init__(self, owner):
         super(LayerComponentsProxy, self).__init__(owner)
 
+    def _changed(self):
+        super(LayerComponentsProxy, self)._changed()
+        invalidate_component_graph(self._owner)
+
 
 class LayerAnnotationProxy(IndexedObjectsProxy):
     _objects_name = "_annotations"
+    __slots__ = ()
 
     def __init__(self, owner):
         super(LayerAnnotationProxy, self).__init__(owner)
@@ -923,6 +1081,7 @@ class LayerAnnotationProxy(IndexedObjectsProxy):
 
 class LayerGuideLinesProxy(IndexedObjectsProxy):
     _objects_name = "_guides"
+    __slots__ = ()
 
     def __init__(self, owner):
         super(LayerGuideLinesProxy, self).__init__(owner)
@@ -930,12 +1089,15 @@ class LayerGuideLinesProxy(IndexedObjectsProxy):
 
 class PathNodesProxy(IndexedObjectsProxy):
     _objects_name = "_nodes"
+    __slots__ = ()
 
     def __init__(self, owner):
         super(PathNodesProxy, self).__init__(owner)
 
 
 class CustomParametersProxy(Proxy):
+    __slots__ = ()
+
     def __getitem__(self, key):
         if isinstance(key, slice):
             return self.values().__getitem__(key)
@@ -1013,6 +1175,7 @@ class CustomParametersProxy(Proxy):
 
 
 class UserDataProxy(Proxy):
+    __slots__ = ()
 
     def __getitem__(self, key):
         if self._owner._userData is None:
@@ -1026,10 +1189,12 @@ class UserDataProxy(Proxy):
             self._owner._userData[key] = value
         else:
             self._owner._userData = {key: value}
+        invalidate_fingerprint(self._owner)
 
     def __delitem__(self, key):
         if self._owner._userData is not None and key in self._owner._userData:
             del self._owner._userData[key]
+            invalidate_fingerprint(self._owner)
 
     def __contains__(self, item):
         if self._owner._userData is None:
@@ -1061,6 +1226,7 @@ class UserDataProxy(Proxy):
 
     def setter(self, values):
         self._owner._userData = values
+        invalidate_fingerprint(self._owner)
 
 
 class GSCustomParameter(GSBase):
@@ -1177,7 +1343,7 @@ class GSAlignmentZone(GSBase):
             (floatToString(self.position), floatToString(self.size))
 
 
-class GSGuideLine(GSBase):
+class GSGuideLine(GlyphContent, GSBase):
     _classesForName = {
         "alignment": str,
         "angle": float,
@@ -1192,6 +1358,14 @@ class GSGuideLine(GSBase):
         "position": Point(0, 0),
     }
 
+    alignment = content_property("alignment")
+    angle = content_property("angle")
+    locked = content_property("locked")
+    position = content_property("position")
+    showMeasurement = content_property("showMeasurement")
+    filter = content_property("filter")
+    name = content_property("name")
+
     def __init__(self):
         super(GSGuideLine, self).__init__()
 
@@ -1301,6 +1475,18 @@ class GSFontMaster(GSBase):
         return '<GSFontMaster "%s" width %s weight %s>' % \
             (self.name, self.widthValue, self.weightValue)
 
+    @property
+    def id(self):
+        return self._id
+
+    @id.setter
+    def id(self, value):
+        self._id = value
+        # The master layers of the glyphs are ordered by master id
+        font = self.__dict__.get("font")
+        if font is not None:
+            font._mastersChanged()
+
     def shouldWriteValueForKey(self, key):
         if key in ("weight", "width"):
             return getattr(self, key) != "Regular"
@@ -1385,16 +1571,12 @@ class GSFontMaster(GSBase):
         custom = " ".join(names).strip()
         return (weight, width, custom)
 
-    customParameters = property(
-        lambda self: CustomParametersProxy(self),
-        lambda self, value: CustomParametersProxy(self).setter(value))
+    customParameters = proxy_property(CustomParametersProxy)
 
-    userData = property(
-        lambda self: UserDataProxy(self),
-        lambda self, value: UserDataProxy(self).setter(value))
+    userData = proxy_property(UserDataProxy)
 
 
-class GSNode(GSBase):
+class GSNode(GlyphContent, GSBase):
     _PLIST_VALUE_RE = re.compile(
         '"([-.e\d]+) ([-.e\d]+) (LINE|CURVE|QCURVE|OFFCURVE|n/a)'
         '(?: (SMOOTH))?(?: (\{.*\}))?"', re.DOTALL)
@@ -1405,15 +1587,22 @@ class GSNode(GSBase):
     QCURVE = "qcurve"
     _parent = None
 
+    position = content_property("position")
+    type = content_property("type")
+    smooth = content_property("smooth")
+
     def __init__(self, position=(0, 0), nodetype=LINE,
                  smooth=False, name=None):
         super(GSNode, self).__init__()
-        self.position = Point(position[0], position[1])
-        self.type = nodetype
-        self.smooth = smooth
+        # Not through the setters: a new node is not part of a glyph yet.
+        attributes = self.__dict__
+        attributes["position"] = Point(position[0], position[1])
+        attributes["type"] = nodetype
+        attributes["smooth"] = smooth
         self._parent = None
         self._userData = None
-        self.name = name
+        if name is not None:
+            self.name = name
 
     def __repr__(self):
         content = self.type
@@ -1423,9 +1612,7 @@ class GSNode(GSBase):
             (self.__class__.__name__, self.position.x, self.position.y,
              content)
 
-    userData = property(
-        lambda self: UserDataProxy(self),
-        lambda self, value: UserDataProxy(self).setter(value))
+    userData = proxy_property(UserDataProxy)
 
     @property
     def parent(self):
@@ -1447,9 +1634,12 @@ class GSNode(GSBase):
 
     def read(self, line):
         m = self._PLIST_VALUE_RE.match(line).groups()
-        self.position = Point(float(m[0]), float(m[1]))
-        self.type = m[2].lower()
-        self.smooth = bool(m[3])
+        # Not through the setters: the parser reads the nodes before adding
+        # them to a path.
+        attributes = self.__dict__
+        attributes["position"] = Point(float(m[0]), float(m[1]))
+        attributes["type"] = m[2].lower()
+        attributes["smooth"] = bool(m[3])
 
         if m[4] is not None and len(m[4]) > 0:
             value = self._decode_dict_as_string(m[4])
@@ -1458,19 +1648,24 @@ class GSNode(GSBase):
 
         return self
 
+    # The name is stored in the userData, read directly so that the nodes
+    # do not all get a cached UserDataProxy.
     @property
     def name(self):
-        if "name" in self.userData:
-            return self.userData["name"]
+        if self._userData is not None:
+            return self._userData.get("name")
         return None
 
     @name.setter
     def name(self, value):
         if value is None:
-            if "name" in self.userData:
-                del(self.userData["name"])
+            if self._userData is not None and "name" in self._userData:
+                del(self._userData["name"])
+        elif self._userData is not None:
+            self._userData["name"] = value
         else:
-            self.userData["name"] = value
+            self._userData = {"name": value}
+        invalidate_fingerprint(self)
 
     @property
     def index(self):
@@ -1559,7 +1754,7 @@ class GSNode(GSBase):
         return None
 
 
-class GSPath(GSBase):
+class GSPath(GlyphContent, GSBase):
     _classesForName = {
         "nodes": GSNode,
         "closed": bool
@@ -1569,6 +1764,8 @@ class GSPath(GSBase):
     }
     _parent = None
 
+    closed = content_property("closed")
+
     def __init__(self):
         super(GSPath, self).__init__()
         self.nodes = []
@@ -1582,9 +1779,7 @@ class GSPath(GSBase):
             return True
         return super(GSPath, self).shouldWriteValueForKey(key)
 
-    nodes = property(
-        lambda self: PathNodesProxy(self),
-        lambda self, value: PathNodesProxy(self).setter(value))
+    nodes = proxy_property(PathNodesProxy)
 
     @property
     def segments(self):
@@ -1813,7 +2008,7 @@ class segment(list):
         return min(xvalues), min(yvalues), max(xvalues), max(yvalues)
 
 
-class GSComponent(GSBase):
+class GSComponent(GlyphContent, GSBase):
     _classesForName = {
         "alignment": int,
         "anchor": str,
@@ -1831,6 +2026,13 @@ class GSComponent(GSBase):
     _parent = None
 
     # TODO: glyph arg is required
+    name = content_property("name", component_graph=True)
+    alignment = content_property("alignment")
+    anchor = content_property("anchor")
+    locked = content_property("locked")
+    smartComponentValues = content_property("smartComponentValues")
+    transform = content_property("transform")
+
     def __init__(self, glyph="", offset=(0, 0), scale=(1, 1), transform=None):
         super(GSComponent, self).__init__()
 
@@ -1869,6 +2071,7 @@ class GSComponent(GSBase):
     def position(self, value):
         self.transform[4] = value[0]
         self.transform[5] = value[1]
+        invalidate_fingerprint(self)
 
     # .scale
     @property
@@ -1945,7 +2148,7 @@ class GSComponent(GSBase):
     #     lambda self, value: setattr(self, "piece", value))
 
 
-class GSSmartComponentAxis(GSBase):
+class GSSmartComponentAxis(GlyphContent, GSBase):
     _classesForName = {
         "name": unicode,
         "bottomName": unicode,
@@ -1961,13 +2164,19 @@ class GSSmartComponentAxis(GSBase):
         "topValue",
     )
 
+    name = content_property("name")
+    bottomName = content_property("bottomName")
+    bottomValue = content_property("bottomValue")
+    topName = content_property("topName")
+    topValue = content_property("topValue")
+
     def shouldWriteValueForKey(self, key):
         if key in ("bottomValue", "topValue"):
             return True
         return super(GSSmartComponentAxis, self).shouldWriteValueForKey(key)
 
 
-class GSAnchor(GSBase):
+class GSAnchor(GlyphContent, GSBase):
     _classesForName = {
         "name": unicode,
         "position": Point,
@@ -1977,6 +2186,9 @@ class GSAnchor(GSBase):
         "position": Point(0, 0),
     }
 
+    name = content_property("name")
+    position = content_property("position")
+
     def __init__(self, name=None, position=None):
         super(GSAnchor, self).__init__()
         if name is not None:
@@ -1999,7 +2211,7 @@ class GSAnchor(GSBase):
         return self._parent
 
 
-class GSHint(GSBase):
+class GSHint(GlyphContent, GSBase):
     _classesForName = {
         "horizontal": bool,
         "options": int,  # bitfield
@@ -2038,6 +2250,15 @@ class GSHint(GSBase):
         "settings"
     )
 
+    horizontal = content_property("horizontal")
+    options = content_property("options")
+    place = content_property("place")
+    scale = content_property("scale")
+    stem = content_property("stem")
+    type = content_property("type")
+    name = content_property("name")
+    settings = content_property("settings")
+
     def shouldWriteValueForKey(self, key):
         if key == "settings" and (self.settings is None or len(self.settings) == 0):
             return None
@@ -2089,6 +2310,7 @@ class GSHint(GSBase):
     def originNode(self, node):
         self._originNode = node
         self._origin = None
+        invalidate_fingerprint(self)
 
     @property
     def origin(self):
@@ -2101,6 +2323,7 @@ class GSHint(GSBase):
     def origin(self, origin):
         self._origin = origin
         self._originNode = None
+        invalidate_fingerprint(self)
 
     @property
     def targetNode(self):
@@ -2113,6 +2336,7 @@ class GSHint(GSBase):
     def targetNode(self, node):
         self._targetNode = node
         self._target = None
+        invalidate_fingerprint(self)
 
     @property
     def target(self):
@@ -2125,6 +2349,7 @@ class GSHint(GSBase):
     def target(self, target):
         self._target = target
         self._targetNode = None
+        invalidate_fingerprint(self)
 
     @property
     def otherNode1(self):
@@ -2137,6 +2362,7 @@ class GSHint(GSBase):
     def otherNode1(self, node):
         self._otherNode1 = node
         self._other1 = None
+        invalidate_fingerprint(self)
 
     @property
     def other1(self):
@@ -2149,6 +2375,7 @@ class GSHint(GSBase):
     def other1(self, other1):
         self._other1 = other1
         self._otherNode1 = None
+        invalidate_fingerprint(self)
 
     @property
     def otherNode2(self):
@@ -2161,6 +2388,7 @@ class GSHint(GSBase):
     def otherNode2(self, node):
         self._otherNode2 = node
         self._other2 = None
+        invalidate_fingerprint(self)
 
     @property
     def other2(self):
@@ -2173,6 +2401,7 @@ class GSHint(GSBase):
     def other2(self, other2):
         self._other2 = other2
         self._otherNode2 = None
+        invalidate_fingerprint(self)
 
 
 class GSFeature(GSBase):
@@ -2223,7 +2452,7 @@ class GSFeaturePrefix(GSFeature):
     pass
 
 
-class GSAnnotation(GSBase):
+class GSAnnotation(GlyphContent, GSBase):
     _classesForName = {
         "angle": float,
         "position": Point,
@@ -2240,6 +2469,12 @@ class GSAnnotation(GSBase):
     }
     _parent = None
 
+    angle = content_property("angle")
+    position = content_property("position")
+    text = content_property("text")
+    type = content_property("type")
+    width = content_property("width")
+
     @property
     def parent(self):
         return self._parent
@@ -2323,9 +2558,7 @@ class GSInstance(GSBase):
         self.isItalic = False
         self._customParameters = []
 
-    customParameters = property(
-        lambda self: CustomParametersProxy(self),
-        lambda self, value: CustomParametersProxy(self).setter(value))
+    customParameters = proxy_property(CustomParametersProxy)
 
     @property
     def exports(self):
@@ -2423,7 +2656,7 @@ class GSInstance(GSBase):
         self.customParameters["postscriptFullName"] = value
 
 
-class GSBackgroundImage(GSBase):
+class GSBackgroundImage(GlyphContent, GSBase):
     _classesForName = {
         "crop": Rect,
         "imagePath": unicode,
@@ -2439,6 +2672,11 @@ class GSBackgroundImage(GSBase):
         "alpha": "_alpha",
     }
 
+    crop = content_property("crop")
+    imagePath = content_property("imagePath")
+    locked = content_property("locked")
+    transform = content_property("transform")
+
     def __init__(self, path=None):
         super(GSBackgroundImage, self).__init__()
         self.imagePath = path
@@ -2470,6 +2708,7 @@ class GSBackgroundImage(GSBase):
     def position(self, value):
         self.transform[4] = value[0]
         self.transform[5] = value[1]
+        invalidate_fingerprint(self)
 
     # .scale
     @property
@@ -2505,13 +2744,14 @@ class GSBackgroundImage(GSBase):
         if not 10 <= value <= 100:
             value = 50
         self._alpha = value
+        invalidate_fingerprint(self)
 
     def updateAffineTransform(self):
         affine = list(Affine.translation(self.transform[4], self.transform[5]) * Affine.scale(self._sX, self._sY) * Affine.rotation(self._R))[:6]
         self.transform = Transform(affine[0], affine[1], affine[3], affine[4], affine[2], affine[5])
 
 
-class GSLayer(GSBase):
+class GSLayer(GlyphContent, GSBase):
     _classesForName = {
         "anchors": GSAnchor,
         "annotations": GSAnnotation,
@@ -2567,6 +2807,17 @@ class GSLayer(GSBase):
         "vertWidth",
         "width",
     )
+    _ownerAttribute = "parent"
+
+    backgroundImage = content_property("backgroundImage")
+    color = content_property("color")
+    leftMetricsKey = content_property("leftMetricsKey")
+    rightMetricsKey = content_property("rightMetricsKey")
+    vertWidth = content_property("vertWidth")
+    vertOrigin = content_property("vertOrigin")
+    visible = content_property("visible")
+    width = content_property("width")
+    widthMetricsKey = content_property("widthMetricsKey")
 
     def __init__(self):
         super(GSLayer, self).__init__()
@@ -2596,6 +2847,13 @@ class GSLayer(GSBase):
             parent = 'orphan'
         return "<%s \"%s\" (%s)>" % (self.__class__.__name__, name, parent)
 
+    def __setitem__(self, key, value):
+        super(GSLayer, self).__setitem__(key, value)
+        if key == "background" and value is not None:
+            # Parsed backgrounds must know their layer, like the ones created
+            # by the `background` getter.
+            value._foreground = self
+
     def __lt__(self, other):
         if self.master and other.master and self.associatedMasterId == self.layerId:
             return self.master.weightValue < other.master.weightValue or self.master.widthValue < other.master.widthValue
@@ -2622,6 +2880,20 @@ class GSLayer(GSBase):
             if not updated:
                 parent_layers[self._layerId] = self
             self.parent._layers = parent_layers
+            invalidate_layer_order(self.parent)
+        invalidate_fingerprint(self)
+        invalidate_component_graph(self)
+
+    @property
+    def associatedMasterId(self):
+        return self._associatedMasterId
+
+    @associatedMasterId.setter
+    def associatedMasterId(self, value):
+        self._associatedMasterId = value
+        # The master layers come first in the parent glyph
+        invalidate_layer_order(self.__dict__.get("parent"))
+        invalidate_fingerprint(self)
 
     @property
     def master(self):
@@ -2651,34 +2923,21 @@ class GSLayer(GSBase):
     @name.setter
     def name(self, value):
         self._name = value
+        invalidate_fingerprint(self)
 
-    anchors = property(
-        lambda self: LayerAnchorsProxy(self),
-        lambda self, value: LayerAnchorsProxy(self).setter(value))
+    anchors = proxy_property(LayerAnchorsProxy)
 
-    hints = property(
-        lambda self: LayerHintsProxy(self),
-        lambda self, value: LayerHintsProxy(self).setter(value))
+    hints = proxy_property(LayerHintsProxy)
 
-    paths = property(
-        lambda self: LayerPathsProxy(self),
-        lambda self, value: LayerPathsProxy(self).setter(value))
+    paths = proxy_property(LayerPathsProxy)
 
-    components = property(
-        lambda self: LayerComponentsProxy(self),
-        lambda self, value: LayerComponentsProxy(self).setter(value))
+    components = proxy_property(LayerComponentsProxy)
 
-    guides = property(
-        lambda self: LayerGuideLinesProxy(self),
-        lambda self, value: LayerGuideLinesProxy(self).setter(value))
+    guides = proxy_property(LayerGuideLinesProxy)
 
-    annotations = property(
-        lambda self: LayerAnnotationProxy(self),
-        lambda self, value: LayerAnnotationProxy(self).setter(value))
+    annotations = proxy_property(LayerAnnotationProxy)
 
-    userData = property(
-        lambda self: UserDataProxy(self),
-        lambda self, value: UserDataProxy(self).setter(value))
+    userData = proxy_property(UserDataProxy)
 
     @property
     def smartComponentPoleMapping(self):
@@ -2751,6 +3010,8 @@ class GSLayer(GSBase):
 
 
 class GSBackgroundLayer(GSLayer):
+    _ownerAttribute = "_foreground"
+
     def shouldWriteValueForKey(self, key):
         if key == 'width':
             return False
@@ -2780,7 +3041,7 @@ class GSBackgroundLayer(GSLayer):
 GSLayer._classesForName['background'] = GSBackgroundLayer
 
 
-class GSGlyph(GSBase):
+class GSGlyph(GlyphContent, GSBase):
     _classesForName = {
         "bottomKerningGroup": str,
         "bottomMetricsKey": str,
@@ -2854,6 +3115,29 @@ class GSGlyph(GSBase):
         "userData",
         "partsSettings",
     )
+    _fingerprint = None
+
+    name = content_property("name", component_graph=True)
+    bottomKerningGroup = content_property("bottomKerningGroup")
+    bottomMetricsKey = content_property("bottomMetricsKey")
+    category = content_property("category")
+    color = content_property("color")
+    export = content_property("export")
+    leftKerningGroup = content_property("leftKerningGroup")
+    leftKerningKey = content_property("leftKerningKey")
+    leftMetricsKey = content_property("leftMetricsKey")
+    note = content_property("note")
+    production = content_property("production")
+    rightKerningGroup = content_property("rightKerningGroup")
+    rightKerningKey = content_property("rightKerningKey")
+    rightMetricsKey = content_property("rightMetricsKey")
+    script = content_property("script")
+    subCategory = content_property("subCategory")
+    topKerningGroup = content_property("topKerningGroup")
+    topMetricsKey = content_property("topMetricsKey")
+    vertWidthMetricsKey = content_property("vertWidthMetricsKey")
+    widthMetricsKey = content_property("widthMetricsKey")
+    partsSettings = content_property("partsSettings")
 
     def __init__(self, name=None):
         super(GSGlyph, self).__init__()
@@ -2868,13 +3152,57 @@ class GSGlyph(GSBase):
     def __repr__(self):
         return '<GSGlyph "%s" with %s layers>' % (self.name, len(self.layers))
 
+    def __getstate__(self):
+        state = super(GSGlyph, self).__getstate__()
+        state.pop("_layerOrder", None)
+        return state
+
     def shouldWriteValueForKey(self, key):
         if key in ("script", "category", "subCategory"):
             return getattr(self, key) is not None
         return super(GSGlyph, self).shouldWriteValueForKey(key)
 
-    layers = property(lambda self: GlyphLayerProxy(self),
-                      lambda self, value: GlyphLayerProxy(self).setter(value))
+    def fingerprint(self):
+        """Return a hash of the content of the glyph, that only changes when
+        the glyph is modified. See `glyphsLib.fingerprint`.
+        """
+        return glyph_fingerprint(self)
+
+    layers = proxy_property(GlyphLayerProxy)
+
+    def _orderedLayers(self):
+        """Return the list of the layers in iteration order: the master
+        layers in the order of the masters of the font, then the other
+        layers.
+
+        The list is cached until the layers of the glyph or the masters of
+        its font change; do not modify it.
+        """
+        font = self.parent
+        if font is None:
+            return list(self._layers.values())
+        cached = self.__dict__.get("_layerOrder")
+        if (cached is not None and cached[0] is font and
+                cached[1] == font._mastersVersion):
+            return cached[2]
+        masterIds = set(m.id for m in font._masters)
+        masterLayerIds = set(
+            l.associatedMasterId for l in self._layers.values()
+            if l.associatedMasterId == l.layerId
+            and l.associatedMasterId in masterIds)
+        orderedLayers = [
+            self._layers[m.id]
+            for m in font._masters
+            if m.id in masterLayerIds
+        ]
+        orderedLayers += [
+            self._layers[l.layerId]
+            for l in self._layers.values()
+            if l.layerId not in masterLayerIds
+        ]
+        self.__dict__["_layerOrder"] = (
+            font, font._mastersVersion, orderedLayers)
+        return orderedLayers
 
     def _setupLayer(self, layer, key):
         assert isinstance(key, (str, unicode))
@@ -2896,15 +3224,16 @@ class GSGlyph(GSBase):
         for layer in list(self._layers):
             if layer == key:
                 del self._layers[key]
+                invalidate_fingerprint(self)
+                invalidate_component_graph(self)
+                invalidate_layer_order(self)
 
     @property
     def string(self):
         if self.unicode:
             return unichr(int(self.unicode, 16))
 
-    userData = property(
-        lambda self: UserDataProxy(self),
-        lambda self, value: UserDataProxy(self).setter(value))
+    userData = proxy_property(UserDataProxy)
 
     glyphname = property(
         lambda self: self.name,
@@ -2928,6 +3257,7 @@ class GSGlyph(GSBase):
     @unicode.setter
     def unicode(self, unicode):
         self._unicodes = UnicodesList(unicode)
+        invalidate_fingerprint(self)
 
     @property
     def unicodes(self):
@@ -2936,6 +3266,7 @@ class GSGlyph(GSBase):
     @unicodes.setter
     def unicodes(self, unicodes):
         self._unicodes = UnicodesList(unicodes)
+        invalidate_fingerprint(self)
 
 
 class GSFont(GSBase):
@@ -2987,7 +3318,15 @@ class GSFont(GSBase):
         "keyboardIncrement": 1,
     }
 
-    def __init__(self, path=None):
+    def __init__(self, path=None, workers=None):
+        """Create an empty font, or load it from the .glyphs file at `path`.
+
+        The path can also point to a .glyphspackage directory, in which case
+        the glyph files are only read when the glyphs are first accessed.
+
+        If `workers` is greater than 1, the glyphs of the file are parsed in
+        that many worker processes.
+        """
         super(GSFont, self).__init__()
 
         self.familyName = "Unnamed font"
@@ -3010,12 +3349,18 @@ class GSFont(GSBase):
 
             assert isinstance(path, (str, unicode)), \
                 "Please supply a file path"
-            assert path.endswith(".glyphs"), \
-                "Please supply a file path to a .glyphs file"
-            with open(path, 'r', encoding='utf-8') as fp:
-                p = Parser()
-                logger.info('Parsing "%s" file into <GSFont>' % path)
-                p.parse_into_object(self, fp.read())
+            if is_package_path(path):
+                logger.info('Reading "%s" package into <GSFont>' % path)
+                reader = GlyphsPackageReader(path, workers=workers)
+                reader.read_font_info(self)
+                self._glyphs_reader = reader
+            else:
+                assert path.endswith(".glyphs"), \
+                    "Please supply a file path to a .glyphs file"
+                with open(path, 'r', encoding='utf-8') as fp:
+                    p = Parser(workers=workers)
+                    logger.info('Parsing "%s" file into <GSFont>' % path)
+                    p.parse_into_object(self, fp.read())
             self.filepath = path
             for master in self.masters:
                 master.font = self
@@ -3028,17 +3373,59 @@ class GSFont(GSBase):
             return True
         return super(GSFont, self).shouldWriteValueForKey(key)
 
-    def save(self, path=None):
+    def save(self, path=None, workers=None):
+        """Save the font to a .glyphs file or to a .glyphspackage directory.
+
+        When saving to a package, only the files whose content changed are
+        rewritten, using `workers` threads if given.
+        """
         if path is None:
             if self.filepath:
                 path = self.filepath
             else:
                 raise ValueError("No path provided and GSFont has no filepath")
+        if is_package_path(path):
+            logger.info('Writing %r to .glyphspackage', self)
+            write_package(self, path, workers=workers)
+            return
         with open(path, 'w', encoding='utf-8') as fp:
             w = Writer(fp)
             logger.info('Writing %r to .glyphs file', self)
             w.write(self)
 
+    def fingerprints(self, workers=None):
+        """Return an OrderedDict of glyph name to glyph fingerprint, in glyph
+        order. The fingerprints that are not cached yet are computed with
+        `workers` processes if given.
+        """
+        return font_fingerprints(self, workers=workers)
+
+    # Set when the font was read from a .glyphspackage whose glyph files
+    # have not been fully loaded yet.
+    _glyphs_reader = None
+    _componentGraph = None
+
+    @property
+    def _glyphs(self):
+        if self._glyphs_reader is not None:
+            reader = self._glyphs_reader
+            self._glyphs_reader = None
+            self.glyphs = reader.glyphs()
+        return self._glyphs_list
+
+    @_glyphs.setter
+    def _glyphs(self, value):
+        self._glyphs_reader = None
+        self._glyphs_list = value
+        self._componentGraph = None
+
+    @property
+    def componentGraph(self):
+        """The ComponentGraph of the glyphs, built on first access."""
+        if self._componentGraph is None:
+            self._componentGraph = ComponentGraph(self)
+        return self._componentGraph
+
     def getVersionMinor(self):
         return self._versionMinor
 
@@ -3049,8 +3436,7 @@ class GSFont(GSBase):
 
     versionMinor = property(getVersionMinor, setVersionMinor)
 
-    glyphs = property(lambda self: FontGlyphsProxy(self),
-                      lambda self, value: FontGlyphsProxy(self).setter(value))
+    glyphs = proxy_property(FontGlyphsProxy)
 
     def _setupGlyph(self, glyph):
         glyph.parent = self
@@ -3072,8 +3458,14 @@ class GSFont(GSBase):
         for g in self._features:
             g._parent = self
 
-    masters = property(lambda self: FontFontMasterProxy(self),
-                       lambda self, value: FontFontMasterProxy(self).setter(value))
+    masters = proxy_property(FontFontMasterProxy)
+
+    # Incremented when the list of masters changes, to invalidate the layer
+    # orders cached by the glyphs.
+    _mastersVersion = 0
+
+    def _mastersChanged(self):
+        self._mastersVersion += 1
 
     def masterForId(self, key):
         for master in self._masters:
@@ -3092,17 +3484,11 @@ class GSFont(GSBase):
         for i in self._instances:
             i.parent = self
 
-    classes = property(
-        lambda self: FontClassesProxy(self),
-        lambda self, value: FontClassesProxy(self).setter(value))
+    classes = proxy_property(FontClassesProxy)
 
-    customParameters = property(
-        lambda self: CustomParametersProxy(self),
-        lambda self, value: CustomParametersProxy(self).setter(value))
+    customParameters = proxy_property(CustomParametersProxy)
 
-    userData = property(
-        lambda self: UserDataProxy(self),
-        lambda self, value: UserDataProxy(self).setter(value))
+    userData = proxy_property(UserDataProxy)
 
     @property
     def kerning(self):
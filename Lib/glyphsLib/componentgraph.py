@@ -0,0 +1,162 @@
+# Copyright 2018 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""The graph of the components of a font: which glyphs each glyph uses as
+components, layer by layer, and which glyphs use a given glyph.
+
+Get it from `GSFont.componentGraph`, which builds it on first access and
+forgets it when components, layers or glyphs are added, removed or renamed.
+The components of background layers are not part of the graph.
+"""
+
+from __future__ import (print_function, division, absolute_import,
+                        unicode_literals)
+
+from collections import OrderedDict, deque
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ComponentGraph(object):
+
+    def __init__(self, font):
+        # glyph name -> OrderedDict(layer ID -> tuple of component names)
+        self._components = OrderedDict()
+        # glyph name -> OrderedDict(layer ID -> set of glyph names)
+        self._users = {}
+        for glyph in font.glyphs:
+            layers = OrderedDict()
+            # Skip the proxies, which check the master layers on every access
+            for layer in glyph._layers.values():
+                names = tuple(component.name
+                              for component in layer._components)
+                layers[layer.layerId] = names
+                for name in names:
+                    users = self._users.setdefault(name, OrderedDict())
+                    users.setdefault(layer.layerId, set()).add(glyph.name)
+            self._components[glyph.name] = layers
+        self._index = {name: i for i, name in enumerate(self._components)}
+        self._order = None
+        self._cycles = None
+
+    def __contains__(self, glyph_name):
+        return glyph_name in self._components
+
+    def components(self, glyph_name, layer_id=None):
+        """Return the names of the glyphs used as components by the given
+        glyph in the given layer, or in any of its layers if no layer ID is
+        given.
+        """
+        layers = self._components.get(glyph_name, {})
+        if layer_id is not None:
+            return list(layers.get(layer_id, ()))
+        result = []
+        for names in layers.values():
+            result.extend(name for name in names if name not in result)
+        return result
+
+    def users(self, glyph_name, layer_id=None, recursive=False):
+        """Return the set of the names of the glyphs that use the given glyph
+        as a component in the given layer, or in any layer if no layer ID
+        is given. With `recursive`, also include the glyphs that use those,
+        and so on.
+        """
+        result = set()
+        stack = [glyph_name]
+        while stack:
+            layers = self._users.get(stack.pop(), {})
+            if layer_id is not None:
+                users = set(layers.get(layer_id, ()))
+            else:
+                users = set().union(*layers.values())
+            users -= result
+            result |= users
+            if recursive:
+                stack.extend(users)
+        return result
+
+    def closure(self, glyph_names):
+        """Return the set of the given glyph names and of the names of all the
+        glyphs that they use as components, recursively.
+        """
+        result = set()
+        stack = list(glyph_names)
+        while stack:
+            name = stack.pop()
+            if name not in result:
+                result.add(name)
+                stack.extend(self.components(name))
+        return result
+
+    def topological_order(self):
+        """Return the names of the glyphs of the font, ordered so that each
+        glyph comes after all the glyphs that it uses as components.
+
+        Glyphs that are part of a cycle, or that use a glyph of a cycle, come
+        last in font order.
+        """
+        if self._order is None:
+            pending = OrderedDict()
+            for name in self._components:
+                pending[name] = sum(
+                    1 for component in self.components(name)
+                    if component in self._components)
+            queue = deque(name for name, count in pending.items()
+                          if count == 0)
+            order = []
+            while queue:
+                name = queue.popleft()
+                order.append(name)
+                for user in sorted(self.users(name), key=self._index.get):
+                    pending[user] -= 1
+                    if pending[user] == 0:
+                        queue.append(user)
+            if len(order) < len(self._components):
+                done = set(order)
+                rest = [name for name in self._components if name not in done]
+                logger.warning('Cyclic components in glyphs: %s',
+                               ', '.join(rest))
+                order.extend(rest)
+            self._order = order
+        return list(self._order)
+
+    def cycles(self):
+        """Return the list of the cycles of components, each cycle being a
+        list of glyph names in which each glyph uses the next one and the
+        last one uses the first one.
+        """
+        if self._cycles is None:
+            self._cycles = []
+            # 0: not visited yet, 1: on the current path, 2: done
+            state = dict.fromkeys(self._components, 0)
+            for root in self._components:
+                if state[root]:
+                    continue
+                path = [root]
+                iterators = [iter(self.components(root))]
+                state[root] = 1
+                while iterators:
+                    for name in iterators[-1]:
+                        if state.get(name) == 0:
+                            state[name] = 1
+                            path.append(name)
+                            iterators.append(iter(self.components(name)))
+                            break
+                        if state.get(name) == 1:
+                            self._cycles.append(path[path.index(name):])
+                    else:
+                        state[path.pop()] = 2
+                        iterators.pop()
+        return [list(cycle) for cycle in self._cycles]
@@ -0,0 +1,152 @@
+# Copyright 2018 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Stable content fingerprints of glyphs.
+
+The fingerprint of a glyph is the SHA-1 of a canonical serialization of its
+content: the same .glyphs syntax as the Writer, with the dictionary keys
+sorted, the layers sorted by ID and the anchors sorted by name, and without
+the `lastChange` timestamp. Numbers go through the same rounding as when
+writing a file, so float noise below the file precision does not change the
+fingerprint.
+"""
+
+from __future__ import (print_function, division, absolute_import,
+                        unicode_literals)
+
+from collections import OrderedDict
+import hashlib
+import logging
+import multiprocessing
+
+from fontTools.misc.py23 import UnicodeIO
+
+import glyphsLib.classes
+from glyphsLib.util import can_fork
+from glyphsLib.writer import Writer
+
+logger = logging.getLogger(__name__)
+
+# Below this number of glyphs, starting worker processes costs more than
+# what they save.
+MIN_GLYPHS_FOR_WORKERS = 100
+
+# Keys of GSGlyph that do not describe the glyph content.
+IGNORED_GLYPH_KEYS = frozenset(("lastChange",))
+
+
+class _CanonicalGlyph(object):
+    """Wrap a GSGlyph so that the Writer skips the ignored keys."""
+
+    def __init__(self, glyph):
+        self._glyph = glyph
+
+    def __getattr__(self, name):
+        return getattr(self._glyph, name)
+
+    def shouldWriteValueForKey(self, key):
+        if key in IGNORED_GLYPH_KEYS:
+            return False
+        return self._glyph.shouldWriteValueForKey(key)
+
+
+class _CanonicalWriter(Writer):
+    """Writer whose output does not depend on the order of dictionaries."""
+
+    def writeDict(self, dictValue):
+        if isinstance(dictValue, OrderedDict):
+            # Plain dicts are written with sorted keys.
+            dictValue = dict(dictValue)
+        super(_CanonicalWriter, self).writeDict(dictValue)
+
+    def writeArray(self, arrayValue):
+        if isinstance(arrayValue, glyphsLib.classes.GlyphLayerProxy):
+            arrayValue = sorted(arrayValue.plistArray(),
+                                key=lambda layer: layer.layerId or '')
+        elif isinstance(arrayValue, glyphsLib.classes.LayerAnchorsProxy):
+            arrayValue = sorted(arrayValue.values(),
+                                key=lambda anchor: anchor.name or '')
+        super(_CanonicalWriter, self).writeArray(arrayValue)
+
+
+def canonical_string(value, key=None):
+    """Serialize any value found in a font like the fingerprints do."""
+    string = UnicodeIO()
+    _CanonicalWriter(string).writeValue(value, key)
+    return string.getvalue()
+
+
+def _compute_fingerprint(glyph):
+    string = UnicodeIO()
+    _CanonicalWriter(string).writeDict(_CanonicalGlyph(glyph))
+    return hashlib.sha1(string.getvalue().encode('utf-8')).hexdigest()
+
+
+def glyph_fingerprint(glyph):
+    """Return the fingerprint of a GSGlyph as a hexadecimal string.
+
+    The result is cached on the glyph until the glyph is modified.
+    """
+    fingerprint = glyph._fingerprint
+    if fingerprint is None:
+        fingerprint = _compute_fingerprint(glyph)
+        glyph._fingerprint = fingerprint
+    return fingerprint
+
+
+# The glyphs to fingerprint in the worker processes. They are inherited by
+# the forked workers instead of being pickled.
+_worker_glyphs = None
+
+
+def _fingerprint_glyph_range(indices):
+    start, end = indices
+    return [_compute_fingerprint(glyph) for glyph in _worker_glyphs[start:end]]
+
+
+def font_fingerprints(font, workers=None):
+    """Return an OrderedDict mapping the name of each glyph of the font to
+    its fingerprint, in glyph order.
+
+    The fingerprints that are not cached yet are computed by `workers`
+    processes when more than one is requested and the platform can fork.
+    """
+    global _worker_glyphs
+
+    glyphs = list(font.glyphs)
+    missing = [glyph for glyph in glyphs if glyph._fingerprint is None]
+    if (workers and workers > 1 and len(missing) >= MIN_GLYPHS_FOR_WORKERS
+            and can_fork()):
+        logger.info('Fingerprinting %d glyphs with %d worker processes',
+                    len(missing), workers)
+        chunk_size = -(-len(missing) // (workers * 4))
+        ranges = [(start, start + chunk_size)
+                  for start in range(0, len(missing), chunk_size)]
+        _worker_glyphs = missing
+        try:
+            pool = multiprocessing.Pool(workers)
+            try:
+                chunks = pool.map(_fingerprint_glyph_range, ranges)
+            finally:
+                pool.close()
+                pool.join()
+        finally:
+            _worker_glyphs = None
+        fingerprints = (fingerprint for chunk in chunks
+                        for fingerprint in chunk)
+        for glyph, fingerprint in zip(missing, fingerprints):
+            glyph._fingerprint = fingerprint
+
+    return OrderedDict(
+        (glyph.name, glyph_fingerprint(glyph)) for glyph in glyphs)
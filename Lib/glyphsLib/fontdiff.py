@@ -0,0 +1,234 @@
+# Copyright 2018 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Structural comparison of two GSFont objects.
+
+`diff(font_a, font_b)` returns a list of `Change`s. The `path` of a change
+locates the modified object, for example:
+
+    ('glyphs', 'A')                                     glyph added/removed
+    ('glyphs', 'A', 'layers', 'UUID', 'width')          layer attribute
+    ('glyphs', 'A', 'layers', 'UUID', 'paths', 0, 'nodes', 3)
+    ('kerning', 'UUID', '@MMK_L_A', 'V')                kerning pair
+    ('masters', 'UUID', 'xHeight')
+    ('instances', 'Bold')
+    ('features', 'liga', 'code')
+
+Glyphs whose fingerprints are equal are skipped without looking inside.
+"""
+
+from __future__ import (print_function, division, absolute_import,
+                        unicode_literals)
+
+from collections import namedtuple, OrderedDict
+import logging
+
+from glyphsLib.fingerprint import IGNORED_GLYPH_KEYS, canonical_string
+
+logger = logging.getLogger(__name__)
+
+__all__ = ['diff', 'Change', 'ADDED', 'REMOVED', 'MODIFIED']
+
+ADDED = 'added'
+REMOVED = 'removed'
+MODIFIED = 'modified'
+
+_KIND_SYMBOLS = {ADDED: '+', REMOVED: '-', MODIFIED: '~'}
+
+
+class Change(namedtuple('Change', ['kind', 'path', 'old', 'new'])):
+    """One difference between two fonts. `old` is None for additions and
+    `new` is None for removals.
+    """
+    __slots__ = ()
+
+    def __str__(self):
+        location = '/'.join('%s' % part for part in self.path)
+        if self.kind == MODIFIED:
+            return '%s %s: %s -> %s' % (_KIND_SYMBOLS[self.kind], location,
+                                        _short(self.old), _short(self.new))
+        return '%s %s' % (_KIND_SYMBOLS[self.kind], location)
+
+
+def _short(value):
+    if value is None:
+        return 'None'
+    text = canonical_string(value).replace('\n', ' ')
+    if len(text) > 60:
+        text = text[:57] + '...'
+    return text
+
+
+def diff(font_a, font_b, workers=None):
+    """Return the list of Changes that turn font_a into font_b.
+
+    The glyph fingerprints that are not cached yet are computed with
+    `workers` processes if given (see `GSFont.fingerprints`).
+    """
+    changes = []
+    _diff_attributes(changes, (), font_a, font_b, exclude=(
+        'glyphs', 'fontMaster', 'instances', 'kerning', 'features',
+        'featurePrefixes', 'classes'))
+    _diff_collections(changes, ('masters',), _by('id', font_a.masters),
+                      _by('id', font_b.masters), _diff_attributes)
+    _diff_collections(changes, ('instances',), _by('name', font_a.instances),
+                      _by('name', font_b.instances), _diff_attributes)
+    for key in ('features', 'featurePrefixes', 'classes'):
+        _diff_collections(changes, (key,), _by('name', getattr(font_a, key)),
+                          _by('name', getattr(font_b, key)),
+                          _diff_attributes)
+    _diff_kerning(changes, font_a.kerning, font_b.kerning)
+    _diff_glyphs(changes, font_a, font_b, workers)
+    return changes
+
+
+def _value(obj, key):
+    """Return the value of obj for a key of the file format, or None if
+    it would not be written to a file.
+    """
+    if hasattr(obj, 'shouldWriteValueForKey'):
+        try:
+            if not obj.shouldWriteValueForKey(key):
+                return None
+        except AttributeError:
+            return None
+    value = getattr(obj, obj._wrapperKeysTranslate.get(key, key), None)
+    if value is not None and hasattr(value, 'plistArray'):
+        value = list(value.plistArray())
+    elif value is not None and hasattr(value, 'keys') and \
+            not isinstance(value, dict):
+        # userData: a renamed key must count as a change
+        value = dict(zip(value.keys(), value.values()))
+    elif value is not None and hasattr(value, 'values') and \
+            not isinstance(value, dict):
+        value = list(value.values())
+    return value
+
+
+def _diff_attributes(changes, path, a, b, exclude=()):
+    """Compare the attributes that a and b write in a .glyphs file."""
+    keys = getattr(a, '_keyOrder', None) or sorted(a._classesForName)
+    for key in keys:
+        if key in exclude:
+            continue
+        value_a = _value(a, key)
+        value_b = _value(b, key)
+        if value_a is None and value_b is None:
+            continue
+        if (value_a is None or value_b is None or
+                canonical_string(value_a, key) !=
+                canonical_string(value_b, key)):
+            changes.append(Change(MODIFIED, path + (key,), value_a, value_b))
+
+
+def _by(attribute, items):
+    return ((getattr(item, attribute), item) for item in items)
+
+
+def _diff_collections(changes, path, items_a, items_b, diff_function):
+    """Compare two collections given as (key, item) pairs, matching the
+    items by key.
+    """
+    items_a = OrderedDict(items_a)
+    items_b = OrderedDict(items_b)
+    for key, item in items_a.items():
+        if key not in items_b:
+            changes.append(Change(REMOVED, path + (key,), item, None))
+        else:
+            diff_function(changes, path + (key,), item, items_b[key])
+    for key, item in items_b.items():
+        if key not in items_a:
+            changes.append(Change(ADDED, path + (key,), None, item))
+
+
+def _diff_kerning(changes, kerning_a, kerning_b):
+    pairs_a = _kerning_pairs(kerning_a)
+    pairs_b = _kerning_pairs(kerning_b)
+    for pair, value in pairs_a.items():
+        path = ('kerning',) + pair
+        if pair not in pairs_b:
+            changes.append(Change(REMOVED, path, value, None))
+        elif pairs_b[pair] != value:
+            changes.append(Change(MODIFIED, path, value, pairs_b[pair]))
+    for pair, value in pairs_b.items():
+        if pair not in pairs_a:
+            changes.append(Change(ADDED, ('kerning',) + pair, None, value))
+
+
+def _kerning_pairs(kerning):
+    return OrderedDict(
+        ((master_id, left, right), value)
+        for master_id, master_kerning in kerning.items()
+        for left, right_values in master_kerning.items()
+        for right, value in right_values.items())
+
+
+def _diff_glyphs(changes, font_a, font_b, workers):
+    fingerprints_a = font_a.fingerprints(workers=workers)
+    fingerprints_b = font_b.fingerprints(workers=workers)
+    glyphs_a = {glyph.name: glyph for glyph in font_a.glyphs}
+    glyphs_b = {glyph.name: glyph for glyph in font_b.glyphs}
+    for name, fingerprint in fingerprints_a.items():
+        if name not in fingerprints_b:
+            changes.append(Change(REMOVED, ('glyphs', name), glyphs_a[name],
+                                  None))
+        elif fingerprints_b[name] != fingerprint:
+            _diff_glyph(changes, ('glyphs', name), glyphs_a[name],
+                        glyphs_b[name])
+    for name in fingerprints_b:
+        if name not in fingerprints_a:
+            changes.append(Change(ADDED, ('glyphs', name), None,
+                                  glyphs_b[name]))
+
+
+def _diff_glyph(changes, path, glyph_a, glyph_b):
+    _diff_attributes(changes, path, glyph_a, glyph_b,
+                     exclude=('layers',) + tuple(IGNORED_GLYPH_KEYS))
+    _diff_collections(changes, path + ('layers',),
+                      _by('layerId', glyph_a.layers.plistArray()),
+                      _by('layerId', glyph_b.layers.plistArray()),
+                      _diff_layer)
+
+
+def _diff_layer(changes, path, layer_a, layer_b):
+    _diff_attributes(changes, path, layer_a, layer_b, exclude=(
+        'background', 'paths', 'components', 'anchors'))
+    _diff_collections(changes, path + ('paths',), enumerate(layer_a.paths),
+                      enumerate(layer_b.paths), _diff_path)
+    _diff_collections(changes, path + ('components',),
+                      enumerate(layer_a.components),
+                      enumerate(layer_b.components), _diff_attributes)
+    _diff_collections(changes, path + ('anchors',),
+                      _by('name', layer_a.anchors),
+                      _by('name', layer_b.anchors), _diff_attributes)
+    background_a = layer_a._background
+    background_b = layer_b._background
+    if background_a is not None or background_b is not None:
+        if background_a is None or background_b is None:
+            changes.append(Change(MODIFIED, path + ('background',),
+                                  background_a, background_b))
+        else:
+            _diff_layer(changes, path + ('background',), background_a,
+                        background_b)
+
+
+def _diff_path(changes, path, path_a, path_b):
+    _diff_attributes(changes, path, path_a, path_b, exclude=('nodes',))
+    _diff_collections(changes, path + ('nodes',), enumerate(path_a.nodes),
+                      enumerate(path_b.nodes), _diff_node)
+
+
+def _diff_node(changes, path, node_a, node_b):
+    if node_a.plistValue() != node_b.plistValue():
+        changes.append(Change(MODIFIED, path, node_a, node_b))
@@ -16,6 +16,7 @@ from __future__ import (print_function, division, absolute_import,
                         unicode_literals)
 
 from collections import OrderedDict, namedtuple
+from copy import deepcopy
 import logging
 import os
 import xml.etree.ElementTree as etree
@@ -24,16 +25,22 @@ from glyphsLib.builder.builders import UFOBuilder
 from glyphsLib.builder.custom_params import to_ufo_custom_params
 from glyphsLib.builder.names import build_stylemap_names
 from glyphsLib.builder.constants import GLYPHS_PREFIX
-from glyphsLib.builder.instances import apply_instance_data, InstanceData
+from glyphsLib.builder.instances import (
+    apply_instance_data, apply_instance_data_to_ufo, InstanceData)
 
 from glyphsLib.util import build_ufo_path, write_ufo, clean_ufo
 
+import defcon
+
 __all__ = [
-    'interpolate', 'build_designspace', 'apply_instance_data'
+    'interpolate', 'interpolate_designspace', 'build_designspace',
+    'apply_instance_data', 'apply_instance_data_to_ufo'
 ]
 
 logger = logging.getLogger(__name__)
 
+INTERPOLATION_ENGINES = ('mutatormath', 'numpy')
+
 
 # DEPRECATED
 def interpolate(ufos, master_dir, out_dir, instance_data, round_geometry=True):
@@ -82,3 +89,486 @@ def build_designspace(masters, master_dir, out_dir, instance_data):
     designspace.write(designspace_path)
 
     return designspace_path, InstanceData(designspace)
+
+
+def interpolate_designspace(designspace, round_geometry=True,
+                            ufo_module=defcon, engine='mutatormath'):
+    """Generate the instances of a designspace document whose sources hold
+    their UFO in their `font` attribute, e.g. one returned by
+    `glyphsLib.to_designspace`, without reading or writing any file.
+
+    With the default engine, "mutatormath", the instances are computed by
+    MutatorMath like `interpolate` does, but from the masters in memory, and
+    the mutator of each glyph is built once for all the instances.
+
+    With the "numpy" engine, the instances are computed like varLib does: the
+    locations are normalized with the axis bounds in design space and the
+    weight of each master in each instance comes from a fontTools
+    VariationModel. The coordinates, advance widths, component transforms
+    and anchors of each glyph are packed into a (masters, values) array, so
+    all the instances of a glyph are computed with one matrix product.
+    Glyphs whose masters are not compatible (different numbers of points,
+    components or anchors) or have guidelines or images fall back to
+    fontMath objects, with the same weights. The locations are bent through
+    the axis maps, and the glyph libs and notes are copied from the same
+    master, like MutatorMath does. It needs numpy, and falls back to
+    MutatorMath when numpy is not installed.
+
+    The Glyphs instance data (custom parameters, weight and width classes)
+    is not applied, see `apply_instance_data_to_ufo`.
+
+    Returns the list of the instance UFOs, in the order of
+    `designspace.instances`. They are not saved anywhere.
+    """
+    from mutatorMath.objects.location import Location
+    from mutatorMath.ufo.instance import InstanceWriter
+
+    if engine not in INTERPOLATION_ENGINES:
+        raise ValueError('Unknown interpolation engine: %r' % (engine,))
+    if engine == 'numpy':
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            logger.warning('numpy is not installed, interpolating with '
+                           'MutatorMath instead')
+            engine = 'mutatormath'
+
+    axes = {}
+    for axis in designspace.axes:
+        axes[axis.name] = {
+            'name': axis.name,
+            'tag': axis.tag,
+            'minimum': float(axis.minimum),
+            'maximum': float(axis.maximum),
+            'default': float(axis.default),
+            'map': [(float(input), float(output))
+                    for input, output in axis.map],
+        }
+
+    sources = OrderedDict()
+    muted = dict(kerning=[], info=[], glyphs={})
+    lib_source = groups_source = info_source = features_source = None
+    for index, source in enumerate(designspace.sources):
+        name = source.name or 'temp_master.%d' % index
+        if source.font is None:
+            raise ValueError('The source %s has no UFO in memory' % name)
+        sources[name] = source.font, Location(source.location)
+        if source.copyLib:
+            lib_source = name
+        if source.copyGroups:
+            groups_source = name
+        if source.copyInfo:
+            info_source = name
+        if source.copyFeatures:
+            features_source = name
+        if source.muteInfo:
+            muted['info'].append(name)
+        if source.muteKerning:
+            muted['kerning'].append(name)
+        if source.mutedGlyphNames:
+            muted['glyphs'][name] = list(source.mutedGlyphNames)
+
+    writers = []
+    for instance in designspace.instances:
+        writer = InstanceWriter(None, ufoVersion=3,
+                                roundGeometry=round_geometry, axes=axes,
+                                verbose=True)
+        writer.font = ufo_module.Font()
+        writer.setSources(sources)
+        writer.setMuted(muted)
+        if instance.familyName is not None:
+            writer.setFamilyName(instance.familyName)
+        if instance.styleName is not None:
+            writer.setStyleName(instance.styleName)
+        if instance.postScriptFontName is not None:
+            writer.setPostScriptFontName(instance.postScriptFontName)
+        if instance.styleMapFamilyName is not None:
+            writer.setStyleMapFamilyName(instance.styleMapFamilyName)
+        if instance.styleMapStyleName is not None:
+            writer.setStyleMapStyleName(instance.styleMapStyleName)
+        writer.setLocation(Location(instance.location))
+        if instance.glyphs:
+            logger.warning('Ignoring the glyph definitions of instance %s',
+                           instance.name)
+        writers.append(writer)
+    if not writers:
+        return []
+
+    # The glyph names and the unicodes are the same for all the instances
+    glyph_names = writers[0].getAvailableGlyphnames()
+    unicode_map = writers[0].makeUnicodeMapFromSources()
+    for writer in writers:
+        for glyph_name in glyph_names:
+            writer.font.newGlyph(glyph_name)
+            unicodes = unicode_map.get(glyph_name)
+            if unicodes is not None:
+                writer.font[glyph_name].unicodes = unicodes
+
+    if engine == 'numpy':
+        failed = _interpolate_with_numpy(
+            designspace, sources, muted, writers, glyph_names, info_source,
+            round_geometry, axes)
+    else:
+        failed = _interpolate_with_mutatormath(
+            designspace, sources, muted, writers, glyph_names, info_source,
+            round_geometry, axes)
+
+    instance_ufos = []
+    for instance, writer, failed_names in zip(designspace.instances, writers,
+                                              failed):
+        if features_source is not None:
+            writer.copyFeatures(features_source)
+        if groups_source is not None:
+            writer.setGroups(sources[groups_source][0].groups)
+        if lib_source is not None:
+            writer.setLib(sources[lib_source][0].lib)
+
+        if failed_names:
+            logger.warning('%s: errors calculating %d glyphs: %s',
+                           instance.name, len(failed_names),
+                           ', '.join(sorted(failed_names)))
+        instance_ufos.append(writer.font)
+    return instance_ufos
+
+
+def _interpolate_with_mutatormath(designspace, sources, muted, writers,
+                                  glyph_names, info_source, round_geometry,
+                                  axes):
+    """Interpolate the glyphs, kerning and info of all the instances with
+    MutatorMath. Return the list of the names of the glyphs that failed for
+    each instance.
+    """
+    from fontMath import MathGlyph, MathKerning
+    from mutatorMath.objects.mutator import buildMutator
+
+    failed = [[] for _ in writers]
+    for glyph_name in glyph_names:
+        items = [(location, MathGlyph(ufo[glyph_name]))
+                 for name, (ufo, location) in sources.items()
+                 if glyph_name in ufo and
+                 glyph_name not in muted['glyphs'].get(name, ())]
+        try:
+            _, mutator = buildMutator(items, axes=axes)
+        except Exception:
+            mutator = None
+        for writer, failed_names in zip(writers, failed):
+            try:
+                math_glyph = mutator.makeInstance(writer.locationObject)
+                if round_geometry:
+                    math_glyph = math_glyph.round()
+                math_glyph.extractGlyph(writer.font[glyph_name],
+                                        onlyGeometry=True)
+            except Exception:
+                failed_names.append(glyph_name)
+
+    kerning_items = [
+        (location, MathKerning(ufo.kerning, ufo.groups))
+        for name, (ufo, location) in sources.items()
+        if name not in muted['kerning'] and len(ufo.kerning)]
+    kerning_mutator = None
+    if kerning_items:
+        try:
+            _, kerning_mutator = buildMutator(kerning_items, axes=axes)
+        except Exception:
+            logger.exception('Error processing the kerning')
+
+    for instance, writer in zip(designspace.instances, writers):
+        if instance.kerning and kerning_mutator is not None:
+            kerning = kerning_mutator.makeInstance(writer.locationObject)
+            if round_geometry:
+                kerning.round()
+            kerning.extractKerning(writer.font)
+        if instance.info:
+            writer.addInfo(copySourceName=info_source)
+    return failed
+
+
+def _interpolate_with_numpy(designspace, sources, muted, writers, glyph_names,
+                            info_source, round_geometry, axes):
+    """Interpolate the glyphs, kerning and info of all the instances with
+    numpy and VariationModel weights. Return the list of the names of the
+    glyphs that failed for each instance.
+    """
+    import numpy
+    from fontMath import MathGlyph, MathInfo, MathKerning
+    from fontTools.varLib.models import VariationModel, normalizeLocation
+    from mutatorMath.objects.bender import Bender
+    from mutatorMath.objects.location import Location
+    from mutatorMath.objects.mutator import buildMutator
+
+    # Bend the locations through the axis maps like MutatorMath does, so
+    # that both engines give the same instances.
+    bender = Bender(axes)
+    axis_order = [axis.name for axis in designspace.axes]
+    axis_bounds = {}
+    for axis in designspace.axes:
+        mapping = sorted(axis.map)
+        axis_bounds[axis.name] = tuple(
+            bender(Location({axis.name: _map_value(value, mapping)}))[
+                axis.name]
+            for value in (axis.minimum, axis.default, axis.maximum))
+    source_names = list(sources)
+    master_locations = [normalizeLocation(bender(location), axis_bounds)
+                        for _, location in sources.values()]
+    instance_locations = [
+        normalizeLocation(bender(writer.locationObject), axis_bounds)
+        for writer in writers]
+
+    # tuple of master indices -> (weights matrix, index of the neutral) or
+    # None if these masters do not make a valid model
+    models = {}
+
+    def model_weights(indices):
+        if indices not in models:
+            try:
+                locations = [master_locations[i] for i in indices]
+                model = VariationModel(locations, axisOrder=axis_order)
+                models[indices] = (
+                    _master_weights(model, instance_locations),
+                    [all(v == 0 for v in location.values())
+                     for location in locations].index(True))
+            except Exception:
+                models[indices] = None
+        return models[indices]
+
+    # tuple of master indices -> for each instance, the index in the tuple
+    # of the master whose glyph lib and note MutatorMath copies
+    lib_masters = {}
+
+    def lib_master_indices(indices, neutral_index):
+        if indices not in lib_masters:
+            try:
+                _, mutator = buildMutator(
+                    [(sources[source_names[i]][1], _LibMaster(index))
+                     for index, i in enumerate(indices)], axes=axes)
+                lib_masters[indices] = [
+                    mutator.makeInstance(writer.locationObject).index
+                    for writer in writers]
+            except Exception:
+                lib_masters[indices] = [neutral_index] * len(writers)
+        return lib_masters[indices]
+
+    failed = [[] for _ in writers]
+    fallback_count = 0
+    for glyph_name in glyph_names:
+        indices = tuple(
+            i for i, name in enumerate(source_names)
+            if glyph_name in sources[name][0] and
+            glyph_name not in muted['glyphs'].get(name, ()))
+        model = model_weights(indices)
+        if model is None:
+            for failed_names in failed:
+                failed_names.append(glyph_name)
+            continue
+        weights, neutral_index = model
+        math_glyphs = [MathGlyph(sources[source_names[i]][0][glyph_name])
+                       for i in indices]
+        neutral = math_glyphs[neutral_index]
+        lib_glyphs = [math_glyphs[index] for index in
+                      lib_master_indices(indices, neutral_index)]
+
+        packed = [_pack_glyph(math_glyph) for math_glyph in math_glyphs]
+        if all(p is not None and p[0] == packed[0][0] for p in packed):
+            values = weights.dot(numpy.array([p[1] for p in packed]))
+            rounded = None
+            if round_geometry:
+                rounded = _rounded_indices(neutral)
+                values[:, rounded] = numpy.rint(values[:, rounded])
+            for writer, row, lib_glyph, failed_names in zip(
+                    writers, values, lib_glyphs, failed):
+                try:
+                    glyph = writer.font[glyph_name]
+                    _unpack_glyph(glyph, neutral, row.tolist(), rounded)
+                    _copy_lib_and_note(glyph, lib_glyph)
+                except Exception:
+                    failed_names.append(glyph_name)
+            continue
+
+        fallback_count += 1
+        for writer, row, lib_glyph, failed_names in zip(
+                writers, weights, lib_glyphs, failed):
+            try:
+                math_glyph = _interpolate_objects(
+                    math_glyphs, row, neutral_index)
+                if round_geometry:
+                    math_glyph = math_glyph.round()
+                glyph = writer.font[glyph_name]
+                math_glyph.extractGlyph(glyph, onlyGeometry=True)
+                _copy_lib_and_note(glyph, lib_glyph)
+            except Exception:
+                failed_names.append(glyph_name)
+    if fallback_count:
+        logger.info('%d glyphs are not point-compatible or have guidelines '
+                    'or images, interpolated them with fontMath',
+                    fallback_count)
+
+    kerning_indices = tuple(
+        i for i, name in enumerate(source_names)
+        if name not in muted['kerning'] and len(sources[name][0].kerning))
+    kerning_model = model_weights(kerning_indices) if kerning_indices else None
+    if kerning_model is not None:
+        kernings = [MathKerning(sources[source_names[i]][0].kerning,
+                                sources[source_names[i]][0].groups)
+                    for i in kerning_indices]
+    info_indices = tuple(i for i, name in enumerate(source_names)
+                         if name not in muted['info'])
+    info_model = model_weights(info_indices)
+    if info_model is not None:
+        infos = [MathInfo(sources[source_names[i]][0].info)
+                 for i in info_indices]
+
+    for index, (instance, writer) in enumerate(
+            zip(designspace.instances, writers)):
+        if instance.kerning and kerning_model is not None:
+            weights, neutral_index = kerning_model
+            kerning = _interpolate_objects(
+                kernings, weights[index], neutral_index)
+            if round_geometry:
+                kerning.round()
+            kerning.extractKerning(writer.font)
+        if instance.info and info_model is not None:
+            weights, neutral_index = info_model
+            info = _interpolate_objects(infos, weights[index], neutral_index)
+            if round_geometry:
+                info = info.round()
+            info.extractInfo(writer.font.info)
+            if info_source is not None:
+                # Copy the non-interpolated fields like MutatorMath does
+                writer._copyFontInfo(writer.font.info,
+                                     sources[info_source][0].info)
+    return failed
+
+
+def _map_value(value, mapping):
+    """Map a value through a piecewise linear list of (input, output)."""
+    if not mapping:
+        return value
+    if value <= mapping[0][0]:
+        return mapping[0][1]
+    for (input1, output1), (input2, output2) in zip(mapping, mapping[1:]):
+        if value <= input2:
+            return output1 + ((output2 - output1) * (value - input1) /
+                              (input2 - input1))
+    return mapping[-1][1]
+
+
+def _master_weights(model, locations):
+    """Return the matrix of the weights of the masters of a VariationModel
+    (in the order of the locations it was built with) at the given
+    normalized locations, one row per location.
+    """
+    import numpy
+
+    count = len(model.locations)
+    deltas = model.getDeltas([row.copy() for row in numpy.identity(count)])
+    scalars = numpy.array([model.getScalars(location)
+                           for location in locations])
+    return scalars.dot(numpy.array(deltas))
+
+
+def _interpolate_objects(objects, weights, neutral_index):
+    """Interpolate fontMath objects as the neutral plus the weighted deltas
+    of the other masters, like MutatorMath does.
+    """
+    neutral = objects[neutral_index]
+    result = neutral * 1
+    for index, (obj, weight) in enumerate(zip(objects, weights)):
+        if index != neutral_index and weight:
+            result = result + (obj - neutral) * weight
+    return result
+
+
+def _pack_glyph(math_glyph):
+    """Return the structure of a MathGlyph and the list of its numeric
+    values, or None if it cannot be interpolated as an array.
+    """
+    if math_glyph.guidelines or math_glyph.image.get('fileName'):
+        return None
+    structure = (
+        tuple(len(contour['points']) for contour in math_glyph.contours),
+        tuple(component['baseGlyph']
+              for component in math_glyph.components),
+        tuple(anchor.get('name') for anchor in math_glyph.anchors))
+    values = []
+    for contour in math_glyph.contours:
+        for point in contour['points']:
+            values.extend(point[1])
+    values.append(math_glyph.width or 0)
+    values.append(math_glyph.height or 0)
+    for component in math_glyph.components:
+        values.extend(component['transformation'])
+    for anchor in math_glyph.anchors:
+        values.append(anchor['x'])
+        values.append(anchor['y'])
+    return structure, values
+
+
+def _rounded_indices(math_glyph):
+    """Return the indices of the values of a packed glyph that are rounded
+    with round_geometry: all but the scales of the components.
+    """
+    point_count = sum(len(contour['points'])
+                      for contour in math_glyph.contours)
+    indices = list(range(2 * point_count + 2))
+    start = len(indices)
+    for index in range(len(math_glyph.components)):
+        indices.extend((start + 6 * index + 4, start + 6 * index + 5))
+    start += 6 * len(math_glyph.components)
+    indices.extend(range(start, start + 2 * len(math_glyph.anchors)))
+    return indices
+
+
+def _unpack_glyph(glyph, neutral, values, rounded):
+    """Draw the interpolated values of a packed glyph into a UFO glyph, with
+    the structure of the neutral MathGlyph, like MathGlyph.extractGlyph.
+    """
+    from fontMath.mathGlyph import FilterRedundantPointPen
+
+    if rounded is not None:
+        for index in rounded:
+            values[index] = int(values[index])
+    values = iter(values)
+    pen = FilterRedundantPointPen(glyph.getPointPen())
+    for contour in neutral.contours:
+        pen.beginPath(identifier=contour['identifier'])
+        for segment_type, _, smooth, name, identifier in contour['points']:
+            pen.addPoint((next(values), next(values)),
+                         segmentType=segment_type, smooth=smooth, name=name,
+                         identifier=identifier)
+        pen.endPath()
+    glyph.width = next(values)
+    glyph.height = next(values)
+    for component in neutral.components:
+        transformation = tuple(next(values) for _ in range(6))
+        pen.addComponent(component['baseGlyph'], transformation,
+                         identifier=component['identifier'])
+    anchors = []
+    for anchor in neutral.anchors:
+        anchor = dict(anchor)
+        anchor['x'] = next(values)
+        anchor['y'] = next(values)
+        anchors.append(anchor)
+    glyph.anchors = anchors
+
+
+def _copy_lib_and_note(glyph, math_glyph):
+    glyph.lib = deepcopy(math_glyph.lib)
+    glyph.note = math_glyph.note
+
+
+class _LibMaster(object):
+    """Stand-in for the MathGlyph of a master in a MutatorMath mutator, to
+    find the master whose glyph lib and note an instance gets: the result of
+    a fontMath operation keeps the lib and note of its left operand.
+    """
+
+    def __init__(self, index):
+        self.index = index
+
+    def __add__(self, other):
+        return self
+
+    __sub__ = __mul__ = __rmul__ = __add__
+
+    def __lt__(self, other):
+        return self.index < other.index
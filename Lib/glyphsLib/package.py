@@ -0,0 +1,288 @@
+# Copyright 2018 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Read and write the directory-based .glyphspackage format.
+
+A package stores the font-level data in `fontinfo.plist`, the glyph order
+in `order.plist` and each glyph in its own file in the `glyphs` folder:
+
+    MyFont.glyphspackage/
+        fontinfo.plist
+        order.plist
+        glyphs/
+            A_.glyph
+            a.glyph
+            ...
+"""
+
+from __future__ import (print_function, division, absolute_import,
+                        unicode_literals)
+
+from io import open
+import logging
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+import os
+
+try:
+    from fontTools.ufoLib.filenames import userNameToFileName
+except ImportError:
+    from ufoLib.filenames import userNameToFileName
+from fontTools.misc.py23 import UnicodeIO
+
+import glyphsLib
+from glyphsLib.parser import Parser
+from glyphsLib.writer import Writer
+
+logger = logging.getLogger(__name__)
+
+PACKAGE_EXTENSION = '.glyphspackage'
+FONTINFO_FILENAME = 'fontinfo.plist'
+ORDER_FILENAME = 'order.plist'
+GLYPHS_DIRNAME = 'glyphs'
+GLYPH_FILE_EXTENSION = '.glyph'
+
+
+def is_package_path(path):
+    """Return whether the given path names a .glyphspackage."""
+    return path.rstrip('/\\').endswith(PACKAGE_EXTENSION)
+
+
+class GlyphsPackageReader(object):
+    """Reads the glyph files of a .glyphspackage on demand.
+
+    The font-level data is read eagerly by `read_font_info`, the glyphs are
+    only parsed when the font's glyphs are first accessed, either one by one
+    with `glyph` or all together with `glyphs`.
+    """
+
+    def __init__(self, path, workers=None):
+        self.path = path
+        self.workers = workers
+        # The glyphs accessed one by one, and the names they had when they
+        # were read, by the name of the file they were read from.
+        self._loaded = {}
+        self._loaded_names = {}
+
+    def read_font_info(self, font):
+        with open(os.path.join(self.path, FONTINFO_FILENAME), 'r',
+                  encoding='utf-8') as fp:
+            Parser().parse_into_object(font, fp.read())
+
+    def glyph_order(self):
+        order_path = os.path.join(self.path, ORDER_FILENAME)
+        if not os.path.exists(order_path):
+            return []
+        with open(order_path, 'r', encoding='utf-8') as fp:
+            return Parser(current_type=None).parse(fp.read())
+
+    def glyph_filenames(self):
+        glyphs_dir = os.path.join(self.path, GLYPHS_DIRNAME)
+        if not os.path.isdir(glyphs_dir):
+            return []
+        return sorted(filename for filename in os.listdir(glyphs_dir)
+                      if filename.endswith(GLYPH_FILE_EXTENSION))
+
+    def glyph(self, name):
+        """Return the glyph with the given name, parsing only its file, or
+        None if the file cannot be found by name.
+        """
+        filename = userNameToFileName(name, suffix=GLYPH_FILE_EXTENSION)
+        glyph = self._loaded.get(filename)
+        if glyph is not None and glyph.name == name:
+            return glyph
+        # The loaded glyphs may have been renamed since they were read
+        for glyph in self._loaded.values():
+            if glyph.name == name:
+                return glyph
+        if filename in self._loaded:
+            return None
+        path = os.path.join(self.path, GLYPHS_DIRNAME, filename)
+        if not os.path.exists(path):
+            return None
+        glyph = read_glyph_file(path)
+        if glyph.name != name:
+            return None
+        self._loaded[filename] = glyph
+        self._loaded_names[filename] = name
+        return glyph
+
+    def glyphs(self):
+        """Return all glyphs of the package, sorted by the glyph order."""
+        filenames = self.glyph_filenames()
+        paths = [os.path.join(self.path, GLYPHS_DIRNAME, filename)
+                 for filename in filenames]
+        # More workers than processors only add the cost of starting them.
+        workers = min(self.workers or 1, multiprocessing.cpu_count())
+        if workers > 1 and len(paths) >= Parser.MIN_GLYPHS_FOR_WORKERS:
+            logger.info('Reading %d glyph files with %d worker processes',
+                        len(paths), workers)
+            pool = multiprocessing.Pool(workers)
+            try:
+                data = pool.map(_read_glyph_file_data, paths)
+            finally:
+                pool.close()
+                pool.join()
+            # The workers return plain data, which is much cheaper to send
+            # back than the GSGlyph objects.
+            parser = Parser(current_type=glyphsLib.classes.GSGlyph)
+            glyphs = [parser._build(glyph_data) for glyph_data in data]
+        else:
+            glyphs = [read_glyph_file(path) for path in paths]
+
+        # Reuse the glyphs that were already accessed one by one, so that
+        # the objects returned earlier stay attached to the font.
+        glyphs = [self._loaded.get(filename, glyph)
+                  for filename, glyph in zip(filenames, glyphs)]
+        self._loaded = {}
+        self._loaded_names = {}
+
+        order = {name: index for index, name in enumerate(self.glyph_order())}
+        # Glyphs that are missing from the order go last, sorted by name.
+        return sorted(glyphs, key=lambda glyph: (
+            order.get(glyph.name, len(order)), glyph.name or ''))
+
+
+def read_glyph_file(path):
+    """Parse one .glyph file into a GSGlyph."""
+    with open(path, 'r', encoding='utf-8') as fp:
+        return Parser(current_type=glyphsLib.classes.GSGlyph).parse(fp.read())
+
+
+def _read_glyph_file_data(path):
+    """Worker function: parse one .glyph file into plain data, see
+    `Parser._parse_plain`.
+    """
+    with open(path, 'r', encoding='utf-8') as fp:
+        text = fp.read()
+    data, i = Parser()._parse_plain(text, 0)
+    if text[i:].strip():
+        raise ValueError('Unexpected trailing content in %s' % path)
+    return data
+
+
+class _FontInfo(object):
+    """Wrap a GSFont so that the Writer outputs everything but the glyphs."""
+
+    def __init__(self, font):
+        self._font = font
+
+    def __getattr__(self, name):
+        return getattr(self._font, name)
+
+    def shouldWriteValueForKey(self, key):
+        if key == 'glyphs':
+            return False
+        return self._font.shouldWriteValueForKey(key)
+
+
+def _to_string(write_function, value):
+    string = UnicodeIO()
+    write_function(Writer(string), value)
+    string.write('\n')
+    return string.getvalue()
+
+
+def _write_if_changed(path, text):
+    """Write text to path unless the file already has that exact content.
+    Return whether the file was written.
+    """
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as fp:
+            if fp.read() == text:
+                return False
+    with open(path, 'w', encoding='utf-8') as fp:
+        fp.write(text)
+    return True
+
+
+def _write_glyph_file(args):
+    path, text = args
+    return _write_if_changed(path, text)
+
+
+def write_package(font, path, workers=None):
+    """Write a GSFont as a .glyphspackage directory.
+
+    Only the files whose content changed are rewritten, and the files of
+    glyphs that are no longer in the font are deleted. If the font was read
+    from this same package, only the glyphs that were accessed are written,
+    and the files of the other glyphs are left untouched.
+    """
+    glyphs_dir = os.path.join(path, GLYPHS_DIRNAME)
+    if not os.path.isdir(glyphs_dir):
+        os.makedirs(glyphs_dir)
+
+    _write_if_changed(os.path.join(path, FONTINFO_FILENAME),
+                      _to_string(Writer.writeDict, _FontInfo(font)))
+
+    reader = font._glyphs_reader
+    in_place = (reader is not None and
+                os.path.realpath(reader.path) == os.path.realpath(path))
+    if in_place:
+        # Only the glyphs accessed one by one may have been modified or
+        # renamed; the files of the other glyphs keep their names.
+        glyphs = list(reader._loaded.values())
+        stale = list(reader._loaded)
+        existing = (set(filename.lower()
+                        for filename in reader.glyph_filenames()) -
+                    set(filename.lower() for filename in stale))
+        renamed = {reader._loaded_names[filename]: glyph.name
+                   for filename, glyph in reader._loaded.items()
+                   if glyph.name != reader._loaded_names[filename]}
+        glyph_order = None
+        if renamed:
+            glyph_order = [renamed.get(name, name)
+                           for name in reader.glyph_order()]
+    else:
+        glyphs = list(font.glyphs)
+        stale = [filename for filename in os.listdir(glyphs_dir)
+                 if filename.endswith(GLYPH_FILE_EXTENSION)]
+        existing = set()
+        glyph_order = [glyph.name for glyph in glyphs]
+
+    if glyph_order is not None:
+        _write_if_changed(os.path.join(path, ORDER_FILENAME),
+                          _to_string(Writer.writeArray, glyph_order))
+
+    filenames = []
+    jobs = []
+    for glyph in glyphs:
+        filename = userNameToFileName(glyph.name, existing,
+                                      suffix=GLYPH_FILE_EXTENSION)
+        existing.add(filename.lower())
+        filenames.append(filename)
+        jobs.append((os.path.join(glyphs_dir, filename),
+                     _to_string(Writer.writeDict, glyph)))
+
+    if workers and workers > 1:
+        pool = ThreadPool(workers)
+        try:
+            written = pool.map(_write_glyph_file, jobs)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        written = [_write_glyph_file(job) for job in jobs]
+    logger.info('Wrote %d of %d glyph files', sum(written), len(jobs))
+
+    for filename in stale:
+        if filename.lower() not in existing:
+            os.remove(os.path.join(glyphs_dir, filename))
+
+    if in_place:
+        # The package now matches the glyphs as they were saved
+        reader._loaded = dict(zip(filenames, glyphs))
+        reader._loaded_names = {filename: glyph.name
+                                for filename, glyph in zip(filenames, glyphs)}
@@ -20,6 +20,7 @@ from collections import OrderedDict
 from io import open
 import re
 import logging
+import multiprocessing
 import sys
 
 import glyphsLib
@@ -43,8 +44,13 @@ class Parser(object):
     hex_re = re.compile(r'\s*<([A-Fa-f0-9]+)>', re.DOTALL)
     bytes_re = re.compile(r'\s*<([A-Za-z0-9+/=]+)>', re.DOTALL)
 
-    def __init__(self, current_type=OrderedDict):
+    # Below this many glyphs, the cost of starting worker processes and
+    # sending the parsed glyphs back outweighs the parallel speedup.
+    MIN_GLYPHS_FOR_WORKERS = 100
+
+    def __init__(self, current_type=OrderedDict, workers=None):
         self.current_type = current_type
+        self.workers = workers
 
     def parse(self, text):
         """Do the parsing."""
@@ -69,6 +75,40 @@ class Parser(object):
             self._fail('Unexpected trailing content', text, i)
         return i
 
+    def peek_into_object(self, res, text, keys):
+        """Parse only the given top-level keys into an existing GSFont
+        instance, skipping over the values of all other keys.
+        """
+
+        text = tounicode(text, encoding='utf-8')
+
+        m = self.start_dict_re.match(text, 0)
+        if not m:
+            self._fail('not correct file format', text, 0)
+        i = m.end()
+        end_match = self.end_dict_re.match(text, i)
+        while not end_match:
+            m = self.attr_re.match(text, i)
+            if not m:
+                self._fail('Unexpected dictionary content', text, i)
+            name = self._trim_value(m.group(1))
+            i = m.end()
+            if name in keys:
+                old_current_type = self.current_type
+                self.current_type = res.classForName(name)
+                res[name], i = self._parse(text, i)
+                self.current_type = old_current_type
+            else:
+                i = skip_value(text, i)
+
+            m = self.dict_delim_re.match(text, i)
+            if not m:
+                self._fail('Missing delimiter in dictionary before content',
+                           text, i)
+            i = m.end()
+            end_match = self.end_dict_re.match(text, i)
+        return end_match.end()
+
     def _guess_current_type(self, parsed, value):
         if value.lower() in ('infinity', 'inf', 'nan'):
             # Those values would be accepted by `float()`
@@ -109,26 +149,9 @@ class Parser(object):
 
         m = self.value_re.match(text, i)
         if m:
-            parsed, value = m.group(0), self._trim_value(m.group(1))
+            parsed = m.group(0)
             i += len(parsed)
-            if hasattr(self.current_type, "read"):
-                reader = self.current_type()
-                # Give the escaped value to `read` to be symetrical with
-                # `plistValue` which handles the escaping itself.
-                value = reader.read(m.group(1))
-                return value, i
-
-            if (self.current_type is None
-                    or self.current_type in (dict, OrderedDict)):
-                self.current_type = self._guess_current_type(parsed, value)
-
-            if self.current_type == bool:
-                value = bool(int(value))  # bool(u'0') returns True
-                return value, i
-
-            value = self.current_type(value)
-
-            return value, i
+            return self._convert_value(m.group(1)), i
 
         m = self.hex_re.match(text, i)
         if m:
@@ -140,19 +163,43 @@ class Parser(object):
         else:
             self._fail('Unexpected content', text, i)
 
+    def _convert_value(self, token):
+        """Convert a value token (a bare or quoted string) to the current
+        type.
+        """
+        if hasattr(self.current_type, "read"):
+            reader = self.current_type()
+            # Give the escaped value to `read` to be symetrical with
+            # `plistValue` which handles the escaping itself.
+            return reader.read(token)
+
+        value = self._trim_value(token)
+        if (self.current_type is None
+                or self.current_type in (dict, OrderedDict)):
+            self.current_type = self._guess_current_type(token, value)
+
+        if self.current_type == bool:
+            return bool(int(value))  # bool(u'0') returns True
+
+        return self.current_type(value)
+
     def _parse_dict(self, text, i):
         """Parse a dictionary from source text starting at i."""
         old_current_type = self.current_type
+        res = self._new_dict()
+        i = self._parse_dict_into_object(res, text, i)
+        self.current_type = old_current_type
+        return res, i
+
+    def _new_dict(self):
+        """Return an empty object of the current type for a dictionary."""
         new_type = self.current_type
         if new_type is None:
             # customparameter.value needs to be set from the found value
             new_type = dict
         elif type(new_type) == list:
             new_type = new_type[0]
-        res = new_type()
-        i = self._parse_dict_into_object(res, text, i)
-        self.current_type = old_current_type
-        return res, i
+        return new_type()
 
     def _parse_dict_into_object(self, res, text, i):
         end_match = self.end_dict_re.match(text, i)
@@ -168,6 +215,9 @@ class Parser(object):
 
             if name == "unicode":
                 result = self._parse(text, i, _parsing_unicodes=True)
+            elif (name == "glyphs" and self.workers and self.workers > 1 and
+                    self.current_type is glyphsLib.classes.GSGlyph):
+                result = self._parse_glyphs_in_parallel(text, i)
             else:
                 result = self._parse(text, i)
 
@@ -215,6 +265,141 @@ class Parser(object):
         i += len(parsed)
         return res, i
 
+    def _parse_glyphs_in_parallel(self, text, i):
+        """Parse the top-level list of glyphs starting at i, splitting it
+        into chunks of whole glyphs that are parsed by worker processes.
+        """
+        m = self.start_list_re.match(text, i)
+        if not m:
+            return self._parse(text, i)
+        spans, end = split_list_items(text, m.end())
+        if len(spans) < self.MIN_GLYPHS_FOR_WORKERS:
+            return self._parse(text, i)
+
+        # More workers than processors only add the cost of starting them.
+        workers = min(self.workers, multiprocessing.cpu_count())
+        if workers < 2:
+            logger.info('Parsing the glyphs in one process because there is '
+                        'only one processor')
+            return self._parse(text, i)
+
+        chunks = [text[start:stop]
+                  for start, stop in _balanced_chunks(spans, workers * 4)]
+        logger.info('Parsing %d glyphs with %d worker processes',
+                    len(spans), workers)
+        # The workers do the text scanning and return plain data, which is
+        # much cheaper to send back than the GSGlyph objects. The objects are
+        # built here as the chunks arrive, while the next ones are parsed.
+        glyphs = []
+        pool = multiprocessing.Pool(workers)
+        try:
+            for chunk_data in pool.imap(_parse_glyphs_chunk, chunks):
+                glyphs.extend(self._build(chunk_data))
+        finally:
+            pool.close()
+            pool.join()
+        return glyphs, end
+
+    def _parse_plain(self, text, i):
+        """Parse a single dictionary, list or value starting at i into plain
+        data that is cheap to send between processes, without the types:
+        a dictionary becomes a tuple of (key, value) pairs, a list a list,
+        binary data its hexadecimal digits as bytes and any other value the
+        token of the source text. `_build` gives the parsed types to this
+        data, as `_parse` would have.
+        """
+        m = self.start_dict_re.match(text, i)
+        if m:
+            i = m.end()
+            items = []
+            end_match = self.end_dict_re.match(text, i)
+            while not end_match:
+                m = self.attr_re.match(text, i)
+                if not m:
+                    self._fail('Unexpected dictionary content', text, i)
+                name = self._trim_value(m.group(1))
+                i = m.end()
+                m = None
+                if name == "unicode":
+                    m = self.unicode_list_re.match(text, i)
+                if m:
+                    value, i = m.group(1), m.end()
+                else:
+                    value, i = self._parse_plain(text, i)
+                items.append((name, value))
+                m = self.dict_delim_re.match(text, i)
+                if not m:
+                    self._fail('Missing delimiter in dictionary before '
+                               'content', text, i)
+                i = m.end()
+                end_match = self.end_dict_re.match(text, i)
+            return tuple(items), end_match.end()
+
+        m = self.start_list_re.match(text, i)
+        if m:
+            i = m.end()
+            items = []
+            end_match = self.end_list_re.match(text, i)
+            while not end_match:
+                item, i = self._parse_plain(text, i)
+                items.append(item)
+                end_match = self.end_list_re.match(text, i)
+                if not end_match:
+                    m = self.list_delim_re.match(text, i)
+                    if not m:
+                        self._fail('Missing delimiter in list before content',
+                                   text, i)
+                    i = m.end()
+            return items, end_match.end()
+
+        m = self.value_re.match(text, i)
+        if m:
+            return m.group(1), m.end()
+
+        m = self.hex_re.match(text, i)
+        if m:
+            return m.group(1).encode('ascii'), m.end()
+        self._fail('Unexpected content', text, i)
+
+    def _build(self, data):
+        """Build the value of the current type from the plain data returned
+        by `_parse_plain`.
+        """
+        if isinstance(data, tuple):
+            old_current_type = self.current_type
+            res = obj = self._new_dict()
+            for name, value in data:
+                item_type = self.current_type
+                if hasattr(res, "classForName"):
+                    self.current_type = res.classForName(name)
+                if (name == "unicode" and isinstance(value, unicode) and
+                        self.unicode_list_re.match(value)):
+                    value = value.split(",")
+                else:
+                    value = self._build(value)
+                try:
+                    res[name] = value
+                except:
+                    res = {}  # see _parse_dict_into_object
+                    res[name] = value
+                self.current_type = item_type
+            self.current_type = old_current_type
+            return obj
+
+        if isinstance(data, list):
+            res = []
+            old_current_type = self.current_type
+            for item in data:
+                res.append(self._build(item))
+                self.current_type = old_current_type
+            return res
+
+        if isinstance(data, bytes):
+            from glyphsLib.types import BinaryData
+            return BinaryData.fromHex(data.decode('ascii'))
+
+        return self._convert_value(data)
+
     # glyphs only supports octal escapes between \000 and \077 and hexadecimal
     # escapes between \U0000 and \UFFFF
     _unescape_re = re.compile(r'(\\0[0-7]{2})|(\\U[0-9a-fA-F]{4})')
@@ -242,6 +427,98 @@ class Parser(object):
         raise ValueError('%s:\n%s' % (message, text[i:i + 79]))
 
 
+_quoted_string_re = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+# Skip plain text and quoted strings up to the next bracket, which is
+# captured. Written as an "unrolled loop" so that the regex engine, not
+# Python, does most of the scanning.
+_next_bracket_re = re.compile(
+    r'[^"{}()]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"{}()]*)*([{}()])', re.DOTALL)
+_bare_value_re = re.compile(r'[-_./$A-Za-z0-9]+|<[A-Za-z0-9+/=]*>')
+_whitespace_re = re.compile(r'\s*')
+
+
+def skip_value(text, i):
+    """Return the index just past the value (dict, list, string or bare
+    token) that starts at i, without building any objects.
+
+    The scan is only aware of brackets and quoted strings, so it is much
+    faster than actually parsing the value.
+    """
+    i = _whitespace_re.match(text, i).end()
+    if i >= len(text):
+        raise ValueError('Unexpected end of file')
+    char = text[i]
+    if char == '"':
+        m = _quoted_string_re.match(text, i)
+        if not m:
+            raise ValueError('Unterminated string:\n%s' % text[i:i + 79])
+        return m.end()
+    if char not in '{(':
+        m = _bare_value_re.match(text, i)
+        if not m:
+            raise ValueError('Unexpected content:\n%s' % text[i:i + 79])
+        return m.end()
+    start = i
+    depth = 0
+    while True:
+        m = _next_bracket_re.match(text, i)
+        if m is None:
+            raise ValueError('Unbalanced brackets:\n%s' %
+                             text[start:start + 79])
+        i = m.end()
+        if m.group(1) in '{(':
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return i
+
+
+def split_list_items(text, i):
+    """Find the items of the list whose content starts at i (just after the
+    opening parenthesis).
+
+    Return a list of (start, end) spans, one per item, and the index just
+    past the closing parenthesis.
+    """
+    spans = []
+    while True:
+        i = _whitespace_re.match(text, i).end()
+        if text.startswith(')', i):
+            return spans, i + 1
+        start = i
+        i = skip_value(text, i)
+        spans.append((start, i))
+        i = _whitespace_re.match(text, i).end()
+        if text.startswith(',', i):
+            i += 1
+        elif not text.startswith(')', i):
+            raise ValueError('Missing delimiter in list before content:\n%s'
+                             % text[i:i + 79])
+
+
+def _balanced_chunks(spans, count):
+    """Group consecutive item spans into at most `count` chunks of similar
+    text length. Yield the (start, end) text offsets of each chunk.
+    """
+    total = spans[-1][1] - spans[0][0]
+    target = max(1, total // count)
+    chunk_start = 0
+    for index, (start, end) in enumerate(spans):
+        chunk_first = spans[chunk_start][0]
+        if end - chunk_first >= target or index == len(spans) - 1:
+            yield chunk_first, end
+            chunk_start = index + 1
+
+
+def _parse_glyphs_chunk(chunk):
+    """Worker function: parse a chunk of the glyphs list into plain data,
+    see `Parser._parse_plain`.
+    """
+    data, _ = Parser()._parse_plain('(' + chunk + ')', 0)
+    return data
+
+
 def load(fp):
     """Read a .glyphs file. 'fp' should be (readable) file object.
     Return a GSFont object.
@@ -260,6 +537,42 @@ def loads(s):
     return data
 
 
+# The values of these keys make up most of a .glyphs file, so `peek` skips
+# them unless they are explicitly requested.
+PEEK_SKIPPED_KEYS = frozenset((
+    'glyphs', 'kerning', 'vertKerning', 'features', 'featurePrefixes',
+    'classes',
+))
+
+
+def peek(file_or_path, keys=None):
+    """Read only the top-level metadata of a .glyphs file.
+
+    Return a partial GSFont object in which only the given top-level `keys`
+    (e.g. 'familyName', 'fontMaster', 'instances', 'customParameters') are
+    parsed. All other values are skipped over without being parsed and the
+    corresponding attributes keep their default values. By default, all
+    keys except those in PEEK_SKIPPED_KEYS (glyphs, kerning, features...)
+    are read.
+
+    The returned font has no `filepath`, so that it cannot accidentally
+    overwrite the original file with partial data.
+    """
+    if hasattr(file_or_path, 'read'):
+        text = file_or_path.read()
+    else:
+        with open(file_or_path, 'r', encoding='utf-8') as fp:
+            text = fp.read()
+    font = glyphsLib.classes.GSFont()
+    if keys is None:
+        keys = set(font._classesForName) - PEEK_SKIPPED_KEYS
+    logger.info('Peeking into .glyphs file')
+    Parser().peek_into_object(font, text, set(keys))
+    for master in font.masters:
+        master.font = font
+    return font
+
+
 def main(args=None):
     """Roundtrip the .glyphs file given as an argument."""
     for arg in args:
@@ -0,0 +1,139 @@
+# Copyright 2018 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Estimate the memory used by a loaded font.
+
+memory_report() walks the objects reachable from a GSFont and adds the
+sys.getsizeof() of each of them to the class of the GS* object that owns
+it: a GSNode counts its own instance, its attribute dictionary and its
+position; a GSPath its list of nodes, but not the nodes themselves, which
+count as GSNode. Two more rows hold the userData dictionaries of all the
+objects and the kerning of the font.
+
+Each object counts once, even if several objects refer to it, so the total
+is an estimate of the memory that would be freed with the font. The glyphs
+of a .glyphspackage that were not loaded yet are not counted.
+"""
+
+from __future__ import (print_function, division, absolute_import,
+                        unicode_literals)
+
+from collections import OrderedDict
+import sys
+import types
+
+from glyphsLib.classes import GSBase
+
+USER_DATA = 'userData'
+KERNING = 'kerning'
+
+# Values that do not belong to the font
+_SKIPPED_TYPES = (type, types.ModuleType, types.FunctionType,
+                  types.BuiltinFunctionType, types.MethodType)
+
+
+class ObjectUsage(object):
+    """The number of objects of a class and their estimated size in bytes."""
+
+    __slots__ = ('count', 'bytes')
+
+    def __init__(self):
+        self.count = 0
+        self.bytes = 0
+
+    def __repr__(self):
+        return '<%s count=%d bytes=%d>' % (
+            self.__class__.__name__, self.count, self.bytes)
+
+
+class MemoryReport(object):
+    """The memory used by a font.
+
+    `classes` maps the names of the GS* classes, USER_DATA and KERNING to
+    their ObjectUsage. The count of USER_DATA is the number of objects that
+    have userData, the count of KERNING the number of kerning pairs of all
+    the masters.
+    """
+
+    def __init__(self):
+        self.classes = OrderedDict()
+
+    def usage(self, name):
+        usage = self.classes.get(name)
+        if usage is None:
+            usage = self.classes[name] = ObjectUsage()
+        return usage
+
+    @property
+    def total_bytes(self):
+        return sum(usage.bytes for usage in self.classes.values())
+
+    def format_table(self):
+        """Return the report as a table, the largest classes first."""
+        width = max([len(name) for name in self.classes] + [5])
+        lines = ['%-*s %10s %14s %10s' % (
+            width, 'Class', 'count', 'bytes', 'per item')]
+        for name, usage in sorted(self.classes.items(),
+                                  key=lambda item: (-item[1].bytes, item[0])):
+            lines.append('%-*s %10d %14d %10.1f' % (
+                width, name, usage.count, usage.bytes,
+                usage.bytes / usage.count if usage.count else 0))
+        lines.append('%-*s %10s %14d' % (width, 'Total', '',
+                                         self.total_bytes))
+        return '\n'.join(lines)
+
+
+def memory_report(font):
+    """Return a MemoryReport of the objects reachable from a GSFont."""
+    report = MemoryReport()
+    seen = set()
+    stack = [(font, None)]
+    while stack:
+        value, owner = stack.pop()
+        if id(value) in seen or isinstance(value, _SKIPPED_TYPES):
+            continue
+        seen.add(id(value))
+
+        if isinstance(value, GSBase):
+            owner = value.__class__.__name__
+            report.usage(owner).count += 1
+            attributes = vars(value)
+            report.usage(owner).bytes += (sys.getsizeof(value) +
+                                          sys.getsizeof(attributes))
+            seen.add(id(attributes))
+            for name, attribute in attributes.items():
+                if name == '_userData' and attribute:
+                    report.usage(USER_DATA).count += 1
+                    stack.append((attribute, USER_DATA))
+                elif name == '_kerning' and value is font:
+                    report.usage(KERNING).count += _count_pairs(attribute)
+                    stack.append((attribute, KERNING))
+                else:
+                    stack.append((attribute, owner))
+            continue
+
+        report.usage(owner).bytes += sys.getsizeof(value)
+        if isinstance(value, dict):
+            for item in value.items():
+                stack.extend((element, owner) for element in item)
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            stack.extend((element, owner) for element in value)
+        elif hasattr(value, '__dict__'):
+            stack.append((vars(value), owner))
+    return report
+
+
+def _count_pairs(kerning):
+    return sum(len(rights) for master_kerning in kerning.values()
+               for rights in master_kerning.values())
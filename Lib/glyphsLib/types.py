@@ -354,6 +354,10 @@ def actualPrecition(Float):
 
 
 def floatToString(Float, precision=3):
+    # Fast path for the most common case of coordinates without decimals.
+    if isinstance(Float, int) or (isinstance(Float, float) and
+                                  Float.is_integer()):
+        return "%.0f" % Float
     try:
         ActualPrecition = actualPrecition(Float)
         precision = min(precision, ActualPrecition)
@@ -14,10 +14,20 @@
 
 # TODO: (jany) merge with builder/common.py
 
+import filecmp
 import logging
+import multiprocessing
 import os
 import shutil
 from fontTools.misc.textTools import num2binary
+try:
+    from fontTools.ufoLib import UFOWriter, glifLib
+    from fontTools.ufoLib.filenames import userNameToFileName
+    from fontTools.ufoLib.glifLib import writeGlyphToString
+except ImportError:
+    from ufoLib import UFOWriter, glifLib
+    from ufoLib.filenames import userNameToFileName
+    from ufoLib.glifLib import writeGlyphToString
 
 logger = logging.getLogger(__name__)
 
@@ -49,6 +59,152 @@ def clean_ufo(path):
         shutil.rmtree(path)
 
 
+def can_fork():
+    """Return whether multiprocessing starts the worker processes by forking,
+    so that they inherit the objects of the parent process.
+    """
+    if not hasattr(multiprocessing, 'get_start_method'):
+        # Python 2 always forks on POSIX
+        return os.name == 'posix'
+    return multiprocessing.get_start_method() == 'fork'
+
+
+def save_ufo_incrementally(ufo, path):
+    """Save a UFO to path, only touching the files whose content changed.
+
+    The UFO is written in place. Each .glif file is serialized in memory and
+    only written if it differs from the file on disk, and the files of the
+    glyphs, layers, images and data that are not in the UFO anymore are
+    deleted. The other files are written by ufoLib, which also leaves them
+    alone when their content did not change. Unchanged files, e.g. the .glif
+    files of the glyphs that were not edited, keep their modification times.
+    """
+    if not os.path.isdir(path):
+        ufo.save(path)
+        return
+    writer = UFOWriter(path, formatVersion=3)
+    writer.writeInfo(ufo.info)
+    writer.writeGroups(ufo.groups)
+    writer.writeKerning(ufo.kerning)
+    writer.writeLib(dict(ufo.lib))
+    features_path = os.path.join(path, 'features.fea')
+    if ufo.features.text:
+        writer.writeFeatures(ufo.features.text)
+    elif os.path.exists(features_path):
+        os.remove(features_path)
+    for file_name in ufo.images.fileNames:
+        writer.writeImage(file_name, ufo.images[file_name])
+    _remove_other_files(os.path.join(path, 'images'), ufo.images.fileNames)
+    for file_name in ufo.data.fileNames:
+        writer.writeBytesToPath(os.path.join('data', file_name),
+                                ufo.data[file_name])
+    _remove_other_files(os.path.join(path, 'data'), ufo.data.fileNames)
+
+    layers = ufo.layers
+    for layer_name in list(writer.layerContents):
+        if layer_name not in layers:
+            writer.deleteGlyphSet(layer_name)
+    changed = 0
+    for layer_name in layers.layerOrder:
+        layer = layers[layer_name]
+        glyph_set = writer.getGlyphSet(
+            layer_name, defaultLayer=layer is layers.defaultLayer)
+        changed += _save_glyphs_incrementally(
+            layer, glyph_set,
+            os.path.join(path, writer.layerContents[layer_name]))
+    writer.writeLayerContents(layers.layerOrder)
+    ufo.path = path
+    logger.info('Updated %d glyph files in %s', changed, path)
+
+
+def _save_glyphs_incrementally(layer, glyph_set, directory):
+    """Write the glyphs of a defcon layer to the directory of glyph_set,
+    only writing the .glif files that changed. Return the number of .glif
+    files that were written or deleted.
+    """
+    contents = glyph_set.contents
+    changed = 0
+    for name in sorted(set(contents) - set(layer.keys())):
+        os.remove(os.path.join(directory, contents.pop(name)))
+        changed += 1
+    existing = set(file_name.lower() for file_name in contents.values())
+    for name in sorted(layer.keys()):
+        file_name = contents.get(name)
+        if file_name is None:
+            file_name = userNameToFileName(name, existing, suffix='.glif')
+            contents[name] = file_name
+            existing.add(file_name.lower())
+        glyph = layer[name]
+        data = writeGlyphToString(name, glyph, glyph.drawPoints,
+                                  formatVersion=2).encode('utf-8')
+        if _write_if_changed(data, os.path.join(directory, file_name)):
+            changed += 1
+    # Like glyph_set.writeContents() and glyph_set.writeLayerInfo(layer),
+    # which always rewrite the files.
+    _write_if_changed(glifLib.plistlib.dumps(contents),
+                      os.path.join(directory, 'contents.plist'))
+    _write_if_changed(glifLib.plistlib.dumps(_layer_info_data(layer)),
+                      os.path.join(directory, glifLib.LAYERINFO_FILENAME))
+    return changed
+
+
+def _layer_info_data(layer):
+    """Return the validated layerinfo.plist data of a defcon layer."""
+    info_data = {}
+    for attr in glifLib.layerInfoVersion3ValueData:
+        value = getattr(layer, attr, None)
+        if value is None or (attr == 'lib' and not value):
+            continue
+        info_data[attr] = value
+    return glifLib.validateLayerInfoVersion3Data(info_data)
+
+
+def _write_if_changed(data, path):
+    """Write the bytes to path unless the file already has them. Return
+    whether the file was written.
+    """
+    if os.path.isfile(path):
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    with open(path, 'wb') as f:
+        f.write(data)
+    return True
+
+
+def _remove_other_files(directory, file_names):
+    """Delete the files of directory that are not in file_names, relative
+    paths, and the directories that become empty.
+    """
+    if not os.path.isdir(directory):
+        return
+    keep = set(os.path.normcase(os.path.normpath(name))
+               for name in file_names)
+    for root, dirs, files in os.walk(directory, topdown=False):
+        for name in files:
+            file_path = os.path.join(root, name)
+            relative_path = os.path.relpath(file_path, directory)
+            if os.path.normcase(relative_path) not in keep:
+                os.remove(file_path)
+        if not os.listdir(root):
+            os.rmdir(root)
+
+
+def move_if_changed(source, destination):
+    """Move the file source to destination, unless destination already has
+    the same content, in which case source is deleted. Return whether the
+    destination was written.
+    """
+    if (os.path.isfile(destination) and
+            filecmp.cmp(source, destination, shallow=False)):
+        os.remove(source)
+        return False
+    if os.path.exists(destination):
+        os.remove(destination)
+    shutil.move(source, destination)
+    return True
+
+
 def cast_to_number_or_bool(inputstr):
     """Cast a string to int, float or bool. Return original string if it can't be
     converted.
@@ -0,0 +1,354 @@
+# Copyright 2018 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Rebuild the master UFOs of a .glyphs source each time it is saved.
+
+`watch_masters` builds the masters once, then waits for the source to change
+and updates the UFOs in place. The parsed font and the master UFOs are kept
+in memory between builds: when only the layers of some glyphs changed, only
+these glyphs (and the composites that get anchors from them) are built
+again. Any other change rebuilds the masters in memory. Either way, only the
+files whose content changed are written.
+
+Changes are detected with inotify on Linux, and by polling the modification
+times of the source elsewhere.
+"""
+
+from __future__ import (print_function, division, absolute_import,
+                        unicode_literals)
+
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import sys
+import time
+
+from glyphsLib.builder import to_designspace
+from glyphsLib.builder.builders import UFOBuilder
+from glyphsLib.builder.constants import PUBLIC_PREFIX
+from glyphsLib.builder.features import _to_ufo_features
+from glyphsLib.builder.user_data import GLYPH_USER_DATA_KEY
+from glyphsLib.classes import GSFont
+from glyphsLib.fontdiff import diff
+from glyphsLib.util import save_ufo_incrementally
+
+logger = logging.getLogger(__name__)
+
+POSTSCRIPT_NAMES_KEY = PUBLIC_PREFIX + 'postscriptNames'
+
+# The changes to these attributes of a glyph change the groups of the UFOs,
+# so they need a full rebuild.
+GLYPH_KEYS_NEEDING_REBUILD = frozenset(
+    ('glyphname', 'leftKerningGroup', 'rightKerningGroup'))
+
+
+class IncrementalMasterBuilder(object):
+    """Build the master UFOs of a .glyphs file into master_dir, then update
+    them after the file changed.
+    """
+
+    def __init__(self, filename, master_dir, propagate_anchors=True):
+        self.filename = filename
+        self.master_dir = master_dir
+        self.propagate_anchors = propagate_anchors
+        self.font = None
+        self.ufos = []
+
+    def build(self, font=None):
+        """Build all the masters of the font, or of the file if no font is
+        given, and save them, only writing the files that changed.
+        """
+        if font is None:
+            font = GSFont(self.filename)
+        designspace = to_designspace(
+            font, propagate_anchors=self.propagate_anchors)
+        ufos = []
+        for source in designspace.sources:
+            save_ufo_incrementally(
+                source.font, os.path.join(self.master_dir, source.filename))
+            ufos.append(source.font)
+        self.font = font
+        self.ufos = ufos
+
+    def update(self):
+        """Read the file again and update the masters.
+
+        Return the names of the glyphs that were built again, or None if the
+        masters were built again entirely.
+        """
+        font = GSFont(self.filename)
+        glyph_names = self._changed_glyphs(font)
+        if glyph_names is None:
+            logger.info('Rebuilding all the masters of %s', self.filename)
+            self.build(font)
+            return None
+        if not glyph_names:
+            self.font = font
+            return set()
+
+        graph = font.componentGraph
+        if self.propagate_anchors:
+            # The composites get the anchors of their components.
+            for name in list(glyph_names):
+                glyph_names |= graph.users(name, recursive=True)
+        builder = UFOBuilder(font, propagate_anchors=self.propagate_anchors,
+                             subset=glyph_names)
+        partial_ufos = list(builder.masters)
+        if not all(_can_update(ufo, partial_ufo, glyph_names)
+                   for ufo, partial_ufo in zip(self.ufos, partial_ufos)):
+            logger.info('Layers were added or removed, rebuilding all the '
+                        'masters of %s', self.filename)
+            self.build(font)
+            return None
+
+        logger.info('Rebuilding %d glyphs of %s', len(glyph_names),
+                    self.filename)
+        for master, ufo, partial_ufo in zip(font.masters, self.ufos,
+                                            partial_ufos):
+            _update_glyphs(ufo, partial_ufo, glyph_names)
+            _to_ufo_features(builder, master, ufo)
+            save_ufo_incrementally(ufo, ufo.path)
+        self.font = font
+        return glyph_names
+
+    def _changed_glyphs(self, font):
+        """Return the set of the names of the glyphs whose layers changed, or
+        None if anything else changed.
+        """
+        if ([glyph.name for glyph in font.glyphs] !=
+                [glyph.name for glyph in self.font.glyphs]):
+            return None
+        glyph_names = set()
+        for change in diff(self.font, font):
+            path = change.path
+            if (path[0] != 'glyphs' or len(path) < 3 or
+                    path[2] in GLYPH_KEYS_NEEDING_REBUILD):
+                return None
+            glyph_names.add(path[1])
+        return glyph_names
+
+
+def _layer_glyphs(ufo, layer_name, glyph_names):
+    """Return the set of the given glyph names that are in a layer of the
+    UFO.
+    """
+    if layer_name not in ufo.layers:
+        return set()
+    return glyph_names.intersection(ufo.layers[layer_name].keys())
+
+
+def _can_update(ufo, partial_ufo, glyph_names):
+    """Return whether replacing the glyphs of a UFO by those of a partial UFO
+    leaves the same layers as a full build.
+    """
+    for layer in partial_ufo.layers:
+        if (layer.name not in ufo.layers and
+                _layer_glyphs(partial_ufo, layer.name, glyph_names)):
+            return False
+    for layer in ufo.layers:
+        if layer is ufo.layers.defaultLayer:
+            continue
+        if (not set(layer.keys()) - glyph_names and
+                not _layer_glyphs(partial_ufo, layer.name, glyph_names)):
+            return False
+    return True
+
+
+def _update_glyphs(ufo, partial_ufo, glyph_names):
+    for layer in ufo.layers:
+        new_glyphs = _layer_glyphs(partial_ufo, layer.name, glyph_names)
+        for name in sorted(_layer_glyphs(ufo, layer.name, glyph_names)):
+            if name not in new_glyphs:
+                del layer[name]
+        for name in sorted(new_glyphs):
+            # Replaces the existing glyph
+            layer.insertGlyph(partial_ufo.layers[layer.name][name])
+
+    postscript_names = dict(ufo.lib.get(POSTSCRIPT_NAMES_KEY, {}))
+    new_postscript_names = partial_ufo.lib.get(POSTSCRIPT_NAMES_KEY, {})
+    for name in glyph_names:
+        postscript_names.pop(name, None)
+        if name in new_postscript_names:
+            postscript_names[name] = new_postscript_names[name]
+        key = GLYPH_USER_DATA_KEY + '.' + name
+        if partial_ufo.lib.get(key) != ufo.lib.get(key):
+            if key in partial_ufo.lib:
+                ufo.lib[key] = partial_ufo.lib[key]
+            else:
+                del ufo.lib[key]
+    if postscript_names != ufo.lib.get(POSTSCRIPT_NAMES_KEY, {}):
+        ufo.lib[POSTSCRIPT_NAMES_KEY] = postscript_names
+
+
+class PollingWatcher(object):
+    """Wait for changes by comparing the modification times and sizes of the
+    watched files at regular intervals.
+    """
+
+    def __init__(self, path, interval=1.0):
+        self.path = path
+        self.interval = interval
+        self._state = _path_state(path)
+
+    def wait(self, timeout=None):
+        """Wait until the watched path changes. Return False if it did not
+        change within `timeout` seconds.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            state = _path_state(self.path)
+            if state != self._state:
+                self._state = state
+                return True
+            if deadline is not None and time.time() >= deadline:
+                return False
+            time.sleep(self.interval)
+
+    def close(self):
+        pass
+
+
+# From <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+INOTIFY_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM |
+                IN_MOVED_TO | IN_CREATE | IN_DELETE)
+
+
+class InotifyWatcher(PollingWatcher):
+    """Wait for changes with the inotify API of Linux.
+
+    The directory of a .glyphs file is watched, so that files replaced by
+    renaming are seen too, and the events are checked against the state of
+    the watched path like the polling does.
+    """
+
+    def __init__(self, path, interval=1.0):
+        if not sys.platform.startswith('linux'):
+            raise OSError(errno.ENOSYS, 'inotify is only available on Linux')
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6',
+                           use_errno=True)
+        fd = libc.inotify_init()
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init failed')
+        self._fd = fd
+        try:
+            for directory in _watched_directories(path):
+                encoded = os.path.abspath(directory).encode(
+                    sys.getfilesystemencoding())
+                if libc.inotify_add_watch(fd, encoded, INOTIFY_MASK) < 0:
+                    raise OSError(ctypes.get_errno(),
+                                  'inotify_add_watch failed', directory)
+        except Exception:
+            os.close(fd)
+            raise
+        super(InotifyWatcher, self).__init__(path, interval)
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            remaining = None
+            if deadline is not None:
+                remaining = max(0, deadline - time.time())
+            readable, _, _ = select.select([self._fd], [], [], remaining)
+            if not readable:
+                return False
+            # Let the writes of the same save come in, then drain them all.
+            time.sleep(0.05)
+            os.read(self._fd, 65536)
+            state = _path_state(self.path)
+            if state != self._state:
+                self._state = state
+                return True
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+def make_watcher(path, interval=1.0, polling=False):
+    """Return an InotifyWatcher for the path if possible, or else a
+    PollingWatcher.
+    """
+    if not polling:
+        try:
+            return InotifyWatcher(path, interval)
+        except (OSError, AttributeError) as e:
+            logger.info('Polling for changes, inotify is not available: %s',
+                        e)
+    return PollingWatcher(path, interval)
+
+
+def _watched_directories(path):
+    if os.path.isdir(path):
+        # .glyphspackage
+        return [root for root, _, _ in os.walk(path)]
+    return [os.path.dirname(os.path.abspath(path))]
+
+
+def _path_state(path):
+    """Return the modification times and sizes of the file at path, or of
+    the files in the directory at path.
+    """
+    if os.path.isdir(path):
+        paths = sorted(os.path.join(root, name)
+                       for root, _, names in os.walk(path) for name in names)
+    else:
+        paths = [path]
+    state = []
+    for file_path in paths:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            state.append((file_path, None))
+        else:
+            state.append((file_path, stat.st_mtime, stat.st_size))
+    return state
+
+
+def watch_masters(filename, master_dir, propagate_anchors=True,
+                  interval=1.0, polling=False):
+    """Build the master UFOs of a .glyphs file into master_dir, then update
+    them each time the file changes, until interrupted.
+    """
+    builder = IncrementalMasterBuilder(filename, master_dir,
+                                       propagate_anchors=propagate_anchors)
+    builder.build()
+    watcher = make_watcher(filename, interval=interval, polling=polling)
+    logger.info('Watching %s for changes', filename)
+    try:
+        while True:
+            watcher.wait()
+            start = time.time()
+            try:
+                builder.update()
+            except Exception:
+                # Maybe a file that is being saved: try again next time.
+                logger.exception('Could not update the masters of %s',
+                                 filename)
+                continue
+            logger.info('Updated the masters in %.2fs', time.time() - start)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
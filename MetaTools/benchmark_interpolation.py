@@ -0,0 +1,110 @@
+# coding=UTF-8
+#
+# Copyright 2018 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare the speed and the output of the interpolation engines.
+
+Usage: python MetaTools/benchmark_interpolation.py FONT.glyphs [...]
+
+For each instance, prints the number of glyphs whose outlines, components,
+anchors or advance width differ between the engines, and the largest
+coordinate difference among them.
+"""
+
+from __future__ import (print_function, division, absolute_import,
+                        unicode_literals)
+
+import argparse
+import logging
+import sys
+import time
+sys.path.append("./Lib")
+
+import glyphsLib
+from glyphsLib.interpolation import (interpolate_designspace,
+                                     INTERPOLATION_ENGINES)
+
+
+def _glyph_values(glyph):
+    values = []
+    for contour in glyph:
+        for point in contour:
+            values.extend((point.x, point.y))
+    for component in glyph.components:
+        values.extend(component.transformation)
+    for anchor in glyph.anchors:
+        values.extend((anchor.x, anchor.y))
+    values.append(glyph.width)
+    return values
+
+
+def compare(reference, other):
+    """Return the number of differing glyphs and the largest difference."""
+    count = 0
+    largest = 0
+    for glyph in reference:
+        values = _glyph_values(glyph)
+        other_values = _glyph_values(other[glyph.name])
+        if values == other_values:
+            continue
+        count += 1
+        if len(values) != len(other_values):
+            largest = float('inf')
+        else:
+            largest = max([largest] + [abs(a - b) for a, b in
+                                       zip(values, other_values)])
+    return count, largest
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('fonts', metavar='FONT', nargs='+',
+                        help='.glyphs files to interpolate')
+    parser.add_argument('-n', '--repeat', type=int, default=1,
+                        help='number of runs of each engine, the best one '
+                             'is reported (default: 1)')
+    options = parser.parse_args(args)
+    logging.basicConfig(level=logging.ERROR)
+
+    for path in options.fonts:
+        font = glyphsLib.GSFont(path)
+        _, instance_data = glyphsLib.to_ufos(font, include_instances=True)
+        designspace = instance_data['designspace']
+        print('%s: %d glyphs, %d masters, %d instances' % (
+            path, len(font.glyphs), len(designspace.sources),
+            len(designspace.instances)))
+
+        results = {}
+        for engine in INTERPOLATION_ENGINES:
+            timings = []
+            for _ in range(options.repeat):
+                start = time.time()
+                results[engine] = interpolate_designspace(
+                    designspace, engine=engine)
+                timings.append(time.time() - start)
+            print('  %-12s %8.2fs' % (engine, min(timings)))
+
+        reference = results[INTERPOLATION_ENGINES[0]]
+        for engine in INTERPOLATION_ENGINES[1:]:
+            for instance, expected, ufo in zip(designspace.instances,
+                                               reference, results[engine]):
+                count, largest = compare(expected, ufo)
+                print('  %s vs %s, %s: %d glyphs differ, by up to %g' % (
+                    engine, INTERPOLATION_ENGINES[0], instance.name, count,
+                    largest))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -184,6 +184,10 @@ setup(
         "defcon>=0.3.0",
         "MutatorMath>=2.0.4",
     ],
+    extras_require={
+        # faster interpolation of instances
+        "numpy": ["numpy"],
+    },
     cmdclass={
         "release": release,
         "bump_version": bump_version,
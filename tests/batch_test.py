@@ -0,0 +1,115 @@
+# coding=UTF-8
+#
+# Copyright 2018 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import (print_function, division, absolute_import,
+                        unicode_literals)
+
+import glob
+import os
+import shutil
+import tempfile
+import unittest
+
+import glyphsLib.__main__
+from glyphsLib.batch import find_sources, convert_sources
+from glyphsLib.classes import GSFont
+
+TESTFILE_PATH = os.path.join(
+    os.path.dirname(__file__), 'data', 'GlyphsUnitTestSans.glyphs')
+
+
+class BatchTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.source_dir = os.path.join(self.tmpdir, 'sources')
+        os.makedirs(os.path.join(self.source_dir, 'sub'))
+        shutil.copy(TESTFILE_PATH,
+                    os.path.join(self.source_dir, 'Font.glyphs'))
+        GSFont(TESTFILE_PATH).save(
+            os.path.join(self.source_dir, 'sub', 'Package.glyphspackage'))
+        with open(os.path.join(self.source_dir, 'sub', 'Broken.glyphs'),
+                  'w') as fp:
+            fp.write('not a glyphs file')
+        with open(os.path.join(self.source_dir, 'notes.txt'), 'w') as fp:
+            fp.write('not a source')
+        self.output_dir = os.path.join(self.tmpdir, 'ufos')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_find_sources(self):
+        self.assertEqual(find_sources([self.source_dir, TESTFILE_PATH]), [
+            (os.path.join(self.source_dir, 'Font.glyphs'), 'Font'),
+            (os.path.join(self.source_dir, 'sub', 'Broken.glyphs'),
+             os.path.join('sub', 'Broken')),
+            (os.path.join(self.source_dir, 'sub', 'Package.glyphspackage'),
+             os.path.join('sub', 'Package')),
+            (TESTFILE_PATH, 'GlyphsUnitTestSans'),
+        ])
+
+    def test_find_sources_same_output_path(self):
+        other_dir = os.path.join(self.tmpdir, 'other')
+        os.makedirs(other_dir)
+        shutil.copy(TESTFILE_PATH, os.path.join(other_dir, 'Font.glyphs'))
+        with open(os.path.join(other_dir, 'Font-2.glyphs'), 'w') as fp:
+            fp.write('another source')
+        sources = find_sources([
+            os.path.join(self.source_dir, 'Font.glyphs'),
+            os.path.join(other_dir, 'Font.glyphs'), other_dir])
+        self.assertEqual([output for _, output in sources],
+                         ['Font', 'Font-3', 'Font-2', 'Font-4'])
+
+    def check_convert_sources(self, jobs):
+        reported = []
+        results = convert_sources(find_sources([self.source_dir]),
+                                  self.output_dir, jobs=jobs,
+                                  callback=reported.append)
+        self.assertEqual(reported, results)
+        results = {os.path.relpath(result.path, self.source_dir): result
+                   for result in results}
+        self.assertEqual(sorted(results), [
+            'Font.glyphs', os.path.join('sub', 'Broken.glyphs'),
+            os.path.join('sub', 'Package.glyphspackage')])
+
+        self.assertIn('Traceback',
+                      results[os.path.join('sub', 'Broken.glyphs')].error)
+        for path, name in (('Font.glyphs', 'Font'),
+                           (os.path.join('sub', 'Package.glyphspackage'),
+                            os.path.join('sub', 'Package'))):
+            result = results[path]
+            self.assertIsNone(result.error)
+            self.assertGreater(result.seconds, 0)
+            output_dir = os.path.join(self.output_dir, name)
+            self.assertEqual(result.output_dir, output_dir)
+            self.assertEqual(len(glob.glob(output_dir + '/*.ufo')), 3)
+            self.assertTrue(os.path.exists(os.path.join(
+                output_dir, 'GlyphsUnitTestSans.designspace')))
+
+    def test_convert_sources(self):
+        self.check_convert_sources(jobs=1)
+
+    def test_convert_sources_in_workers(self):
+        self.check_convert_sources(jobs=2)
+
+    def test_main(self):
+        status = glyphsLib.__main__.main(
+            ['batch', self.source_dir, '-o', self.output_dir, '-j', '1'])
+        self.assertEqual(status, 1)
+        self.assertEqual(len(glob.glob(self.output_dir + '/Font/*.ufo')), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,327 @@
+# Copyright 2018 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmarks of the parser, the writer, the builders and the interpolation.
+
+Each benchmark times one operation (loads, dumps, to_ufos, to_designspace,
+to_glyphs, interpolate_designspace) on one source: the fixtures of
+tests/data, and a larger font made by generate_font.py. The time of a
+benchmark is the best of a few runs.
+
+Save the times of a revision, then compare another revision against them:
+
+    python tests/benchmark.py --save-baseline baseline.json
+    python tests/benchmark.py --baseline baseline.json --threshold 0.2
+
+The comparison fails (exit status 1) when a benchmark got slower than its
+baseline by more than the threshold, a fraction of the baseline time.
+Baselines are only comparable on the same machine.
+
+With --allocations, the benchmarks are not timed: they count the helper
+objects (proxies of the object lists, layer iterators) that one run creates.
+"""
+
+from __future__ import (print_function, division, absolute_import,
+                        unicode_literals)
+
+import argparse
+from collections import Counter, OrderedDict, namedtuple
+import fnmatch
+import gc
+from io import open
+import json
+import logging
+import os
+import platform
+import sys
+from timeit import default_timer
+
+import glyphsLib
+from glyphsLib import (loads, dumps, to_ufos, to_designspace, to_glyphs,
+                       interpolate_designspace)
+from glyphsLib.classes import Proxy, LayersIterator
+
+from generate_font import FontSpec, generate_font
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+FIXTURES = ['GlyphsUnitTestSans.glyphs', 'MontserratStrippedDown.glyphs']
+LARGE_FONT_SPEC = FontSpec(glyphs=1000, masters=4, kerning_pairs=40000,
+                           kerning_groups=200, instances=4)
+LARGE_FONT_NAME = 'Synthetic-%dx%d' % (LARGE_FONT_SPEC.glyphs,
+                                       LARGE_FONT_SPEC.masters)
+
+BASELINE_FORMAT = 1
+
+# The short-lived objects counted by --allocations. The subclasses of Proxy
+# all go through Proxy.__init__.
+ALLOCATION_CLASSES = (Proxy, LayersIterator)
+
+Benchmark = namedtuple('Benchmark', 'name setup run repeat')
+Benchmark.__doc__ = """An operation to time.
+
+`setup` returns the arguments of `run`, it is called before each run and is
+not timed. `repeat` is the default number of runs.
+"""
+
+
+def _once(function):
+    """Return a function that calls function the first time and returns the
+    same result afterwards.
+    """
+    result = []
+
+    def wrapper():
+        if not result:
+            result.append(function())
+        return result[0]
+    return wrapper
+
+
+def _sources(large=True):
+    sources = OrderedDict()
+    for filename in FIXTURES:
+        path = os.path.join(DATA_DIR, filename)
+        sources[os.path.splitext(filename)[0]] = _once(
+            lambda path=path: open(path, 'r', encoding='utf-8').read())
+    if large:
+        sources[LARGE_FONT_NAME] = _once(
+            lambda: dumps(generate_font(LARGE_FONT_SPEC)))
+    return sources
+
+
+def benchmarks(large=True):
+    """Return the list of the Benchmarks, including those on the large fonts
+    if `large` is True.
+    """
+    result = []
+    for source_name, text in _sources(large).items():
+        font = _once(lambda text=text: loads(text()))
+        designspace = _once(lambda font=font: to_designspace(font()))
+        repeat = 3 if source_name == LARGE_FONT_NAME else 5
+
+        def add(operation, setup, run):
+            result.append(Benchmark(
+                '%s/%s' % (operation, source_name), setup, run, repeat))
+
+        add('loads', lambda text=text: (text(),), loads)
+        add('dumps', lambda font=font: (font(),), dumps)
+        add('to_ufos', lambda font=font: (font(),), to_ufos)
+        add('to_designspace', lambda font=font: (font(),), to_designspace)
+        # to_glyphs loads the UFOs into the designspace: use a new one each
+        # time.
+        add('to_glyphs', lambda font=font: (to_designspace(font()),),
+            to_glyphs)
+        add('interpolate', lambda designspace=designspace: (designspace(),),
+            interpolate_designspace)
+    return result
+
+
+def select(benchmarks, patterns):
+    """Return the benchmarks whose names match one of the shell-style
+    patterns, or all of them if there are no patterns.
+    """
+    if not patterns:
+        return list(benchmarks)
+    return [benchmark for benchmark in benchmarks
+            if any(fnmatch.fnmatchcase(benchmark.name, pattern)
+                   for pattern in patterns)]
+
+
+def time_benchmark(benchmark, repeat=None):
+    """Return the best time in seconds of `repeat` runs of the benchmark."""
+    best = None
+    for _ in range(repeat or benchmark.repeat):
+        args = benchmark.setup()
+        gc.collect()
+        start = default_timer()
+        benchmark.run(*args)
+        seconds = default_timer() - start
+        if best is None or seconds < best:
+            best = seconds
+    return best
+
+
+def run_benchmarks(benchmarks, repeat=None, callback=None):
+    """Time the benchmarks and return an OrderedDict of their name to their
+    best time. `callback` is called with each name and time.
+    """
+    results = OrderedDict()
+    for benchmark in benchmarks:
+        seconds = time_benchmark(benchmark, repeat)
+        results[benchmark.name] = seconds
+        if callback is not None:
+            callback(benchmark.name, seconds)
+    return results
+
+
+def count_allocations(benchmark, classes=ALLOCATION_CLASSES):
+    """Return a Counter of the class names of the instances of classes, and
+    of their subclasses, that one run of the benchmark creates.
+    """
+    counts = Counter()
+
+    def counting(init):
+        def __init__(self, *args, **kwargs):
+            counts[self.__class__.__name__] += 1
+            init(self, *args, **kwargs)
+        return __init__
+
+    args = benchmark.setup()
+    originals = [(cls, cls.__dict__['__init__']) for cls in classes]
+    for cls, init in originals:
+        cls.__init__ = counting(init)
+    try:
+        benchmark.run(*args)
+    finally:
+        for cls, init in originals:
+            cls.__init__ = init
+    return counts
+
+
+def save_baseline(path, results):
+    data = OrderedDict([
+        ('format', BASELINE_FORMAT),
+        ('glyphsLib', glyphsLib.__version__),
+        ('python', platform.python_version()),
+        ('machine', platform.platform()),
+        ('results', results),
+    ])
+    with open(path, 'w', encoding='utf-8') as fp:
+        fp.write(json.dumps(data, indent=2, separators=(',', ': ')) + '\n')
+
+
+def load_baseline(path):
+    """Return the dict of benchmark name to time saved in a baseline file."""
+    with open(path, 'r', encoding='utf-8') as fp:
+        data = json.load(fp)
+    if data.get('format') != BASELINE_FORMAT:
+        raise ValueError('Unsupported baseline format in %s: %r'
+                         % (path, data.get('format')))
+    if data.get('machine') != platform.platform():
+        print('Warning: the baseline was measured on %s' % data['machine'],
+              file=sys.stderr)
+    return data['results']
+
+
+Comparison = namedtuple('Comparison', 'name seconds baseline change regressed')
+
+
+def compare(results, baseline, threshold):
+    """Return the Comparisons of the results with the baseline.
+
+    `change` is the relative difference with the baseline time, or None for
+    the benchmarks that are not in the baseline. A benchmark regressed if its
+    change is more than threshold.
+    """
+    comparisons = []
+    for name, seconds in results.items():
+        baseline_seconds = baseline.get(name)
+        change = None
+        if baseline_seconds:
+            change = seconds / baseline_seconds - 1
+        comparisons.append(Comparison(
+            name, seconds, baseline_seconds, change,
+            change is not None and change > threshold))
+    return comparisons
+
+
+def _format_row(name, seconds, baseline=None, change=None, mark=''):
+    row = '%-40s %10.4f' % (name, seconds)
+    if baseline is not None:
+        row += ' %10.4f %+8.1f%% %s' % (baseline, 100 * change, mark)
+    return row.rstrip()
+
+
+def parse_options(args):
+    parser = argparse.ArgumentParser(
+        description='Time the parser, the writer, the builders and the '
+                    'interpolation of glyphsLib.')
+    parser.add_argument('-k', '--filter', metavar='PATTERN', action='append',
+                        help='Only run the benchmarks whose names match '
+                             'PATTERN, a shell-style glob, e.g. '
+                             '"to_ufos/*". Can be repeated.')
+    parser.add_argument('-r', '--repeat', metavar='N', type=int,
+                        help='Number of runs of each benchmark, the best '
+                             'one counts. (default: 5, 3 on large fonts)')
+    parser.add_argument('--no-large', action='store_true',
+                        help='Skip the benchmarks on the large fonts.')
+    parser.add_argument('--save-baseline', metavar='FILE',
+                        help='Save the times to FILE.')
+    parser.add_argument('--baseline', metavar='FILE',
+                        help='Compare the times with those saved in FILE.')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='With --baseline, fail when a benchmark is '
+                             'slower than its baseline by more than this '
+                             'fraction. (default: %(default)s)')
+    parser.add_argument('-l', '--list', action='store_true',
+                        help='List the benchmarks without running them.')
+    parser.add_argument('--allocations', action='store_true',
+                        help='Count the proxy and layer iterator objects '
+                             'created by one run of each benchmark instead '
+                             'of timing them.')
+    opt = parser.parse_args(args)
+    if opt.allocations and (opt.save_baseline or opt.baseline):
+        parser.error('--allocations cannot be used with baselines')
+    return opt
+
+
+def main(args=None):
+    opt = parse_options(args)
+    # The builders warn about the fixtures, e.g. their kerning groups
+    logging.basicConfig(level=logging.ERROR)
+    selected = select(benchmarks(large=not opt.no_large), opt.filter)
+    if opt.list:
+        for benchmark in selected:
+            print(benchmark.name)
+        return 0
+    if opt.allocations:
+        for benchmark in selected:
+            counts = count_allocations(benchmark)
+            print('%-40s %10d  %s' % (
+                benchmark.name, sum(counts.values()),
+                ', '.join('%s=%d' % item for item in sorted(
+                    counts.items(), key=lambda item: (-item[1], item[0])))))
+            sys.stdout.flush()
+        return 0
+    baseline = load_baseline(opt.baseline) if opt.baseline else None
+
+    def report(name, seconds):
+        if baseline is None or not baseline.get(name):
+            print(_format_row(name, seconds))
+        else:
+            comparison, = compare({name: seconds}, baseline, opt.threshold)
+            print(_format_row(name, seconds, comparison.baseline,
+                              comparison.change,
+                              'REGRESSION' if comparison.regressed else ''))
+        sys.stdout.flush()
+
+    results = run_benchmarks(selected, opt.repeat, callback=report)
+    if opt.save_baseline:
+        save_baseline(opt.save_baseline, results)
+    if baseline is not None:
+        regressions = [comparison for comparison in
+                       compare(results, baseline, opt.threshold)
+                       if comparison.regressed]
+        if regressions:
+            print('%d benchmarks are more than %d%% slower than the '
+                  'baseline: %s' % (
+                      len(regressions), 100 * opt.threshold,
+                      ', '.join(comparison.name
+                                for comparison in regressions)))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
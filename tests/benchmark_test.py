@@ -0,0 +1,89 @@
+# coding=UTF-8
+#
+# Copyright 2018 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import (print_function, division, absolute_import,
+                        unicode_literals)
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import benchmark
+
+
+class BenchmarkTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.baseline_path = os.path.join(self.tmpdir, 'baseline.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_select(self):
+        benchmarks = benchmark.benchmarks(large=False)
+        names = [b.name for b in benchmark.select(
+            benchmarks, ['loads/*', 'to_ufos/Montserrat*'])]
+        self.assertEqual(names, [
+            'loads/GlyphsUnitTestSans', 'loads/MontserratStrippedDown',
+            'to_ufos/MontserratStrippedDown'])
+        self.assertEqual(benchmark.select(benchmarks, None), benchmarks)
+
+    def test_compare(self):
+        comparisons = benchmark.compare(
+            {'a': 1.1, 'b': 1.5, 'c': 1.0}, {'a': 1.0, 'b': 1.0}, 0.2)
+        self.assertEqual([(c.name, c.baseline, c.regressed)
+                          for c in comparisons],
+                         [('a', 1.0, False), ('b', 1.0, True),
+                          ('c', None, False)])
+        self.assertAlmostEqual(comparisons[1].change, 0.5)
+        self.assertIsNone(comparisons[2].change)
+
+    def test_baseline_roundtrip(self):
+        benchmark.save_baseline(self.baseline_path, {'loads/x': 0.5})
+        self.assertEqual(benchmark.load_baseline(self.baseline_path),
+                         {'loads/x': 0.5})
+
+    def test_count_allocations(self):
+        benchmarks = benchmark.benchmarks(large=False)
+        loads, = benchmark.select(benchmarks, ['loads/GlyphsUnitTestSans'])
+        dumps, = benchmark.select(benchmarks, ['dumps/GlyphsUnitTestSans'])
+        self.assertGreater(benchmark.count_allocations(loads)['FontGlyphsProxy'], 0)
+        # The proxies are created once per object
+        benchmark.count_allocations(dumps)
+        self.assertEqual(benchmark.count_allocations(dumps), {})
+
+    def test_main(self):
+        args = ['-k', 'loads/GlyphsUnitTestSans', '-r', '1', '--no-large']
+        self.assertEqual(benchmark.main(
+            args + ['--save-baseline', self.baseline_path]), 0)
+        results = benchmark.load_baseline(self.baseline_path)
+        self.assertEqual(list(results), ['loads/GlyphsUnitTestSans'])
+
+        # Within the threshold of itself
+        self.assertEqual(benchmark.main(
+            args + ['--baseline', self.baseline_path, '--threshold', '100']),
+            0)
+
+        # Much slower than a fake baseline
+        benchmark.save_baseline(self.baseline_path,
+                                {'loads/GlyphsUnitTestSans': 1e-9})
+        self.assertEqual(benchmark.main(
+            args + ['--baseline', self.baseline_path]), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -35,7 +35,7 @@ from glyphsLib.classes import (
     GSPath, GSNode, GSAnchor, GSComponent, GSAlignmentZone, GSGuideLine)
 from glyphsLib.types import Point
 
-from glyphsLib.builder import to_ufos, to_glyphs
+from glyphsLib.builder import to_ufos, to_designspace, to_glyphs
 from glyphsLib.builder.builders import UFOBuilder, GlyphsBuilder
 from glyphsLib.builder.paths import to_ufo_paths
 from glyphsLib.builder.names import build_stylemap_names
@@ -440,6 +440,29 @@ class ToUfosTest(unittest.TestCase):
                 self.assertEqual(anchor.name, 'bottom_2')
                 self.assertEqual(anchor.x, 150)
 
+    def test_propagate_anchors_composites_before_bases(self):
+        font = generate_minimal_font()
+
+        glyphs = (
+            ('Ecircumflexacute', [('Ecircumflex', 0, 0), ('acute', 0, 100)],
+             []),
+            ('Ecircumflex', [('E', 0, 0), ('circumflex', 0, 50)], []),
+            ('E', [], [('top', 100, 500), ('bottom', 100, 0)]),
+            ('circumflex', [], [('_top', 0, 400), ('top', 0, 600)]),
+            ('acute', [], [('_top', 0, 400), ('top', 0, 600)]),
+        )
+        for name, component_data, anchor_data in glyphs:
+            add_glyph(font, name)
+            for n, x, y, in anchor_data:
+                add_anchor(font, name, n, x, y)
+            for n, x, y in component_data:
+                add_component(font, name, n, (1, 0, 0, 1, x, y))
+
+        ufo, = to_ufos(font)
+        self.assertEqual(
+            [(a.name, a.x, a.y) for a in ufo['Ecircumflexacute'].anchors],
+            [('bottom', 100, 0), ('top', 0, 700)])
+
     def test_fail_during_anchor_propagation(self):
         """Fix https://github.com/googlei18n/glyphsLib/issues/317"""
         font = generate_minimal_font()
@@ -1199,5 +1222,184 @@ class GlyphOrderTest(unittest.TestCase):
                          font.customParameters['glyphOrder'])
 
 
+class SubsetTest(unittest.TestCase):
+    def setUp(self):
+        self.font = generate_minimal_font()
+        for name in ('A', 'B', 'acutecomb', 'Aacute', 'Aacute.ss01', 'V'):
+            add_glyph(self.font, name)
+        add_component(self.font, 'Aacute', 'A', (1, 0, 0, 1, 0, 0))
+        add_component(self.font, 'Aacute', 'acutecomb', (1, 0, 0, 1, 0, 0))
+        add_component(self.font, 'Aacute.ss01', 'Aacute', (1, 0, 0, 1, 0, 0))
+        for name in ('A', 'Aacute', 'Aacute.ss01'):
+            self.font.glyphs[name].rightKerningGroup = 'A'
+            self.font.glyphs[name].leftKerningGroup = 'A'
+        self.font.glyphs['V'].leftKerningGroup = 'V'
+        self.font.setKerningForPair('id', '@MMK_L_A', '@MMK_R_V', -10)
+        self.font.setKerningForPair('id', '@MMK_L_A', 'B', -20)
+        self.font.setKerningForPair('id', 'B', '@MMK_R_A', -30)
+
+    def test_component_closure(self):
+        ufo, = to_ufos(self.font, subset=['Aacute.ss01'])
+        self.assertEqual(sorted(ufo.keys()),
+                         ['A', 'Aacute', 'Aacute.ss01', 'acutecomb'])
+        self.assertEqual(ufo.glyphOrder,
+                         ['A', 'acutecomb', 'Aacute', 'Aacute.ss01'])
+
+    def test_groups_and_kerning_are_pruned(self):
+        ufo, = to_ufos(self.font, subset=['Aacute', 'B'])
+        self.assertEqual(dict(ufo.groups), {
+            'public.kern1.A': ['A', 'Aacute'],
+            'public.kern2.A': ['A', 'Aacute'],
+        })
+        self.assertEqual(dict(ufo.kerning), {
+            ('public.kern1.A', 'B'): -20,
+            ('B', 'public.kern2.A'): -30,
+        })
+
+    def test_missing_glyph(self):
+        with CapturingLogHandler(builder.logger, level='WARNING') as captor:
+            ufo, = to_ufos(self.font, subset=['A', 'Z'])
+        captor.assertRegex('Glyphs not found in the font: Z')
+        self.assertEqual(list(ufo.keys()), ['A'])
+
+    def test_no_subset(self):
+        ufo, = to_ufos(self.font)
+        self.assertEqual(len(ufo), 6)
+        self.assertEqual(len(ufo.kerning), 3)
+
+
+class MasterSelectionTest(unittest.TestCase):
+    def setUp(self):
+        path = os.path.join(os.path.dirname(__file__), '..', 'data',
+                            'GlyphsUnitTestSans.glyphs')
+        self.font = GSFont(path)
+
+    def test_select_by_name(self):
+        ufo, = to_ufos(self.font, masters=['Bold'])
+        expected = to_ufos(GSFont(self.font.filepath))[2]
+        self.assertEqual(ufo.info.styleName, 'Bold')
+        self.assertEqual(ufo.glyphOrder, expected.glyphOrder)
+        self.assertEqual(sorted(ufo.keys()), sorted(expected.keys()))
+        self.assertEqual(dict(ufo.kerning), dict(expected.kerning))
+        self.assertEqual(dict(ufo.groups), dict(expected.groups))
+        self.assertEqual(ufo.features.text, expected.features.text)
+        self.assertEqual(
+            [(a.name, a.x, a.y) for a in ufo['Adieresis'].anchors],
+            [(a.name, a.x, a.y) for a in expected['Adieresis'].anchors])
+
+    def test_designspace_keeps_all_sources(self):
+        master_id = self.font.masters[0].id
+        designspace = to_designspace(self.font, masters=[master_id, 'Bold'])
+        self.assertEqual([source.styleName for source in designspace.sources],
+                         ['Light', 'Regular', 'Bold'])
+        self.assertEqual([source.font is not None
+                          for source in designspace.sources],
+                         [True, False, True])
+        self.assertEqual(designspace.sources[1].filename,
+                         'GlyphsUnitTestSans-Regular.ufo')
+        expected = to_designspace(GSFont(self.font.filepath))
+        self.assertEqual([axis.serialize() for axis in designspace.axes],
+                         [axis.serialize() for axis in expected.axes])
+        self.assertEqual([source.location for source in designspace.sources],
+                         [source.location for source in expected.sources])
+        self.assertEqual(len(designspace.instances), len(expected.instances))
+        self.assertEqual(len(designspace.sources[0].font), 11)
+
+    def test_unknown_master(self):
+        with self.assertRaises(ValueError):
+            UFOBuilder(self.font, masters=['Heavy'])
+
+
+class FlattenComponentsTest(unittest.TestCase):
+    def setUp(self):
+        self.font = generate_minimal_font()
+        for name in ('A', 'acutecomb', 'Aacute', 'Aacute.ss01', 'Aacute.ss02',
+                     'Atilde'):
+            add_glyph(self.font, name)
+        self._add_square(self.font.glyphs['A'], 0, 0, 100)
+        self._add_square(self.font.glyphs['acutecomb'], 40, 120, 20)
+        add_anchor(self.font, 'A', 'top', 50, 100)
+        add_anchor(self.font, 'acutecomb', '_top', 50, 100)
+        add_anchor(self.font, 'acutecomb', 'top', 50, 150)
+        add_component(self.font, 'Aacute', 'A', (1, 0, 0, 1, 0, 0))
+        add_component(self.font, 'Aacute', 'acutecomb', (1, 0, 0, 1, 0, 0))
+        add_component(self.font, 'Aacute.ss01', 'Aacute',
+                      (2, 0, 0, 2, 10, 0))
+        add_component(self.font, 'Aacute.ss02', 'Aacute', (1, 0, 0, 1, 5, 0))
+        # Mixed glyph: outlines and components
+        self._add_square(self.font.glyphs['Atilde'], 0, 200, 10)
+        add_component(self.font, 'Atilde', 'A', (1, 0, 0, 1, 0, 0))
+
+    @staticmethod
+    def _add_square(glyph, x, y, size):
+        path = GSPath()
+        for point in ((x, y), (x + size, y), (x + size, y + size),
+                      (x, y + size)):
+            path.nodes.append(GSNode(point, 'line'))
+        glyph.layers[0].paths.append(path)
+
+    @staticmethod
+    def _components(glyph):
+        return [(c.baseGlyph, tuple(c.transformation))
+                for c in glyph.components]
+
+    def test_no_flattening(self):
+        ufo, = to_ufos(self.font)
+        self.assertEqual(self._components(ufo['Aacute.ss01']),
+                         [('Aacute', (2, 0, 0, 2, 10, 0))])
+
+    def test_flatten_nested_components(self):
+        ufo, = to_ufos(self.font, flatten_components=True)
+        self.assertEqual(self._components(ufo['Aacute.ss01']),
+                         [('A', (2, 0, 0, 2, 10, 0)),
+                          ('acutecomb', (2, 0, 0, 2, 10, 0))])
+        self.assertEqual(self._components(ufo['Aacute']),
+                         [('A', (1, 0, 0, 1, 0, 0)),
+                          ('acutecomb', (1, 0, 0, 1, 0, 0))])
+        self.assertEqual(len(ufo['Aacute.ss01']), 0)
+        # Anchors are propagated as without flattening
+        self.assertEqual([(a.name, a.x, a.y)
+                          for a in ufo['Aacute.ss01'].anchors],
+                         [('top', 110, 300)])
+
+    def test_mixed_glyphs_are_not_flattened(self):
+        add_glyph(self.font, 'Atilde.ss01')
+        add_component(self.font, 'Atilde.ss01', 'Atilde',
+                      (1, 0, 0, 1, 0, 0))
+        ufo, = to_ufos(self.font, flatten_components=True)
+        self.assertEqual(self._components(ufo['Atilde.ss01']),
+                         [('Atilde', (1, 0, 0, 1, 0, 0))])
+
+    def test_flattened_bases_are_memoized(self):
+        builder = UFOBuilder(self.font, flatten_components=True)
+        ufo, = builder.masters
+        master_id = self.font.masters[0].id
+        self.assertEqual(builder._flattened_bases[(master_id, 'Aacute')],
+                         (('A', (1, 0, 0, 1, 0, 0)),
+                          ('acutecomb', (1, 0, 0, 1, 0, 0))))
+        self.assertIsNone(builder._flattened_bases[(master_id, 'A')])
+        self.assertEqual(self._components(ufo['Aacute.ss02']),
+                         [('A', (1, 0, 0, 1, 5, 0)),
+                          ('acutecomb', (1, 0, 0, 1, 5, 0))])
+
+    def test_decompose_all_components(self):
+        ufo, = to_ufos(self.font, flatten_components='all')
+        for glyph in ufo:
+            self.assertEqual(len(glyph.components), 0)
+        glyph = ufo['Aacute.ss01']
+        self.assertEqual(len(glyph), 2)
+        self.assertEqual([(p.x, p.y, p.segmentType) for p in glyph[1]],
+                         [(90, 280, 'line'), (90, 240, 'line'),
+                          (130, 240, 'line'), (130, 280, 'line')])
+        self.assertEqual(len(ufo['Atilde']), 2)
+        # Anchors are propagated before the components are decomposed
+        self.assertEqual([(a.name, a.x, a.y) for a in glyph.anchors],
+                         [('top', 110, 300)])
+
+    def test_invalid_value(self):
+        with self.assertRaises(ValueError):
+            to_ufos(self.font, flatten_components='some')
+
+
 if __name__ == '__main__':
     unittest.main()
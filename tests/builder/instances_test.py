@@ -19,7 +19,8 @@ from __future__ import (print_function, division, absolute_import,
 import os
 import glyphsLib
 from mutatorMath.ufo.document import DesignSpaceDocumentReader
-from glyphsLib.builder.instances import apply_instance_data
+from glyphsLib.builder.instances import (apply_instance_data,
+                                         select_instances)
 import defcon
 
 import pytest
@@ -67,3 +68,62 @@ def test_apply_instance_data(tmpdir, instance_names):
         assert os.path.isdir(str(tmpdir / filename))
     assert len(ufos) == len(builder.results)
     assert isinstance(ufos[0], defcon.Font)
+
+
+@pytest.mark.parametrize(
+    "patterns, expected",
+    [
+        (["Bold"], ["Bold"]),
+        (["Glyphs Unit Test Sans Light"], ["Light"]),
+        (["*Light"], ["Extra Light", "Light"]),
+        (["GlyphsUnitTestSans-Black"], ["Black"]),
+        (["GlyphsUnitTestSans-Thin.ufo", "Regular"], ["Thin", "Regular"]),
+        (["Regular", "Reg*"], ["Regular"]),
+        (["bold", "Heavy"], []),
+    ],
+)
+def test_select_instances(patterns, expected):
+    font = glyphsLib.GSFont(TESTFILE_PATH)
+    designspace = glyphsLib.to_designspace(font, instance_dir="instances")
+
+    instances = select_instances(designspace, patterns)
+
+    assert [instance.styleName for instance in instances] == expected
+
+
+def test_apply_instance_data_include_instances(tmpdir):
+    font = glyphsLib.GSFont(TESTFILE_PATH)
+    designspace = glyphsLib.to_designspace(font, instance_dir="instances")
+    path = str(tmpdir / (font.familyName + '.designspace'))
+    write_designspace_and_UFOs(designspace, path)
+    builder = DesignSpaceDocumentReader(designspace.path, ufoVersion=3)
+    for name in ("Extra Light", "Light", "Bold"):
+        builder.readInstance(("stylename", name))
+
+    ufos = apply_instance_data(designspace.path,
+                               include_instances=["Bold", "*Light"])
+
+    assert [ufo.info.styleName for ufo in ufos] == [
+        "Extra Light", "Light", "Bold"]
+
+
+def test_apply_instance_data_only_writes_info_and_lib(tmpdir):
+    font = glyphsLib.GSFont(TESTFILE_PATH)
+    designspace = glyphsLib.to_designspace(font, instance_dir="instances")
+    path = str(tmpdir / (font.familyName + '.designspace'))
+    write_designspace_and_UFOs(designspace, path)
+    builder = DesignSpaceDocumentReader(designspace.path, ufoVersion=3)
+    builder.readInstance(("stylename", "Bold"))
+    ufo_path, = builder.results.values()
+    glif_path = os.path.join(ufo_path, 'glyphs', 'A_.glif')
+    contents_path = os.path.join(ufo_path, 'glyphs', 'contents.plist')
+    os.utime(glif_path, (0, 0))
+    os.utime(contents_path, (0, 0))
+
+    ufo, = apply_instance_data(designspace.path, include_instances=["Bold"])
+
+    assert ufo.path == os.path.normpath(ufo_path)
+    assert ufo.info.openTypeOS2WeightClass == 700
+    assert defcon.Font(ufo_path).info.openTypeOS2WeightClass == 700
+    assert os.path.getmtime(glif_path) == 0
+    assert os.path.getmtime(contents_path) == 0
@@ -25,11 +25,14 @@ import unittest
 import xml.etree.ElementTree as etree
 
 import defcon
+import pytest
+from fontTools import designspaceLib
 from fontTools.misc.py23 import open
 from glyphsLib.builder.constants import GLYPHS_PREFIX
 from glyphsLib.builder.instances import set_weight_class, set_width_class
 from glyphsLib.classes import GSFont, GSFontMaster, GSInstance
 from glyphsLib import to_designspace, to_glyphs, build_instances
+from glyphsLib.interpolation import interpolate_designspace
 from glyphsLib.builder.constants import UFO2FT_USE_PROD_NAMES_KEY
 
 
@@ -531,5 +534,181 @@ def test_apply_instance_data(tmpdir):
     assert ufos[1].lib[UFO2FT_USE_PROD_NAMES_KEY] == False
 
 
+def test_build_instances_in_memory(tmpdir):
+    masters, instances = makeFamily()
+    instances[0].customParameters['GASP Table'] = {'65535': '15'}
+    font = makeFont(masters, instances, 'Exemplary Sans')
+    filename = os.path.join(str(tmpdir), 'font.glyphs')
+    font.save(filename)
+
+    ufos = build_instances(filename, None, None)
+
+    assert os.listdir(str(tmpdir)) == ['font.glyphs']
+    assert [ufo.info.styleName for ufo in ufos] == [
+        'Regular', 'Semibold', 'Bold', 'Black']
+    assert all(ufo.path is None for ufo in ufos)
+    assert ufos[0].info.openTypeGaspRangeRecords is not None
+    assert ufos[2].info.openTypeOS2WeightClass == 700
+
+
+def test_build_instances_in_workers(tmpdir, monkeypatch):
+    # Use the workers even on a single processor
+    monkeypatch.setattr('multiprocessing.cpu_count', lambda: 4)
+    masters, instances = makeFamily()
+    font = makeFont(masters, instances, 'Exemplary Sans')
+    filename = os.path.join(str(tmpdir), 'font.glyphs')
+    font.save(filename)
+    serial_dir = os.path.join(str(tmpdir), 'serial')
+    workers_dir = os.path.join(str(tmpdir), 'workers')
+
+    expected = build_instances(filename, None, serial_dir)
+    ufos = build_instances(filename, None, workers_dir, workers=3)
+
+    assert [ufo.info.styleName for ufo in ufos] == [
+        'Regular', 'Semibold', 'Bold', 'Black']
+    assert sorted(os.listdir(workers_dir)) == sorted(os.listdir(serial_dir))
+    for expected_ufo, ufo in zip(expected, ufos):
+        assert os.path.dirname(ufo.path) == workers_dir
+        assert ufo.info.openTypeOS2WeightClass == (
+            expected_ufo.info.openTypeOS2WeightClass)
+        assert ufo.info.styleName == expected_ufo.info.styleName
+
+
+def test_build_instances_selected(tmpdir):
+    masters, instances = makeFamily()
+    instances[3].customParameters['fileName'] = 'ExemplarySans-Heavy'
+    font = makeFont(masters, instances, 'Exemplary Sans')
+    filename = os.path.join(str(tmpdir), 'font.glyphs')
+    font.save(filename)
+    master_dir = os.path.join(str(tmpdir), 'masters')
+    instance_dir = os.path.join(str(tmpdir), 'instances')
+
+    ufos = build_instances(filename, master_dir, instance_dir,
+                           instances=['Semi*', 'ExemplarySans-Heavy'])
+
+    assert [ufo.info.styleName for ufo in ufos] == ['Semibold', 'Black']
+    assert sorted(os.listdir(instance_dir)) == [
+        'ExemplarySans-Heavy.ufo', 'ExemplarySans-Semibold.ufo']
+    designspace = designspaceLib.DesignSpaceDocument()
+    designspace.read(os.path.join(master_dir, 'ExemplarySans.designspace'))
+    assert len(designspace.instances) == 4
+
+
+def test_interpolate_designspace():
+    path = os.path.join(os.path.dirname(__file__), '..', 'data',
+                        'GlyphsUnitTestSans.glyphs')
+    designspace = to_designspace(GSFont(path))
+    light, regular, bold = [source.font for source in designspace.sources]
+
+    ufos = interpolate_designspace(designspace)
+
+    assert len(ufos) == len(designspace.instances)
+    by_style = {ufo.info.styleName: ufo for ufo in ufos}
+    assert by_style['Regular']['A'].width == regular['A'].width
+    assert (regular['A'].width < by_style['Medium']['A'].width
+            < bold['A'].width)
+    assert by_style['Regular']['A'].unicodes == regular['A'].unicodes
+    assert (by_style['Regular'].features.text == regular.features.text)
+
+
+def _glyph_geometry(glyph):
+    return ([[(point.x, point.y, point.segmentType) for point in contour]
+             for contour in glyph],
+            [(component.baseGlyph, component.transformation)
+             for component in glyph.components],
+            [(anchor.name, anchor.x, anchor.y) for anchor in glyph.anchors],
+            glyph.width)
+
+
+def _interpolate_with_both_engines(designspace):
+    pytest.importorskip('numpy')
+    expected = interpolate_designspace(designspace)
+    actual = interpolate_designspace(designspace, engine='numpy')
+    assert len(actual) == len(expected) == len(designspace.instances)
+    return expected, actual
+
+
+def _assert_same_geometry(glyph, expected_glyph, tolerance=1):
+    contours, components, anchors, width = _glyph_geometry(glyph)
+    (expected_contours, expected_components, expected_anchors,
+     expected_width) = _glyph_geometry(expected_glyph)
+    assert abs(width - expected_width) <= tolerance
+    assert len(contours) == len(expected_contours)
+    for contour, expected_contour in zip(contours, expected_contours):
+        assert len(contour) == len(expected_contour)
+        for (x, y, segment_type), (expected_x, expected_y,
+                                   expected_segment_type) in zip(
+                                       contour, expected_contour):
+            assert abs(x - expected_x) <= tolerance
+            assert abs(y - expected_y) <= tolerance
+            assert segment_type == expected_segment_type
+    assert [name for name, _ in components] == [
+        name for name, _ in expected_components]
+    for (_, transformation), (_, expected_transformation) in zip(
+            components, expected_components):
+        for value, expected_value in zip(transformation,
+                                         expected_transformation):
+            assert abs(value - expected_value) <= tolerance
+    assert [name for name, _, _ in anchors] == [
+        name for name, _, _ in expected_anchors]
+    for (_, x, y), (_, expected_x, expected_y) in zip(anchors,
+                                                     expected_anchors):
+        assert abs(x - expected_x) <= tolerance
+        assert abs(y - expected_y) <= tolerance
+
+
+def test_interpolate_designspace_numpy():
+    path = os.path.join(os.path.dirname(__file__), '..', 'data',
+                        'GlyphsUnitTestSans.glyphs')
+    designspace = to_designspace(GSFont(path))
+
+    expected, actual = _interpolate_with_both_engines(designspace)
+
+    for expected_ufo, ufo in zip(expected, actual):
+        assert ufo.info.styleName == expected_ufo.info.styleName
+        assert ufo.info.ascender == expected_ufo.info.ascender
+        assert ufo.info.xHeight == expected_ufo.info.xHeight
+        assert dict(ufo.kerning) == dict(expected_ufo.kerning)
+        assert ufo.keys() == expected_ufo.keys()
+        for glyph in expected_ufo:
+            # Medium and Bold are on a non-linear part of the axis map
+            _assert_same_geometry(ufo[glyph.name], glyph)
+            assert ufo[glyph.name].unicodes == glyph.unicodes
+            assert dict(ufo[glyph.name].lib) == dict(glyph.lib)
+            assert ufo[glyph.name].note == glyph.note
+
+
+def test_interpolate_designspace_numpy_fallback():
+    path = os.path.join(os.path.dirname(__file__), '..', 'data',
+                        'GlyphsUnitTestSans.glyphs')
+    designspace = to_designspace(GSFont(path))
+    # Guidelines are not packed into arrays
+    designspace.sources[0].font['A'].appendGuideline(
+        dict(x=10, y=20, angle=0))
+    # Neither are glyphs that have different anchors in different masters
+    designspace.sources[2].font['a'].appendAnchor(dict(name='extra', x=1, y=2))
+    # The lib and note do not come from the default master
+    for source in designspace.sources:
+        for name in ('A', 'a', 'n'):
+            source.font[name].lib['test.master'] = source.name
+            source.font[name].note = source.name
+
+    expected, actual = _interpolate_with_both_engines(designspace)
+
+    for expected_ufo, ufo in zip(expected, actual):
+        for name in ('A', 'a', 'n'):
+            _assert_same_geometry(ufo[name], expected_ufo[name])
+            assert dict(ufo[name].lib) == dict(expected_ufo[name].lib)
+            assert ufo[name].note == expected_ufo[name].note
+
+
+def test_interpolate_designspace_unknown_engine():
+    path = os.path.join(os.path.dirname(__file__), '..', 'data',
+                        'GlyphsUnitTestSans.glyphs')
+    designspace = to_designspace(GSFont(path))
+    with pytest.raises(ValueError):
+        interpolate_designspace(designspace, engine='fast')
+
+
 if __name__ == "__main__":
     sys.exit(unittest.main())
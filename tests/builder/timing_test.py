@@ -0,0 +1,107 @@
+# coding=UTF-8
+#
+# Copyright 2018 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import (print_function, division, absolute_import,
+                        unicode_literals)
+
+import os
+import unittest
+
+from glyphsLib import to_designspace, to_glyphs
+from glyphsLib.builder import BuilderStats
+from glyphsLib.builder.builders import UFOBuilder
+from glyphsLib.classes import GSFont
+
+TESTFILE_PATH = os.path.join(
+    os.path.dirname(__file__), '..', 'data', 'GlyphsUnitTestSans.glyphs')
+
+
+class BuilderStatsTest(unittest.TestCase):
+    def test_ufo_builder(self):
+        font = GSFont(TESTFILE_PATH)
+        stats = BuilderStats()
+        designspace = to_designspace(font, stats=stats)
+
+        # One call per glyph of each layer, except for the backgrounds
+        glyph_count = sum(len(layer) for source in designspace.sources
+                          for layer in source.font.layers
+                          if not layer.name.endswith('background'))
+        self.assertEqual(stats.methods['to_ufo_glyph'].calls, glyph_count)
+        self.assertEqual(stats.methods['to_ufo_features'].calls, 1)
+        self.assertEqual(stats.methods['to_designspace_axes'].calls, 1)
+        self.assertEqual(stats.methods['to_ufo_decompose_components'].calls, 0)
+        self.assertEqual(list(stats.phases), [
+            'font attributes', 'create glyphs', 'draw glyphs',
+            'propagate anchors', 'features', 'GDEF', 'groups', 'kerning',
+            'designspace'])
+        self.assertEqual(stats.phases['propagate anchors'].calls,
+                         len(font.masters))
+        self.assertGreater(stats.phases['draw glyphs'].seconds, 0)
+        # to_ufo_glyph calls to_ufo_paths, so its time includes theirs
+        self.assertGreaterEqual(stats.methods['to_ufo_glyph'].seconds,
+                                stats.methods['to_ufo_paths'].seconds)
+
+    def test_glyphs_builder(self):
+        stats = BuilderStats()
+        to_glyphs(to_designspace(GSFont(TESTFILE_PATH)), stats=stats)
+        self.assertGreater(stats.methods['to_glyphs_glyph'].calls, 0)
+        self.assertEqual(list(stats.phases), [
+            'glyphs', 'features', 'groups', 'kerning', 'designspace'])
+
+    def test_stats_are_cumulative(self):
+        stats = BuilderStats()
+        to_designspace(GSFont(TESTFILE_PATH), stats=stats)
+        to_designspace(GSFont(TESTFILE_PATH), stats=stats)
+        self.assertEqual(stats.methods['to_ufo_features'].calls, 2)
+        self.assertEqual(stats.phases['designspace'].calls, 2)
+
+    def test_disabled(self):
+        builder = UFOBuilder(GSFont(TESTFILE_PATH))
+        self.assertIsNone(builder.stats)
+        # The methods are not wrapped
+        self.assertNotIn('to_ufo_glyph', vars(builder))
+        list(builder.masters)
+
+    def test_recursive_calls_are_timed_once(self):
+        class Builder(object):
+            def to_ufo_countdown(self, n):
+                if n:
+                    self.to_ufo_countdown(n - 1)
+
+        stats = BuilderStats()
+        builder = Builder()
+        stats.instrument(builder)
+        builder.to_ufo_countdown(3)
+        timing = stats.methods['to_ufo_countdown']
+        self.assertEqual(timing.calls, 4)
+        self.assertEqual(timing._depth, 0)
+
+    def test_format_table(self):
+        stats = BuilderStats()
+        to_designspace(GSFont(TESTFILE_PATH), stats=stats)
+        lines = stats.format_table().splitlines()
+        self.assertEqual(lines[0].split(),
+                         ['Phase', 'calls', 'seconds', 'ms', 'per', 'call'])
+        self.assertTrue(lines[1].startswith('font attributes '))
+        methods = lines[lines.index('') + 2:]
+        seconds = [float(line.split()[2]) for line in methods]
+        self.assertEqual(seconds, sorted(seconds, reverse=True))
+        # Only the methods that were called
+        self.assertNotIn('to_ufo_decompose_components', stats.format_table())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -22,6 +22,7 @@ import os
 import sys
 import datetime
 import copy
+import pickle
 import unittest
 import pytest
 from fontTools.misc.py23 import unicode
@@ -122,6 +123,72 @@ class GlyphLayersTest(unittest.TestCase):
         self.assertIsNone(layer)
 
 
+class GlyphLayersOrderTest(unittest.TestCase):
+    def setUp(self):
+        self.font = GSFont(TESTFILE_PATH)
+        self.glyph = self.font.glyphs['A']
+        self.master_ids = [master.id for master in self.font.masters]
+
+    def layer_ids(self):
+        return [layer.layerId for layer in self.glyph.layers]
+
+    def test_master_layers_first(self):
+        layer_ids = self.layer_ids()
+        self.assertEqual(layer_ids[:3], self.master_ids)
+        self.assertEqual(len(layer_ids), len(self.glyph.layers))
+
+    def test_order_is_cached(self):
+        self.assertIs(iter(self.glyph.layers).orderedLayers,
+                      iter(self.glyph.layers).orderedLayers)
+
+    def test_layers_change(self):
+        layer = GSLayer()
+        layer.name = 'New'
+        self.glyph.layers.append(layer)
+        self.assertEqual(self.layer_ids()[-1], layer.layerId)
+        del self.glyph.layers[layer.layerId]
+        self.assertNotIn(layer.layerId, self.layer_ids())
+
+    def test_associated_master_change(self):
+        # A layer becomes the master layer of a new master
+        master = GSFontMaster()
+        master.id = 'NEW-MASTER'
+        self.font.masters.insert(0, master)
+        layer = self.glyph.layers[-1]
+        layer.layerId = master.id
+        layer.associatedMasterId = master.id
+        self.assertEqual(self.layer_ids()[0], layer.layerId)
+        layer.associatedMasterId = self.master_ids[0]
+        self.assertNotEqual(self.layer_ids()[0], layer.layerId)
+
+    def test_masters_change(self):
+        self.font.masters = list(reversed(self.font.masters))
+        self.assertEqual(self.layer_ids()[:3], self.master_ids[::-1])
+
+    def test_master_id_change(self):
+        master_layer = self.glyph.layers[self.master_ids[0]]
+        self.assertIs(next(iter(self.glyph.layers)), master_layer)
+        self.font.masters[0].id = 'NEW'
+        self.assertIsNot(next(iter(self.glyph.layers)), master_layer)
+
+    def test_iteration_is_a_snapshot(self):
+        layers = []
+        for layer in self.glyph.layers:
+            layers.append(layer)
+            if len(layers) == 1:
+                self.glyph.layers.append(GSLayer())
+        self.assertEqual(len(layers), len(self.glyph.layers) - 1)
+
+    def test_glyph_without_font(self):
+        glyph = GSGlyph()
+        for layer_id in ('b', 'a'):
+            layer = GSLayer()
+            layer.layerId = layer_id
+            glyph.layers.append(layer)
+        self.assertEqual([layer.layerId for layer in glyph.layers],
+                         ['b', 'a'])
+
+
 class GSFontTest(unittest.TestCase):
     def test_init(self):
         font = GSFont()
@@ -1634,5 +1701,49 @@ class GSBackgroundLayerTest(unittest.TestCase):
             self.bg.foreground = GSLayer()
 
 
+
+class ProxyCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.font = GSFont(TESTFILE_PATH)
+        self.path = self.font.glyphs['A'].layers[0].paths[0]
+
+    def test_same_proxy(self):
+        font = self.font
+        self.assertIs(font.glyphs, font.glyphs)
+        self.assertIs(font.masters, font.masters)
+        self.assertIs(font.userData, font.userData)
+        layer = font.glyphs['A'].layers[0]
+        self.assertIs(layer.parent.layers, layer.parent.layers)
+        self.assertIs(layer.paths, layer.paths)
+        self.assertIs(layer.components, layer.components)
+        self.assertIs(layer.anchors, layer.anchors)
+        self.assertIs(self.path.nodes, self.path.nodes)
+        self.assertIs(self.path.nodes[0].userData,
+                      self.path.nodes[0].userData)
+
+    def test_setter(self):
+        nodes = self.path.nodes
+        self.path.nodes = [GSNode((1, 2)), GSNode((3, 4))]
+        self.assertIs(self.path.nodes, nodes)
+        self.assertEqual(len(nodes), 2)
+        self.assertIs(nodes[0].parent, self.path)
+
+    def test_copies_have_their_own_proxies(self):
+        node_count = len(self.path.nodes)
+        for path in (copy.copy(self.path), copy.deepcopy(self.path)):
+            self.assertIs(path.nodes._owner, path)
+            self.assertEqual(len(path.nodes), node_count)
+        path = pickle.loads(pickle.dumps(self.path, 2))
+        self.assertIs(path.nodes._owner, path)
+
+    def test_node_name_does_not_cache_user_data(self):
+        node = GSNode((0, 0), name='a')
+        self.assertEqual(node.name, 'a')
+        self.assertNotIn('_UserDataProxy', vars(node))
+        node.name = None
+        self.assertIsNone(node.name)
+        self.assertEqual(dict(node.userData), {})
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,109 @@
+# coding=UTF-8
+#
+# Copyright 2018 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import (print_function, division, absolute_import,
+                        unicode_literals)
+
+import unittest
+
+from glyphsLib.classes import GSComponent, GSFontMaster, GSLayer
+
+from classes_test import generate_minimal_font, add_glyph, add_component
+
+IDENTITY = (1, 0, 0, 1, 0, 0)
+
+
+class ComponentGraphTest(unittest.TestCase):
+    def setUp(self):
+        self.font = generate_minimal_font()
+        for name in ('Aacute.ss01', 'Aacute', 'A', 'acutecomb', 'B'):
+            add_glyph(self.font, name)
+        add_component(self.font, 'Aacute', 'A', IDENTITY)
+        add_component(self.font, 'Aacute', 'acutecomb', IDENTITY)
+        add_component(self.font, 'Aacute.ss01', 'Aacute', IDENTITY)
+
+    def test_edges(self):
+        graph = self.font.componentGraph
+        self.assertEqual(graph.components('Aacute'), ['A', 'acutecomb'])
+        self.assertEqual(graph.components('Aacute', 'id'), ['A', 'acutecomb'])
+        self.assertEqual(graph.components('Aacute', 'other'), [])
+        self.assertEqual(graph.users('A'), {'Aacute'})
+        self.assertEqual(graph.users('A', recursive=True),
+                         {'Aacute', 'Aacute.ss01'})
+        self.assertEqual(graph.users('B'), set())
+        self.assertEqual(graph.closure(['Aacute.ss01']),
+                         {'Aacute.ss01', 'Aacute', 'A', 'acutecomb'})
+
+    def test_edges_per_layer(self):
+        master = GSFontMaster()
+        master.id = 'bold'
+        self.font.masters.append(master)
+        layer = GSLayer()
+        layer.layerId = layer.associatedMasterId = 'bold'
+        self.font.glyphs['B'].layers.append(layer)
+        layer.components.append(GSComponent('A'))
+        graph = self.font.componentGraph
+        self.assertEqual(graph.users('A', 'bold'), {'B'})
+        self.assertEqual(graph.users('A', 'id'), {'Aacute'})
+        self.assertEqual(graph.users('A'), {'Aacute', 'B'})
+
+    def test_topological_order(self):
+        self.assertEqual(self.font.componentGraph.topological_order(),
+                         ['A', 'acutecomb', 'B', 'Aacute', 'Aacute.ss01'])
+        self.assertEqual(self.font.componentGraph.cycles(), [])
+
+    def test_cycles(self):
+        add_component(self.font, 'A', 'Aacute.ss01', IDENTITY)
+        graph = self.font.componentGraph
+        self.assertEqual(graph.cycles(), [['Aacute.ss01', 'Aacute', 'A']])
+        self.assertEqual(graph.topological_order(),
+                         ['acutecomb', 'B', 'Aacute.ss01', 'Aacute', 'A'])
+
+    def test_cached(self):
+        self.assertIs(self.font.componentGraph, self.font.componentGraph)
+        self.font.glyphs['B'].layers[0].width = 10
+        self.assertIs(self.font.componentGraph, self.font.componentGraph)
+
+    def test_invalidated_by_new_component(self):
+        graph = self.font.componentGraph
+        self.font.glyphs['B'].layers[0].components.append(GSComponent('A'))
+        self.assertIsNot(self.font.componentGraph, graph)
+        self.assertEqual(self.font.componentGraph.users('A'), {'Aacute', 'B'})
+
+    def test_invalidated_by_removed_component(self):
+        self.font.componentGraph
+        del self.font.glyphs['Aacute'].layers[0].components[0]
+        self.assertEqual(self.font.componentGraph.users('A'), set())
+
+    def test_invalidated_by_renamed_component(self):
+        self.font.componentGraph
+        self.font.glyphs['Aacute'].layers[0].components[0].name = 'B'
+        self.assertEqual(self.font.componentGraph.users('A'), set())
+        self.assertEqual(self.font.componentGraph.users('B'), {'Aacute'})
+
+    def test_invalidated_by_glyphs(self):
+        self.font.componentGraph
+        add_glyph(self.font, 'C')
+        self.assertIn('C', self.font.componentGraph)
+        self.font.glyphs['C'].name = 'D'
+        self.assertNotIn('C', self.font.componentGraph)
+        self.assertIn('D', self.font.componentGraph)
+        del self.font.glyphs[-1]
+        self.assertNotIn('D', self.font.componentGraph)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+# coding=UTF-8
+#
+# Copyright 2018 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import (print_function, division, absolute_import,
+                        unicode_literals)
+
+import copy
+import datetime
+import os
+import pickle
+import unittest
+
+from glyphsLib.classes import (
+    GSFont, GSAnchor, GSComponent, GSGlyph, GSHint, GSNode, GSPath)
+from glyphsLib import fingerprint
+
+TESTFILE_PATH = os.path.join(
+    os.path.dirname(__file__), 'data', 'GlyphsUnitTestSans.glyphs')
+
+
+class FingerprintTest(unittest.TestCase):
+    def setUp(self):
+        self.font = GSFont(TESTFILE_PATH)
+        self.glyph = self.font.glyphs['A']
+        self.layer = self.glyph.layers[0]
+        self.original = self.glyph.fingerprint()
+
+    def assertChanged(self):
+        self.assertNotEqual(self.glyph.fingerprint(), self.original)
+
+    def assertUnchanged(self):
+        self.assertEqual(self.glyph.fingerprint(), self.original)
+
+    def test_stable_across_loads(self):
+        other = GSFont(TESTFILE_PATH)
+        self.assertEqual(other.fingerprints(), self.font.fingerprints())
+        self.assertEqual(len(set(self.font.fingerprints().values())),
+                         len(self.font.glyphs))
+
+    def test_ignores_ordering_and_noise(self):
+        layers = list(self.glyph.layers)
+        self.glyph.layers = list(reversed(layers))
+        self.layer.anchors = list(reversed(list(self.layer.anchors)))
+        self.layer.width += 1e-9
+        self.glyph.lastChange = datetime.datetime(2000, 1, 1)
+        self.assertUnchanged()
+
+    def test_cached(self):
+        self.assertEqual(self.glyph._fingerprint, self.original)
+
+    def test_glyph_attribute(self):
+        self.glyph.leftKerningGroup = 'foo'
+        self.assertChanged()
+        self.glyph.leftKerningGroup = 'A'
+        self.assertUnchanged()
+
+    def test_layer_attribute(self):
+        self.layer.width += 10
+        self.assertChanged()
+
+    def test_node(self):
+        node = self.layer.paths[0].nodes[0]
+        node.position = (node.position.x + 1, node.position.y)
+        self.assertChanged()
+
+    def test_paths(self):
+        path = GSPath()
+        path.nodes.append(GSNode((0, 0)))
+        self.layer.paths.append(path)
+        self.assertChanged()
+        self.layer.paths.remove(path)
+        self.assertUnchanged()
+
+    def test_components(self):
+        component = GSComponent('B', offset=(10, 0))
+        self.layer.components.append(component)
+        self.assertChanged()
+        changed = self.glyph.fingerprint()
+        component.position = (20, 0)
+        self.assertNotEqual(self.glyph.fingerprint(), changed)
+        del self.layer.components[-1]
+        self.assertUnchanged()
+
+    def test_anchors(self):
+        self.layer.anchors.append(GSAnchor('foo', (1, 2)))
+        self.assertChanged()
+        del self.layer.anchors['foo']
+        self.assertUnchanged()
+
+    def test_user_data(self):
+        self.layer.userData['foo'] = 'bar'
+        self.assertChanged()
+        del self.layer.userData['foo']
+        self.assertUnchanged()
+
+    def test_background(self):
+        self.layer.background.width
+        self.assertUnchanged()
+        self.layer.background.paths.append(GSPath())
+        self.assertChanged()
+
+    def test_added_objects(self):
+        path = GSPath()
+        self.layer.paths.append(path)
+        node = GSNode((0, 0))
+        path.nodes.append(node)
+        changed = self.glyph.fingerprint()
+        self.assertNotEqual(changed, self.original)
+        node.position = (1, 0)
+        self.assertNotEqual(self.glyph.fingerprint(), changed)
+
+    def test_classes_are_unchanged(self):
+        node = self.layer.paths[0].nodes[0]
+        self.assertIs(type(node), GSNode)
+        self.assertIs(type(self.glyph), GSGlyph)
+
+    def test_copies(self):
+        for other in (copy.deepcopy(self.glyph),
+                      pickle.loads(pickle.dumps(self.glyph))):
+            self.assertEqual(other.fingerprint(), self.original)
+            node = other.layers[0].paths[0].nodes[0]
+            node.position = (node.position.x + 1, node.position.y)
+            self.assertNotEqual(other.fingerprint(), self.original)
+        self.assertUnchanged()
+
+    def test_hint(self):
+        hint = GSHint()
+        self.layer.hints.append(hint)
+        changed = self.glyph.fingerprint()
+        self.assertNotEqual(changed, self.original)
+        hint.origin = (0, 1)
+        self.assertNotEqual(self.glyph.fingerprint(), changed)
+
+    def test_unicodes(self):
+        self.glyph.unicodes = ['0042']
+        self.assertChanged()
+
+    def test_font_fingerprints(self):
+        fingerprints = self.font.fingerprints()
+        self.assertEqual(list(fingerprints.keys()),
+                         [glyph.name for glyph in self.font.glyphs])
+        self.assertEqual(fingerprints['A'], self.original)
+
+    def test_font_fingerprints_in_parallel(self):
+        expected = GSFont(TESTFILE_PATH).fingerprints()
+        min_glyphs = fingerprint.MIN_GLYPHS_FOR_WORKERS
+        fingerprint.MIN_GLYPHS_FOR_WORKERS = 1
+        try:
+            font = GSFont(TESTFILE_PATH)
+            self.assertEqual(font.fingerprints(workers=2), expected)
+        finally:
+            fingerprint.MIN_GLYPHS_FOR_WORKERS = min_glyphs
+
+
+if __name__ == '__main__':
+    unittest.main()
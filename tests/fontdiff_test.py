@@ -0,0 +1,125 @@
+# coding=UTF-8
+#
+# Copyright 2018 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import (print_function, division, absolute_import,
+                        unicode_literals)
+
+import os
+import unittest
+
+import glyphsLib
+from glyphsLib.classes import GSFont, GSAnchor, GSGlyph
+from glyphsLib.fontdiff import Change, ADDED, REMOVED, MODIFIED
+
+TESTFILE_PATH = os.path.join(
+    os.path.dirname(__file__), 'data', 'GlyphsUnitTestSans.glyphs')
+
+
+class DiffTest(unittest.TestCase):
+    def setUp(self):
+        self.old = GSFont(TESTFILE_PATH)
+        self.new = GSFont(TESTFILE_PATH)
+        self.master_id = self.new.masters[0].id
+
+    def changes(self):
+        return [(change.kind, change.path)
+                for change in glyphsLib.diff(self.old, self.new)]
+
+    def test_identical(self):
+        self.assertEqual(glyphsLib.diff(self.old, self.new), [])
+
+    def test_skips_glyphs_with_same_fingerprint(self):
+        self.new.glyphs['A'].layers[0]._paths = []
+        self.new.glyphs['A']._fingerprint = self.old.glyphs['A'].fingerprint()
+        self.assertEqual(self.changes(), [])
+
+    def test_glyphs_added_and_removed(self):
+        del self.new.glyphs[1]
+        self.new.glyphs.append(GSGlyph('new'))
+        self.assertEqual(self.changes(), [
+            (REMOVED, ('glyphs', 'Adieresis')),
+            (ADDED, ('glyphs', 'new')),
+        ])
+
+    def test_glyph_content(self):
+        glyph = self.new.glyphs['A']
+        layer = glyph.layers[self.master_id]
+        glyph.leftKerningGroup = 'B'
+        layer.width = 700
+        node = layer.paths[0].nodes[1]
+        node.position = (5, 5)
+        layer.anchors.append(GSAnchor('x', (1, 1)))
+        layer_path = ('glyphs', 'A', 'layers', self.master_id)
+        self.assertEqual(self.changes(), [
+            (MODIFIED, ('glyphs', 'A', 'leftKerningGroup')),
+            (MODIFIED, layer_path + ('width',)),
+            (MODIFIED, layer_path + ('paths', 0, 'nodes', 1)),
+            (ADDED, layer_path + ('anchors', 'x')),
+        ])
+
+        changes = glyphsLib.diff(self.old, self.new)
+        self.assertEqual((changes[1].old, changes[1].new), (593, 700))
+        self.assertIs(changes[2].new, node)
+
+    def test_renamed_user_data_key(self):
+        glyph = self.new.glyphs['A']
+        glyph.userData['old'] = 1
+        self.old.glyphs['A'].userData['old'] = 1
+        self.assertEqual(self.changes(), [])
+
+        del glyph.userData['old']
+        glyph.userData['new'] = 1
+        self.assertEqual(self.changes(), [
+            (MODIFIED, ('glyphs', 'A', 'userData')),
+        ])
+
+    def test_removed_node(self):
+        del self.new.glyphs['A'].layers[self.master_id].paths[0].nodes[-1]
+        layer_path = ('glyphs', 'A', 'layers', self.master_id)
+        self.assertEqual(self.changes(), [
+            (REMOVED, layer_path + ('paths', 0, 'nodes', 7)),
+        ])
+
+    def test_font_level(self):
+        self.new.familyName = 'Other'
+        self.new.masters[0].xHeight = 1
+        self.new.instances[0].name = 'Other'
+        self.new.features[0].code = 'sub a by b;'
+        kerning = self.new.kerning[self.master_id]
+        kerning['@MMK_L_A']['@MMK_R_J'] += 5
+        kerning['@MMK_L_A']['X'] = 10
+        del kerning['@MMK_L_A']['@MMK_R_Y']
+        self.assertEqual(self.changes(), [
+            (MODIFIED, ('familyName',)),
+            (MODIFIED, ('masters', self.master_id, 'xHeight')),
+            (REMOVED, ('instances', 'Thin')),
+            (ADDED, ('instances', 'Other')),
+            (MODIFIED, ('features', 'aalt', 'code')),
+            (MODIFIED, ('kerning', self.master_id, '@MMK_L_A', '@MMK_R_J')),
+            (REMOVED, ('kerning', self.master_id, '@MMK_L_A', '@MMK_R_Y')),
+            (ADDED, ('kerning', self.master_id, '@MMK_L_A', 'X')),
+        ])
+
+    def test_str(self):
+        self.assertEqual(
+            str(Change(MODIFIED, ('glyphs', 'A', 'width'), 600, 700.5)),
+            '~ glyphs/A/width: 600 -> 700.5')
+        self.assertEqual(str(Change(ADDED, ('glyphs', 'A'), None, 'A')),
+                         '+ glyphs/A')
+
+
+if __name__ == '__main__':
+    unittest.main()
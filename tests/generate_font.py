@@ -0,0 +1,313 @@
+# Copyright 2018 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Generate large synthetic fonts to test how glyphsLib scales.
+
+The fonts are built with the glyphsLib.classes API from a FontSpec and a
+seed, so the same spec and seed always give the same font:
+
+- interpolation-compatible masters on a weight x width grid;
+- base glyphs with curved and straight closed paths and anchors;
+- composite glyphs whose components form trees of the given depth;
+- kerning groups, and the same kerning pairs in each master between
+  groups and glyphs;
+- userData on the glyphs, layers and a share of the nodes.
+
+The defaults are the size of a big CJK or multi-script family, which takes
+a lot of memory. To write a font:
+
+    python tests/generate_font.py Large.glyphs --glyphs 5000 --masters 4
+"""
+
+from __future__ import (print_function, division, absolute_import,
+                        unicode_literals)
+
+import argparse
+from collections import namedtuple
+import datetime
+from io import open
+import random
+import sys
+
+import glyphsLib
+from glyphsLib.classes import (GSFont, GSFontMaster, GSGlyph, GSLayer,
+                               GSPath, GSNode, GSComponent, GSAnchor,
+                               GSInstance)
+from glyphsLib.types import Point, Transform
+
+FontSpec = namedtuple('FontSpec', [
+    'glyphs', 'masters', 'composite_ratio', 'component_depth',
+    'paths_per_glyph', 'nodes_per_path', 'kerning_pairs', 'kerning_groups',
+    'node_user_data_ratio', 'instances'])
+FontSpec.__new__.__defaults__ = (
+    50000,  # glyphs
+    20,  # masters
+    0.5,  # composite_ratio
+    6,  # component_depth
+    2,  # paths_per_glyph
+    16,  # nodes_per_path
+    200000,  # kerning_pairs
+    1000,  # kerning_groups
+    0.25,  # node_user_data_ratio
+    0,  # instances
+)
+FontSpec.__doc__ = """The dimensions of a generated font.
+
+glyphs -- the number of glyphs.
+masters -- the number of masters.
+composite_ratio -- the share of the glyphs that are made of components.
+component_depth -- the maximum depth of the component trees: the
+    components of a composite of depth n use glyphs of depth n - 1 and
+    less, the base glyphs have depth 0. The depth is at most the number
+    of composites.
+paths_per_glyph, nodes_per_path -- the outlines of the base glyphs.
+kerning_pairs -- the number of kerning pairs in all the masters together.
+    Each master has the same pairs, with different values.
+kerning_groups -- the number of left and of right kerning groups.
+node_user_data_ratio -- the share of the nodes that have userData.
+instances -- the number of instances, spread over the weight axis.
+"""
+
+WEIGHT_CLASSES = ['Thin', 'ExtraLight', 'Light', 'Regular', 'Medium',
+                  'SemiBold', 'Bold', 'ExtraBold', 'Black']
+
+# The first glyphs get code points in the Private Use Area.
+FIRST_CODE_POINT = 0xE000
+LAST_CODE_POINT = 0xF8FF
+
+
+def generate_font(spec=FontSpec(), seed=0):
+    """Return a GSFont with the dimensions of the FontSpec."""
+    return _FontGenerator(spec, random.Random(seed)).font()
+
+
+def write_font(font, path):
+    """Write a GSFont to a .glyphs file."""
+    with open(path, 'w', encoding='utf-8') as fp:
+        glyphsLib.dump(font, fp)
+
+
+class _FontGenerator(object):
+    def __init__(self, spec, rng):
+        self.spec = spec
+        self.rng = rng
+
+    def font(self):
+        spec = self.spec
+        font = GSFont()
+        font.appVersion = '1133'
+        font.date = datetime.datetime(2018, 1, 1)
+        font.familyName = 'Synthetic'
+        font.upm = 1000
+        font.versionMajor = 1
+        font.versionMinor = 0
+        self.masters = [self.master(index) for index in range(spec.masters)]
+        for master in self.masters:
+            font.masters.append(master)
+
+        # Composites need their components to exist, so the glyphs are made
+        # in the order of their depths, then shuffled.
+        depths = self.glyph_depths()
+        names_by_depth = [[] for _ in range(spec.component_depth + 1)]
+        glyphs = []
+        for index, depth in enumerate(depths):
+            glyph = self.glyph(index, depth, names_by_depth)
+            names_by_depth[depth].append(glyph.name)
+            glyphs.append(glyph)
+        self.rng.shuffle(glyphs)
+        for index, glyph in enumerate(glyphs):
+            if FIRST_CODE_POINT + index <= LAST_CODE_POINT:
+                glyph.unicode = '%04X' % (FIRST_CODE_POINT + index)
+            font.glyphs.append(glyph)
+
+        self.add_kerning(font, [glyph.name for glyph in glyphs])
+        for index in range(spec.instances):
+            font.instances.append(self.instance(index))
+        return font
+
+    def master(self, index):
+        # A grid of 5 weights times as many widths as needed
+        master = GSFontMaster()
+        master.id = 'master-%02d' % index
+        master.customName = 'M%02d' % index
+        master.weightValue = 100.0 + 100 * (index % 5)
+        master.widthValue = 100.0 + 25 * (index // 5)
+        master.ascender = 800
+        master.capHeight = 700
+        master.xHeight = 500
+        master.descender = -200
+        return master
+
+    def instance(self, index):
+        position = index / max(1, self.spec.instances - 1)
+        instance = GSInstance()
+        instance.name = 'Instance %d' % index
+        instance.weightValue = 100.0 + 400.0 * position
+        instance.widthValue = 100.0
+        instance.weight = WEIGHT_CLASSES[
+            int(round(position * (len(WEIGHT_CLASSES) - 1)))]
+        return instance
+
+    def glyph_depths(self):
+        spec = self.spec
+        composites = int(spec.glyphs * spec.composite_ratio)
+        if spec.component_depth < 1:
+            composites = 0
+        bases = spec.glyphs - composites
+        depths = [0] * bases
+        # Spread the composites evenly over the depths. Each depth needs a
+        # composite, so there are no more depths than composites.
+        max_depth = min(spec.component_depth, composites)
+        for index in range(composites):
+            depths.append(1 + index * max_depth // composites)
+        return depths
+
+    def glyph(self, index, depth, names_by_depth):
+        spec = self.spec
+        rng = self.rng
+        glyph = GSGlyph()
+        glyph.name = 'glyph%05d' % index
+        glyph.userData['generator'] = {'index': index, 'depth': depth}
+
+        if depth == 0:
+            outline = self.outline()
+            components = []
+        else:
+            outline = []
+            # One component of the previous depth, so that the tree is as
+            # deep as the depth, and maybe some of lower depths.
+            components = [rng.choice(names_by_depth[depth - 1])]
+            for _ in range(rng.randint(0, 2)):
+                lower = rng.randint(0, depth - 1)
+                components.append(rng.choice(names_by_depth[lower]))
+        offsets = [(rng.randint(-50, 300), rng.randint(-50, 300))
+                   for _ in components]
+
+        for master_index, master in enumerate(self.masters):
+            layer = GSLayer()
+            layer.layerId = master.id
+            layer.associatedMasterId = master.id
+            # The outlines get bolder and wider with the masters.
+            scale = 1 + 0.05 * master_index
+            layer.width = round(600 * scale)
+            layer.userData['generatedBy'] = 'tests/generate_font.py'
+            for contour in outline:
+                path = GSPath()
+                for (x, y), node_type, smooth in contour:
+                    node = GSNode((round(x * scale), y), node_type, smooth)
+                    if rng.random() < spec.node_user_data_ratio:
+                        node.userData['source'] = 'synthetic'
+                        node.userData['weight'] = master_index
+                    path.nodes.append(node)
+                layer.paths.append(path)
+            for name, offset in zip(components, offsets):
+                component = GSComponent()
+                component.name = name
+                component.transform = Transform(
+                    1, 0, 0, 1, round(offset[0] * scale), offset[1])
+                layer.components.append(component)
+            for anchor_name, y in (('top', 700), ('bottom', 0)):
+                anchor = GSAnchor()
+                anchor.name = anchor_name
+                anchor.position = Point(round(300 * scale), y)
+                layer.anchors.append(anchor)
+            glyph.layers.append(layer)
+        return glyph
+
+    def outline(self):
+        """Return a list of contours, each a list of ((x, y), type, smooth)
+        tuples, the same in all the masters.
+        """
+        spec = self.spec
+        rng = self.rng
+        contours = []
+        for _ in range(spec.paths_per_glyph):
+            contour = []
+            while len(contour) < spec.nodes_per_path:
+                if (spec.nodes_per_path - len(contour) >= 3 and
+                        rng.random() < 0.5):
+                    for _ in range(2):
+                        contour.append(((rng.randint(0, 600),
+                                         rng.randint(-200, 800)),
+                                        GSNode.OFFCURVE, False))
+                    contour.append(((rng.randint(0, 600),
+                                     rng.randint(-200, 800)),
+                                    GSNode.CURVE, rng.random() < 0.5))
+                else:
+                    contour.append(((rng.randint(0, 600),
+                                     rng.randint(-200, 800)),
+                                    GSNode.LINE, False))
+            contours.append(contour)
+        return contours
+
+    def add_kerning(self, font, names):
+        spec = self.spec
+        rng = self.rng
+        if not spec.kerning_pairs or not spec.masters:
+            return
+        groups = ['k%04d' % index for index in range(spec.kerning_groups)]
+        if groups:
+            for glyph in font.glyphs:
+                glyph.leftKerningGroup = rng.choice(groups)
+                glyph.rightKerningGroup = rng.choice(groups)
+
+        # Most pairs are between groups, the others are exceptions between
+        # glyphs. There are no pairs between a group and a glyph, which
+        # could conflict with the pairs of the glyph's group.
+        def pair():
+            if groups and rng.random() < 0.7:
+                return ('@MMK_L_%s' % rng.choice(groups),
+                        '@MMK_R_%s' % rng.choice(groups))
+            return rng.choice(names), rng.choice(names)
+
+        pair_count = spec.kerning_pairs // spec.masters
+        pairs = set()
+        attempts = 0
+        while len(pairs) < pair_count and attempts < 10 * pair_count:
+            attempts += 1
+            pairs.add(pair())
+        pairs = sorted(pairs)
+        for master_index, master in enumerate(self.masters):
+            for left, right in pairs:
+                font.setKerningForPair(
+                    master.id, left, right,
+                    float(rng.randint(-100, 50) * (1 + master_index % 3)))
+
+
+def parse_options(args):
+    defaults = FontSpec()
+    parser = argparse.ArgumentParser(
+        description='Generate a large synthetic .glyphs file.')
+    parser.add_argument('output', metavar='OUTPUT',
+                        help='Path of the .glyphs file to write.')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Seed of the random choices. (default: '
+                             '%(default)s)')
+    for field in FontSpec._fields:
+        default = getattr(defaults, field)
+        parser.add_argument('--' + field.replace('_', '-'),
+                            type=type(default), default=default,
+                            help='(default: %(default)s)')
+    return parser.parse_args(args)
+
+
+def main(args=None):
+    opt = parse_options(args)
+    spec = FontSpec(**{field: getattr(opt, field)
+                       for field in FontSpec._fields})
+    write_font(generate_font(spec, opt.seed), opt.output)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,99 @@
+# coding=UTF-8
+#
+# Copyright 2018 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import (print_function, division, absolute_import,
+                        unicode_literals)
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from glyphsLib import dumps, to_designspace
+from glyphsLib.classes import GSFont
+
+from generate_font import FontSpec, generate_font, main
+
+SPEC = FontSpec(glyphs=60, masters=3, component_depth=3, kerning_pairs=90,
+                kerning_groups=5, instances=2)
+
+
+class GenerateFontTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_dimensions(self):
+        font = generate_font(SPEC)
+        self.assertEqual(len(font.glyphs), 60)
+        self.assertEqual(len(font.masters), 3)
+        self.assertEqual(len(font.instances), 2)
+        for glyph in font.glyphs:
+            self.assertEqual(len(glyph.layers), 3)
+        # The same pairs in each master
+        self.assertEqual([sum(len(rights) for rights in
+                              font.kerning[master.id].values())
+                          for master in font.masters], [30, 30, 30])
+
+    def test_component_depth(self):
+        font = generate_font(SPEC)
+        layers = {glyph.name: glyph.layers[0] for glyph in font.glyphs}
+
+        def depth(name):
+            return max([1 + depth(component.name)
+                        for component in layers[name].components] + [0])
+        depths = [depth(name) for name in layers]
+        self.assertEqual(max(depths), 3)
+        self.assertEqual(depths.count(0), 30)
+
+    def test_fewer_composites_than_depth(self):
+        font = generate_font(FontSpec(glyphs=10, masters=2,
+                                      composite_ratio=0.3,
+                                      component_depth=6))
+        self.assertEqual(len(font.glyphs), 10)
+
+    def test_node_user_data(self):
+        font = generate_font(SPEC)
+        nodes = [node for glyph in font.glyphs for layer in glyph.layers
+                 for path in layer.paths for node in path.nodes]
+        with_user_data = [node for node in nodes if node.userData]
+        self.assertGreater(len(with_user_data), 0)
+        self.assertLess(len(with_user_data), len(nodes))
+
+    def test_seed(self):
+        self.assertEqual(dumps(generate_font(SPEC)),
+                         dumps(generate_font(SPEC)))
+        self.assertNotEqual(dumps(generate_font(SPEC)),
+                            dumps(generate_font(SPEC, seed=1)))
+
+    def test_main(self):
+        path = os.path.join(self.tmpdir, 'Synthetic.glyphs')
+        main([path, '--glyphs', '20', '--masters', '2', '--kerning-pairs',
+              '10', '--kerning-groups', '3', '--instances', '2'])
+        font = GSFont(path)
+        self.assertEqual(len(font.glyphs), 20)
+        self.assertEqual(dumps(font), dumps(generate_font(FontSpec(
+            glyphs=20, masters=2, kerning_pairs=10, kerning_groups=3,
+            instances=2))))
+        designspace = to_designspace(font)
+        self.assertEqual(len(designspace.sources), 2)
+        self.assertEqual(len(designspace.instances), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
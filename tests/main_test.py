@@ -39,6 +39,47 @@ def test_glyphs_main_masters(tmpdir):
     assert glob.glob(master_dir + '/*.ufo')
 
 
+def test_glyphs_main_masters_incremental(tmpdir):
+    filename = os.path.join(
+        os.path.dirname(__file__), 'data/GlyphsUnitTestSans.glyphs')
+    master_dir = os.path.join(str(tmpdir), 'master_ufos_test')
+
+    glyphsLib.__main__.main(['-g', filename, '-m', master_dir])
+    glifs = glob.glob(master_dir + '/*.ufo/glyphs/*.glif')
+    for path in glifs:
+        os.utime(path, (0, 0))
+    glyphsLib.__main__.main(
+        ['-g', filename, '-m', master_dir, '--incremental'])
+
+    assert glifs
+    assert all(os.path.getmtime(path) == 0 for path in glifs)
+
+
+def test_glyphs_main_profile(tmpdir, capsys):
+    filename = os.path.join(
+        os.path.dirname(__file__), 'data/GlyphsUnitTestSans.glyphs')
+    master_dir = os.path.join(str(tmpdir), 'master_ufos_test')
+
+    glyphsLib.__main__.main(['-g', filename, '-m', master_dir, '--profile'])
+
+    out, _err = capsys.readouterr()
+    assert 'parse ' in out
+    assert 'write masters ' in out
+    assert 'to_ufo_glyph ' in out
+
+
+def test_glyphs_main_stats(capsys):
+    filename = os.path.join(
+        os.path.dirname(__file__), 'data/GlyphsUnitTestSans.glyphs')
+
+    assert glyphsLib.__main__.main(['stats', filename]) == 0
+
+    out, _err = capsys.readouterr()
+    assert out.startswith('Class ')
+    assert 'GSNode ' in out
+    assert 'kerning ' in out
+
+
 def test_glyphs_main_instances(tmpdir):
     filename = os.path.join(
         os.path.dirname(__file__), 'data/GlyphsUnitTestSans.glyphs')
@@ -51,6 +92,34 @@ def test_glyphs_main_instances(tmpdir):
     assert glob.glob(inst_dir + '/*.ufo')
 
 
+def test_glyphs_main_instances_jobs(tmpdir):
+    filename = os.path.join(
+        os.path.dirname(__file__), 'data/GlyphsUnitTestSans.glyphs')
+    master_dir = os.path.join(str(tmpdir), 'master_ufos_test')
+    inst_dir = os.path.join(str(tmpdir), 'inst_ufos_test')
+
+    glyphsLib.__main__.main(
+        ['-g', filename, '-m', master_dir, '-n', inst_dir, '-j', '2'])
+
+    assert len(glob.glob(inst_dir + '/*.ufo')) == 8
+
+
+def test_glyphs_main_include_instances(tmpdir):
+    filename = os.path.join(
+        os.path.dirname(__file__), 'data/GlyphsUnitTestSans.glyphs')
+    master_dir = os.path.join(str(tmpdir), 'master_ufos_test')
+    inst_dir = os.path.join(str(tmpdir), 'inst_ufos_test')
+
+    glyphsLib.__main__.main(
+        ['-g', filename, '-m', master_dir, '-n', inst_dir,
+         '-i', 'Bold', '--include-instances', '*Light'])
+
+    assert sorted(os.path.basename(path)
+                  for path in glob.glob(inst_dir + '/*.ufo')) == [
+        'GlyphsUnitTestSans-Bold.ufo', 'GlyphsUnitTestSans-ExtraLight.ufo',
+        'GlyphsUnitTestSans-Light.ufo']
+
+
 def test_glyphs_main_instances_relative_dir(tmpdir):
     filename = os.path.join(
         os.path.dirname(__file__), 'data/GlyphsUnitTestSans.glyphs')
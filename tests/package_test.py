@@ -0,0 +1,178 @@
+# coding=UTF-8
+#
+# Copyright 2018 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import (print_function, division, absolute_import,
+                        unicode_literals)
+
+import os
+import shutil
+import tempfile
+import unittest
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+import glyphsLib
+from glyphsLib.classes import GSFont, GSGlyph
+from glyphsLib.parser import Parser
+
+TESTFILE_PATH = os.path.join(
+    os.path.dirname(__file__), 'data', 'GlyphsUnitTestSans.glyphs')
+
+
+class GlyphsPackageTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'Test.glyphspackage')
+        self.font = GSFont(TESTFILE_PATH)
+        self.font.save(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _glyph_path(self, filename):
+        return os.path.join(self.path, 'glyphs', filename)
+
+    def test_layout(self):
+        self.assertTrue(os.path.isfile(
+            os.path.join(self.path, 'fontinfo.plist')))
+        self.assertTrue(os.path.isfile(
+            os.path.join(self.path, 'order.plist')))
+        self.assertTrue(os.path.isfile(self._glyph_path('A_.glyph')))
+        self.assertTrue(os.path.isfile(self._glyph_path('a.sc.glyph')))
+        self.assertEqual(len(os.listdir(os.path.join(self.path, 'glyphs'))),
+                         len(self.font.glyphs))
+
+    def test_roundtrip(self):
+        font = GSFont(self.path)
+        self.assertEqual(font.filepath, self.path)
+        self.assertEqual(glyphsLib.dumps(font), glyphsLib.dumps(self.font))
+        for glyph in font.glyphs:
+            self.assertIs(glyph.parent, font)
+
+    def test_parallel_load(self):
+        min_glyphs = Parser.MIN_GLYPHS_FOR_WORKERS
+        Parser.MIN_GLYPHS_FOR_WORKERS = 0
+        try:
+            with mock.patch('multiprocessing.cpu_count', return_value=2):
+                font = GSFont(self.path, workers=2)
+                self.assertEqual(glyphsLib.dumps(font),
+                                 glyphsLib.dumps(self.font))
+            with mock.patch('multiprocessing.cpu_count', return_value=1), \
+                    mock.patch('multiprocessing.Pool') as pool:
+                font = GSFont(self.path, workers=2)
+                self.assertEqual(glyphsLib.dumps(font),
+                                 glyphsLib.dumps(self.font))
+            self.assertFalse(pool.called)
+        finally:
+            Parser.MIN_GLYPHS_FOR_WORKERS = min_glyphs
+
+    def test_lazy_glyph_access(self):
+        font = GSFont(self.path)
+        os.remove(self._glyph_path('h.glyph'))
+        # Only the requested glyph file is parsed
+        glyph = font.glyphs['A']
+        self.assertEqual(glyph.name, 'A')
+        self.assertIs(glyph.parent, font)
+        self.assertEqual(len(glyph.layers), 3)
+        # Loading all the glyphs keeps the glyph that was already returned
+        self.assertIs(font.glyphs[0], glyph)
+        self.assertNotIn('h', font.glyphs)
+
+    def test_lazy_glyph_layers(self):
+        def layers(glyph):
+            return [(layer.layerId, layer.associatedMasterId,
+                     layer.master.id if layer.master else None)
+                    for layer in glyph.layers]
+
+        eager_font = GSFont(self.path)
+        eager_glyphs = list(eager_font.glyphs)
+        font = GSFont(self.path)
+        glyph = font.glyphs['a']
+        self.assertEqual(layers(glyph), layers(eager_font.glyphs['a']))
+        self.assertEqual(
+            [layer.master.name for layer in list(glyph.layers)[:3]],
+            ['Light', 'Regular', 'Bold'])
+        self.assertIs(font.glyphs['a'], glyph)
+        self.assertEqual([g.name for g in font.glyphs],
+                         [g.name for g in eager_glyphs])
+
+    def test_save_only_changed_glyphs(self):
+        font = GSFont(self.path)
+        font.glyphs['a'].layers[0].width = 1
+        font.glyphs.append(GSGlyph('b'))
+        # Make the existing files recognizable
+        for filename in os.listdir(os.path.join(self.path, 'glyphs')):
+            os.utime(self._glyph_path(filename), (0, 0))
+
+        font.save(workers=2)
+
+        changed = sorted(
+            filename
+            for filename in os.listdir(os.path.join(self.path, 'glyphs'))
+            if os.stat(self._glyph_path(filename)).st_mtime != 0)
+        self.assertEqual(changed, ['a.glyph', 'b.glyph'])
+        self.assertEqual(glyphsLib.dumps(GSFont(self.path)),
+                         glyphsLib.dumps(font))
+
+    def test_save_deletes_removed_glyphs(self):
+        font = GSFont(self.path)
+        font.glyphs = [g for g in font.glyphs if g.name != 'h']
+        font.save()
+        self.assertFalse(os.path.exists(self._glyph_path('h.glyph')))
+        self.assertNotIn('h', GSFont(self.path).glyphs)
+
+    def test_save_renamed_glyph(self):
+        order = [glyph.name for glyph in self.font.glyphs]
+        font = GSFont(self.path)
+        font.glyphs['n'].name = 'n.alt'
+        os.utime(self._glyph_path('a.glyph'), (0, 0))
+        font.save()
+        self.assertFalse(os.path.exists(self._glyph_path('n.glyph')))
+        self.assertTrue(os.path.exists(self._glyph_path('n.alt.glyph')))
+        self.assertEqual(os.stat(self._glyph_path('a.glyph')).st_mtime, 0)
+        self.assertIs(font.glyphs['n.alt'], font.glyphs[order.index('n')])
+        # Saving again leaves the renamed glyph file alone
+        font = GSFont(self.path)
+        font.glyphs['n.alt']
+        font.save()
+        self.assertTrue(os.path.exists(self._glyph_path('n.alt.glyph')))
+
+        font = GSFont(self.path)
+        self.assertEqual([glyph.name for glyph in font.glyphs],
+                         [name if name != 'n' else 'n.alt' for name in order])
+        self.assertEqual(len(os.listdir(os.path.join(self.path, 'glyphs'))),
+                         len(order))
+
+    def test_save_without_loading_glyphs(self):
+        font = GSFont(self.path)
+        font.familyName = 'Renamed'
+        os.utime(self._glyph_path('n.glyph'), (0, 0))
+        font.save()
+        self.assertEqual(os.stat(self._glyph_path('n.glyph')).st_mtime, 0)
+        font = GSFont(self.path)
+        self.assertEqual(font.familyName, 'Renamed')
+        self.assertEqual(len(font.glyphs), len(self.font.glyphs))
+
+    def test_load_to_ufos(self):
+        ufos = glyphsLib.load_to_ufos(self.path)
+        self.assertEqual(len(ufos), 3)
+        self.assertIn('A', ufos[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -19,11 +19,19 @@ from __future__ import (print_function, division, absolute_import,
                         unicode_literals)
 
 from collections import OrderedDict
+from io import open
 import unittest
 import datetime
+import os
 
-from glyphsLib.parser import Parser
-from glyphsLib.classes import GSGlyph
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+import glyphsLib
+from glyphsLib.parser import Parser, skip_value, split_list_items
+from glyphsLib.classes import GSFont, GSGlyph
 
 GLYPH_DATA = '''\
 (
@@ -196,5 +204,115 @@ class ParserGlyphTest(unittest.TestCase):
         self.assertEqual(glyph.unicode, "0041")
 
 
+class SkipValueTest(unittest.TestCase):
+    def test_skip_bare_value(self):
+        text = 'abc.def; x'
+        self.assertEqual(skip_value(text, 0), 7)
+
+    def test_skip_quoted_string(self):
+        text = ' "a \\"(\\" {";rest'
+        self.assertEqual(text[skip_value(text, 0):], ';rest')
+
+    def test_skip_nested(self):
+        text = '{a = (1, "(}", {b = c;});};rest'
+        self.assertEqual(text[skip_value(text, 0):], ';rest')
+
+    def test_unbalanced(self):
+        with self.assertRaises(ValueError):
+            skip_value('{a = (1, 2);', 0)
+
+    def test_split_list_items(self):
+        text = '({a = 1;},\n"x,y", (1, 2)\n);rest'
+        spans, end = split_list_items(text, 1)
+        self.assertEqual([text[s:e] for s, e in spans],
+                         ['{a = 1;}', '"x,y"', '(1, 2)'])
+        self.assertEqual(text[end:], ';rest')
+
+    def test_split_empty_list(self):
+        self.assertEqual(split_list_items('( );', 1), ([], 3))
+
+
+class PeekTest(unittest.TestCase):
+    def setUp(self):
+        self.filename = os.path.join(
+            os.path.dirname(__file__), 'data', 'GlyphsUnitTestSans.glyphs')
+
+    def test_peek_default_keys(self):
+        full = GSFont(self.filename)
+        font = glyphsLib.peek(self.filename)
+        self.assertEqual(font.familyName, full.familyName)
+        self.assertEqual([(m.id, m.name) for m in font.masters],
+                         [(m.id, m.name) for m in full.masters])
+        self.assertEqual([i.name for i in font.instances],
+                         [i.name for i in full.instances])
+        self.assertEqual(font.customParameters['note'], 'Bla bla')
+        self.assertEqual(len(font.glyphs), 0)
+        self.assertEqual(len(font.features), 0)
+        self.assertEqual(font.kerning, {})
+        self.assertIsNone(font.filepath)
+
+    def test_peek_requested_keys(self):
+        font = glyphsLib.peek(self.filename, keys=['familyName', 'glyphs'])
+        self.assertEqual(font.familyName, 'Glyphs Unit Test Sans')
+        self.assertEqual(len(font.masters), 0)
+        self.assertEqual(len(font.instances), 0)
+        self.assertEqual(
+            [g.name for g in font.glyphs],
+            [g.name for g in GSFont(self.filename).glyphs])
+
+    def test_peek_file_object(self):
+        with open(self.filename, encoding='utf-8') as fp:
+            font = glyphsLib.peek(fp, keys=['familyName'])
+        self.assertEqual(font.familyName, 'Glyphs Unit Test Sans')
+
+
+class ParallelParserTest(unittest.TestCase):
+    def setUp(self):
+        self.filename = os.path.join(
+            os.path.dirname(__file__), 'data', 'GlyphsUnitTestSans.glyphs')
+        self.min_glyphs = Parser.MIN_GLYPHS_FOR_WORKERS
+        # Force the parallel code path even for a small test file, and on a
+        # machine with a single processor
+        Parser.MIN_GLYPHS_FOR_WORKERS = 0
+        patcher = mock.patch('multiprocessing.cpu_count', return_value=2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        Parser.MIN_GLYPHS_FOR_WORKERS = self.min_glyphs
+
+    def test_plain_data_builds_the_same_objects(self):
+        with open(self.filename, encoding='utf-8') as fp:
+            text = fp.read()
+        parser = Parser(current_type=GSFont)
+        data, _ = parser._parse_plain(text, 0)
+        font = parser._build(data)
+        self.assertEqual(glyphsLib.dumps(font),
+                         glyphsLib.dumps(GSFont(self.filename)))
+
+    def test_single_processor_parses_serially(self):
+        with mock.patch('multiprocessing.cpu_count', return_value=1), \
+                mock.patch('multiprocessing.Pool') as pool:
+            font = GSFont(self.filename, workers=4)
+        self.assertFalse(pool.called)
+        self.assertEqual(glyphsLib.dumps(font),
+                         glyphsLib.dumps(GSFont(self.filename)))
+
+    def test_parallel_parse_is_identical(self):
+        serial = GSFont(self.filename)
+        parallel = GSFont(self.filename, workers=2)
+        self.assertEqual(
+            [g.name for g in serial.glyphs], [g.name for g in parallel.glyphs])
+        self.assertEqual(glyphsLib.dumps(serial), glyphsLib.dumps(parallel))
+
+    def test_parallel_parse_parents(self):
+        font = GSFont(self.filename, workers=2)
+        for glyph in font.glyphs:
+            self.assertIs(glyph.parent, font)
+            for layer in glyph.layers:
+                self.assertIs(layer.parent, glyph)
+                self.assertIsNotNone(layer.master)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,85 @@
+# coding=UTF-8
+#
+# Copyright 2018 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import (print_function, division, absolute_import,
+                        unicode_literals)
+
+import os
+import unittest
+
+from glyphsLib.classes import GSFont, GSNode
+from glyphsLib.stats import memory_report, KERNING, USER_DATA
+
+TESTFILE_PATH = os.path.join(
+    os.path.dirname(__file__), 'data', 'GlyphsUnitTestSans.glyphs')
+
+
+def _all_layers(font):
+    for glyph in font.glyphs:
+        for layer in glyph.layers:
+            yield layer
+            if layer._background is not None:
+                yield layer._background
+
+
+class MemoryReportTest(unittest.TestCase):
+    def setUp(self):
+        self.font = GSFont(TESTFILE_PATH)
+
+    def test_counts(self):
+        report = memory_report(self.font)
+        layers = list(_all_layers(self.font))
+        nodes = [node for layer in layers for path in layer.paths
+                 for node in path.nodes]
+        self.assertEqual(report.classes['GSFont'].count, 1)
+        self.assertEqual(report.classes['GSGlyph'].count,
+                         len(self.font.glyphs))
+        self.assertEqual(report.classes['GSNode'].count, len(nodes))
+        self.assertEqual(report.classes['GSAnchor'].count,
+                         sum(len(layer.anchors) for layer in layers))
+        self.assertEqual(report.classes[KERNING].count, sum(
+            len(rights) for master_kerning in self.font.kerning.values()
+            for rights in master_kerning.values()))
+        self.assertGreater(report.classes[USER_DATA].count, 0)
+        for usage in report.classes.values():
+            self.assertGreater(usage.bytes, 0)
+
+    def test_total(self):
+        report = memory_report(self.font)
+        self.assertEqual(report.total_bytes,
+                         sum(usage.bytes
+                             for usage in report.classes.values()))
+        self.assertEqual(memory_report(self.font).total_bytes,
+                         report.total_bytes)
+
+    def test_new_node(self):
+        before = memory_report(self.font).classes['GSNode']
+        path = self.font.glyphs['A'].layers[0].paths[0]
+        path.nodes.append(GSNode((10, 20)))
+        after = memory_report(self.font).classes['GSNode']
+        self.assertEqual(after.count, before.count + 1)
+        self.assertGreater(after.bytes, before.bytes)
+
+    def test_format_table(self):
+        lines = memory_report(self.font).format_table().splitlines()
+        self.assertEqual(lines[0].split(),
+                         ['Class', 'count', 'bytes', 'per', 'item'])
+        self.assertTrue(lines[1].startswith('GSNode '))
+        self.assertTrue(lines[-1].startswith('Total '))
+
+
+if __name__ == '__main__':
+    unittest.main()
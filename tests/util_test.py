@@ -17,9 +17,15 @@
 from __future__ import (print_function, division, absolute_import,
                         unicode_literals)
 
+import os
+import shutil
+import tempfile
 import unittest
 
-from glyphsLib.util import bin_to_int_list, int_list_to_bin
+import defcon
+
+from glyphsLib.util import (bin_to_int_list, int_list_to_bin,
+                            save_ufo_incrementally)
 
 class UtilTest(unittest.TestCase):
     def test_bin_to_int_list(self):
@@ -37,3 +43,92 @@ class UtilTest(unittest.TestCase):
         self.assertEqual(int_list_to_bin([0, 1]), 3)
         self.assertEqual(int_list_to_bin([2]), 4)
         self.assertEqual(int_list_to_bin([7, 30]), (1 << 7) + (1 << 30))
+
+
+def _read_files(path):
+    result = {}
+    for root, _, files in os.walk(path):
+        for name in files:
+            file_path = os.path.join(root, name)
+            with open(file_path, 'rb') as f:
+                result[os.path.relpath(file_path, path)] = f.read()
+    return result
+
+
+class SaveUfoIncrementallyTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'Test.ufo')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _make_ufo(self, widths):
+        ufo = defcon.Font()
+        ufo.info.familyName = 'Test'
+        for name, width in sorted(widths.items()):
+            ufo.newGlyph(name).width = width
+        return ufo
+
+    def _glif_path(self, name):
+        return os.path.join(self.path, 'glyphs', name + '.glif')
+
+    def test_only_changed_files_are_written(self):
+        self._make_ufo({'a': 100, 'b': 200, 'c': 300}).save(self.path)
+        for name in 'abc':
+            os.utime(self._glif_path(name), (0, 0))
+        stray = os.path.join(self.path, 'data', 'stray.txt')
+        os.makedirs(os.path.dirname(stray))
+        with open(stray, 'w') as f:
+            f.write('stray')
+
+        ufo = self._make_ufo({'a': 100, 'b': 250, 'd': 400})
+        save_ufo_incrementally(ufo, self.path)
+
+        self.assertEqual(ufo.path, self.path)
+        self.assertEqual(os.path.getmtime(self._glif_path('a')), 0)
+        self.assertNotEqual(os.path.getmtime(self._glif_path('b')), 0)
+        self.assertFalse(os.path.exists(self._glif_path('c')))
+        self.assertTrue(os.path.exists(self._glif_path('d')))
+        self.assertFalse(os.path.exists(os.path.dirname(stray)))
+        self.assertEqual(os.listdir(self.tmpdir), ['Test.ufo'])
+        saved = defcon.Font(self.path)
+        self.assertEqual(sorted(saved.keys()), ['a', 'b', 'd'])
+        self.assertEqual(saved['b'].width, 250)
+
+    def test_unchanged_plists_are_not_written(self):
+        self._make_ufo({'a': 100, 'b': 200}).save(self.path)
+        contents = os.path.join(self.path, 'glyphs', 'contents.plist')
+        layer_info = os.path.join(self.path, 'glyphs', 'layerinfo.plist')
+        os.utime(contents, (0, 0))
+        os.utime(layer_info, (0, 0))
+
+        save_ufo_incrementally(self._make_ufo({'a': 100, 'b': 250}),
+                               self.path)
+        self.assertEqual(os.path.getmtime(contents), 0)
+        self.assertEqual(os.path.getmtime(layer_info), 0)
+
+        ufo = self._make_ufo({'a': 100, 'b': 250, 'c': 300})
+        ufo.layers.defaultLayer.color = '1,0,0,1'
+        save_ufo_incrementally(ufo, self.path)
+        self.assertNotEqual(os.path.getmtime(contents), 0)
+        self.assertNotEqual(os.path.getmtime(layer_info), 0)
+        self.assertEqual(defcon.Font(self.path).layers.defaultLayer.color,
+                         '1,0,0,1')
+
+    def test_same_files_as_save(self):
+        ufo = self._make_ufo({'a': 100, 'b': 200})
+        ufo.features.text = 'feature liga {} liga;'
+        ufo.layers.newLayer('public.background').newGlyph('a')
+        ufo.save(self.path)
+
+        ufo = self._make_ufo({'a': 150, 'c': 300})
+        ufo.kerning['a', 'c'] = -10
+        save_ufo_incrementally(ufo, self.path)
+        expected_path = os.path.join(self.tmpdir, 'Expected.ufo')
+        ufo.save(expected_path)
+        self.assertEqual(_read_files(self.path), _read_files(expected_path))
+
+    def test_new_ufo(self):
+        save_ufo_incrementally(self._make_ufo({'a': 100}), self.path)
+        self.assertEqual(defcon.Font(self.path)['a'].width, 100)
@@ -0,0 +1,179 @@
+# coding=UTF-8
+#
+# Copyright 2018 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import (print_function, division, absolute_import,
+                        unicode_literals)
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+import glyphsLib
+from glyphsLib.classes import GSFont
+from glyphsLib import watch
+
+TESTFILE_PATH = os.path.join(
+    os.path.dirname(__file__), 'data', 'GlyphsUnitTestSans.glyphs')
+
+
+def _files(path):
+    """Return a dict of relative file path -> (content, modification time)
+    of the files in a directory.
+    """
+    result = {}
+    for root, _, names in os.walk(path):
+        for name in names:
+            file_path = os.path.join(root, name)
+            with open(file_path, 'rb') as fp:
+                result[os.path.relpath(file_path, path)] = (
+                    fp.read(), os.stat(file_path).st_mtime)
+    return result
+
+
+class IncrementalMasterBuilderTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, 'Font.glyphs')
+        shutil.copy(TESTFILE_PATH, self.filename)
+        self.master_dir = os.path.join(self.tmpdir, 'master_ufo')
+        self.builder = watch.IncrementalMasterBuilder(
+            self.filename, self.master_dir)
+        self.builder.build()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def assertMatchesFullBuild(self):
+        expected_dir = os.path.join(self.tmpdir, 'expected')
+        glyphsLib.build_masters(self.filename, expected_dir)
+        expected = _files(expected_dir)
+        files = _files(self.master_dir)
+        self.assertEqual(sorted(files), sorted(expected))
+        for path, (content, _) in files.items():
+            self.assertEqual(content, expected[path][0], path)
+
+    def edit(self, function):
+        font = GSFont(self.filename)
+        function(font)
+        font.save()
+
+    def modified_files(self, before):
+        after = _files(self.master_dir)
+        return sorted(path for path, (content, mtime) in after.items()
+                      if path not in before or before[path][0] != content)
+
+    def written_files(self):
+        """Return the files written since reset_mtimes was called."""
+        return sorted(path for path, (_, mtime)
+                      in _files(self.master_dir).items() if mtime != 0)
+
+    def reset_mtimes(self):
+        for root, _, names in os.walk(self.master_dir):
+            for name in names:
+                os.utime(os.path.join(root, name), (0, 0))
+
+    def test_glyph_change(self):
+        def edit(font):
+            layer = font.glyphs['A'].layers[font.masters[0].id]
+            layer.width += 10
+            for anchor in layer.anchors:
+                anchor.position.x += 5
+        self.edit(edit)
+
+        before = _files(self.master_dir)
+        self.reset_mtimes()
+        self.assertEqual(self.builder.update(), {'A', 'Adieresis'})
+        expected = [
+            os.path.join('GlyphsUnitTestSans-Light.ufo', 'glyphs', 'A_.glif'),
+            os.path.join('GlyphsUnitTestSans-Light.ufo', 'glyphs',
+                         'A_dieresis.glif'),
+        ]
+        self.assertEqual(self.modified_files(before), expected)
+        self.assertEqual(self.written_files(), expected)
+        self.assertMatchesFullBuild()
+
+    def test_no_change(self):
+        self.edit(lambda font: None)
+        self.assertEqual(self.builder.update(), set())
+
+    def test_font_change(self):
+        def edit(font):
+            font.masters[0].xHeight += 10
+        self.edit(edit)
+
+        self.assertIsNone(self.builder.update())
+        self.assertMatchesFullBuild()
+
+    def test_glyph_removed(self):
+        def edit(font):
+            # Adieresis
+            del font.glyphs[1]
+        self.edit(edit)
+
+        self.assertIsNone(self.builder.update())
+        self.assertMatchesFullBuild()
+
+    def test_successive_updates(self):
+        def edit(font):
+            font.glyphs['n'].layers[font.masters[1].id].width += 10
+        self.edit(edit)
+        self.assertEqual(self.builder.update(), {'n'})
+        self.edit(edit)
+        self.assertEqual(self.builder.update(), {'n'})
+        self.assertMatchesFullBuild()
+
+
+class WatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, 'Font.glyphs')
+        with open(self.filename, 'w') as fp:
+            fp.write('{\n}\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write_later(self):
+        def write():
+            with open(self.filename, 'w') as fp:
+                fp.write('{\nfamilyName = Changed;\n}\n')
+        timer = threading.Timer(0.2, write)
+        timer.start()
+        self.addCleanup(timer.cancel)
+
+    def check_watcher(self, watcher):
+        self.addCleanup(watcher.close)
+        self.assertFalse(watcher.wait(timeout=0.1))
+        self.write_later()
+        self.assertTrue(watcher.wait(timeout=10))
+        self.assertFalse(watcher.wait(timeout=0.1))
+
+    def test_polling(self):
+        watcher = watch.make_watcher(self.filename, interval=0.05,
+                                     polling=True)
+        self.assertIsInstance(watcher, watch.PollingWatcher)
+        self.check_watcher(watcher)
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), 'needs inotify')
+    def test_inotify(self):
+        self.check_watcher(watch.InotifyWatcher(self.filename))
+
+
+if __name__ == '__main__':
+    unittest.main()